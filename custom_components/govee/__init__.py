@@ -2,16 +2,28 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
+from datetime import timedelta
 from typing import TYPE_CHECKING
 
-from homeassistant.const import Platform
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.const import CONF_API_KEY, CONF_DEVICE_ID, CONF_DEVICES, CONF_NAME, CONF_SCAN_INTERVAL, Platform
+from homeassistant.core import DOMAIN as HOMEASSISTANT_DOMAIN
+from homeassistant.core import callback
+from homeassistant.exceptions import ConfigEntryNotReady
+from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers import entity_registry as er
 
 if TYPE_CHECKING:
     from homeassistant.config_entries import ConfigEntry
     from homeassistant.core import HomeAssistant
 
-from .const import DOMAIN
+from .api import account_id
+from .const import CONF_LAN, CONF_PUSH, DATA_ACCOUNTS, DOMAIN, ENTRY_VERSION, SCAN_INTERVAL
+from .coordinator import GoveeAccount, GoveeDataUpdateCoordinator
+from .registry import get_sku
+from .snapshot import GoveeSnapshots
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -20,9 +32,62 @@ PLATFORMS: list[Platform] = [Platform.FAN, Platform.SENSOR]
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
-    """Set up Govee from a config entry."""
+    """Set up every device of a Govee account from a config entry."""
+    if not entry.data[CONF_DEVICES]:
+        # A per-device entry folded into its account entry by the migration, it is removed right after
+        _LOGGER.debug("Skipping setup of %s, it has no devices", entry.title)
+        return True
+
     hass.data.setdefault(DOMAIN, {})
-    hass.data[DOMAIN][entry.entry_id] = entry.data
+    accounts: dict[str, GoveeAccount] = hass.data[DOMAIN].setdefault(DATA_ACCOUNTS, {})
+
+    # All devices behind the API key are polled by one account scheduler
+    api_key = entry.data[CONF_API_KEY]
+    if (account := accounts.get(api_key)) is None:
+        account = accounts[api_key] = GoveeAccount(hass, api_key)
+    account.scan_interval = timedelta(seconds=entry.options.get(CONF_SCAN_INTERVAL, SCAN_INTERVAL.total_seconds()))
+
+    _async_migrate_device_identifiers(hass, entry)
+
+    coordinators: dict[str, GoveeDataUpdateCoordinator] = {}
+    for device_config in entry.data[CONF_DEVICES]:
+        if (description := get_sku(device_config[CONF_NAME])) is None:
+            _LOGGER.error("Unknown device name: %s", device_config[CONF_NAME])
+            continue
+        device = await description.async_create_device(hass, device_config[CONF_DEVICE_ID])
+
+        coordinator = GoveeDataUpdateCoordinator(hass, entry, account, device)
+        account.async_add_coordinator(coordinator)
+        coordinators[device.device_id] = coordinator
+
+    # One fetch per device, shared by both platforms. The fetches run concurrently and are bounded by
+    # the account's request limit.
+    try:
+        await account.async_setup()
+        unknown = []
+        for coordinator in coordinators.values():
+            if (updated_at := account.snapshots.async_restore(coordinator.device)) is not None:
+                # Start from the last known state and refresh it without holding up startup
+                coordinator.async_restore(updated_at)
+                entry.async_create_background_task(
+                    hass, coordinator.async_refresh(), f"{DOMAIN} {coordinator.device.device_id} initial refresh"
+                )
+            else:
+                unknown.append(coordinator)
+        # A device that fails its first fetch stays unavailable and is retried by the account's polls, so one
+        # removed or unreachable device does not hold back the others
+        await _async_first_refresh(unknown, restored=len(coordinators) - len(unknown))
+    except Exception:
+        await _async_release_account(hass, entry, coordinators)
+        raise
+
+    if entry.options.get(CONF_PUSH, False):
+        await account.async_enable_push()
+    if entry.options.get(CONF_LAN, False):
+        await account.async_enable_lan()
+
+    hass.data[DOMAIN][entry.entry_id] = coordinators
+    entry.async_on_unload(entry.add_update_listener(async_reload_entry))
 
     # Forward the setup to the platforms
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
@@ -30,9 +95,124 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     return True
 
 
+async def _async_first_refresh(coordinators: list[GoveeDataUpdateCoordinator], restored: int) -> None:
+    """
+    Fetch the devices that have no snapshot to start from.
+
+    :param coordinators: Coordinators of the devices without a snapshot
+    :param restored: Number of devices started from their snapshot
+    :raises ConfigEntryNotReady: If there is nothing to show, no device was restored and none could be fetched
+    """
+    await asyncio.gather(*(coordinator.async_refresh() for coordinator in coordinators))
+    if coordinators and not restored and not any(coordinator.last_update_success for coordinator in coordinators):
+        # Home Assistant retries with backoff, for example while the cloud is down on a cold start
+        error = coordinators[0].last_exception
+        raise ConfigEntryNotReady(str(error)) from error
+
+
+@callback
+def _async_migrate_device_identifiers(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Move devices registered under the homeassistant domain by earlier versions to the integration's domain."""
+    device_registry = dr.async_get(hass)
+    for device_entry in dr.async_entries_for_config_entry(device_registry, entry.entry_id):
+        if not any(domain == HOMEASSISTANT_DOMAIN for domain, _identifier in device_entry.identifiers):
+            continue
+        device_registry.async_update_device(
+            device_entry.id,
+            new_identifiers={
+                (DOMAIN if domain == HOMEASSISTANT_DOMAIN else domain, identifier)
+                for domain, identifier in device_entry.identifiers
+            },
+        )
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
+    if entry.entry_id not in hass.data.get(DOMAIN, {}):
+        # Nothing was set up for an entry without devices
+        return True
+
     if unload_ok := await hass.config_entries.async_unload_platforms(entry, PLATFORMS):
-        hass.data[DOMAIN].pop(entry.entry_id)
+        await _async_release_account(hass, entry, hass.data[DOMAIN].pop(entry.entry_id))
 
     return unload_ok
+
+
+async def _async_release_account(
+    hass: HomeAssistant, entry: ConfigEntry, coordinators: dict[str, GoveeDataUpdateCoordinator]
+) -> None:
+    """Remove the entry's devices from its account and release the account once it has none left."""
+    account: GoveeAccount = hass.data[DOMAIN][DATA_ACCOUNTS][entry.data[CONF_API_KEY]]
+    empty = not account.coordinators
+    for coordinator in coordinators.values():
+        empty = account.async_remove_coordinator(coordinator)
+    if empty:
+        await hass.data[DOMAIN][DATA_ACCOUNTS].pop(entry.data[CONF_API_KEY]).async_close()
+
+
+async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Reload a config entry when its devices or options change."""
+    await hass.config_entries.async_reload(entry.entry_id)
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Forget the last known state of the devices of a removed account."""
+    snapshots = GoveeSnapshots(hass, account_id(entry.data[CONF_API_KEY]))
+    await snapshots.async_load()
+    for device_config in entry.data[CONF_DEVICES]:
+        snapshots.async_remove(device_config[CONF_DEVICE_ID])
+    await snapshots.async_save()
+
+
+async def async_migrate_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
+    """Migrate a per-device entry into the account entry of its API key."""
+    if entry.version > ENTRY_VERSION:
+        return False
+
+    if entry.version == 1:
+        api_key = entry.data[CONF_API_KEY]
+        device_config = {CONF_DEVICE_ID: entry.data[CONF_DEVICE_ID], CONF_NAME: entry.data[CONF_NAME]}
+        owner = next(
+            (
+                other
+                for other in hass.config_entries.async_entries(DOMAIN)
+                if other.version == ENTRY_VERSION and other.data[CONF_API_KEY] == api_key and other.data[CONF_DEVICES]
+            ),
+            None,
+        )
+
+        if owner is None:
+            # The first entry of the API key becomes the account entry
+            hass.config_entries.async_update_entry(
+                entry,
+                title="Govee",
+                data={CONF_API_KEY: api_key, CONF_DEVICES: [device_config]},
+                unique_id=account_id(api_key),
+                version=ENTRY_VERSION,
+            )
+        else:
+            # Hand the device, its registry entries and its entities over to the account entry
+            hass.config_entries.async_update_entry(
+                owner, data={**owner.data, CONF_DEVICES: [*owner.data[CONF_DEVICES], device_config]}
+            )
+            if owner.state is ConfigEntryState.SETUP_IN_PROGRESS:
+                # Its update listener is not registered yet, the reload waits for the setup to finish
+                hass.config_entries.async_schedule_reload(owner.entry_id)
+            device_registry = dr.async_get(hass)
+            for device_entry in dr.async_entries_for_config_entry(device_registry, entry.entry_id):
+                device_registry.async_update_device(
+                    device_entry.id, add_config_entry_id=owner.entry_id, remove_config_entry_id=entry.entry_id
+                )
+            entity_registry = er.async_get(hass)
+            for entity_entry in er.async_entries_for_config_entry(entity_registry, entry.entry_id):
+                entity_registry.async_update_entity(entity_entry.entity_id, config_entry_id=owner.entry_id)
+
+            # The emptied entry is removed once its migration is done
+            hass.config_entries.async_update_entry(
+                entry, data={CONF_API_KEY: api_key, CONF_DEVICES: []}, unique_id=None, version=ENTRY_VERSION
+            )
+            hass.async_create_task(hass.config_entries.async_remove(entry.entry_id))
+
+        _LOGGER.info("Migrated Govee device %s into its account entry", device_config[CONF_DEVICE_ID])
+
+    return True
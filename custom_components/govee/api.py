@@ -0,0 +1,377 @@
+"""Govee cloud API client for the Govee integration."""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import partial
+from http import HTTPStatus
+from typing import TYPE_CHECKING, Any
+
+import aiohttp
+from homeassistant.core import callback
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from util.govee_api import GoveeAPI, validate_response
+
+from .const import DOMAIN, STATE_FRESHNESS, RequestPriority
+from .lan import lan_command, lan_state
+from .metrics import CONTROL, DEVICES, LAN_CONTROL, LAN_STATE, STATE, GoveeMetrics
+from .registry import get_sku
+from .scheduler import GoveeRequestScheduler
+
+if TYPE_CHECKING:
+    from collections.abc import Coroutine, Iterator
+
+    from homeassistant.core import HomeAssistant
+
+    from .breaker import GoveeCircuitBreaker
+    from .lan import GoveeLan
+    from .quota import GoveeQuota
+
+_LOGGER = logging.getLogger(__name__)
+
+BASE_URL = "https://openapi.api.govee.com"
+
+# Priority the cloud requests of the running task are queued and budgeted with, commands always use their own
+REQUEST_PRIORITY: ContextVar[RequestPriority] = ContextVar(f"{DOMAIN}_request_priority", default=RequestPriority.POLL)
+
+
+@contextmanager
+def request_priority(priority: RequestPriority) -> Iterator[None]:
+    """
+    Send the state requests made within the block at the given priority.
+
+    :param priority: Priority of the requests
+    :return: None
+    """
+    token = REQUEST_PRIORITY.set(priority)
+    try:
+        yield
+    finally:
+        REQUEST_PRIORITY.reset(token)
+
+
+def account_id(api_key: str) -> str:
+    """
+    Return a stable identifier of an account that does not reveal its API key.
+
+    :param api_key: Govee API key
+    :return: str
+    """
+    return hashlib.sha256(api_key.encode()).hexdigest()[:16]
+
+
+class GoveeUnavailableError(RuntimeError):
+    """The Govee cloud is rate limiting the account or failed to answer."""
+
+    def __init__(self, status: int) -> None:
+        """
+        Initialize the error.
+
+        :param status: HTTP status the cloud answered with
+        """
+        super().__init__(f"Request failed with status code {status}")
+        self.status = status
+
+
+class GoveeDeferredError(RuntimeError):
+    """The daily quota has no room for the request right now, it is retried later."""
+
+    def __init__(self) -> None:
+        """Initialize the error."""
+        super().__init__("Request deferred to fit into the daily quota")
+
+
+async def async_validate_response(response: aiohttp.ClientResponse) -> None:
+    """
+    Raise for failed responses, telling rate limiting and server errors apart from refused requests.
+
+    :param response: Response of the Govee cloud
+    :raises GoveeUnavailableError: If the cloud rate limited the request or failed to answer it
+    :return: None
+    """
+    if response.status == HTTPStatus.TOO_MANY_REQUESTS or response.status >= HTTPStatus.INTERNAL_SERVER_ERROR:
+        raise GoveeUnavailableError(response.status)
+    await validate_response(response)
+
+
+# Errors of requests that did not reach the Govee cloud or that it failed to answer, the breaker counts these
+CLOUD_ERRORS = (GoveeUnavailableError, aiohttp.ClientError, TimeoutError)
+
+
+class GoveeClient(GoveeAPI):
+    """GoveeAPI client that reuses Home Assistant's shared connection pool."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        api_key: str,
+        quota: GoveeQuota | None = None,
+        breaker: GoveeCircuitBreaker | None = None,
+        session: aiohttp.ClientSession | None = None,
+    ) -> None:
+        """
+        Initialize the client.
+
+        GoveeAPI.__init__ is not called since it opens a private connection pool for every client.
+
+        :param hass: Home Assistant instance
+        :param api_key: Govee API key of the account
+        :param quota: Quota every request is counted against
+        :param breaker: Circuit breaker every request outcome is reported to
+        :param session: Session to send the requests with instead of one on Home Assistant's connection pool
+        """
+        self._hass = hass
+        self.quota = quota
+        self.breaker = breaker
+        # In-flight state request and last fetched state of each device, and when each was last sent a command
+        self._requests: dict[str, asyncio.Task[dict]] = {}
+        self._states: dict[str, tuple[float, dict]] = {}
+        self._commanded: dict[str, float] = {}
+        self.metrics = GoveeMetrics()
+        # Every cloud request of the account waits here for a slot, commands ahead of polls
+        self.scheduler = GoveeRequestScheduler()
+        # Local transport used before the cloud for devices found on the network
+        self.lan: GoveeLan | None = None
+        # Last error of the state request of each device, the device classes swallow it
+        self.errors: dict[str, Exception] = {}
+        self.api_key = api_key
+        self.base_url = BASE_URL
+        self.headers = {
+            "Govee-API-Key": self.api_key,
+            "Content-Type": "application/json",
+        }
+        self.ignore_request_id = False
+        # Keep-alive connections are pooled by Home Assistant's connector and shared with every other client
+        self.client = session or aiohttp.ClientSession(
+            base_url=self.base_url,
+            headers=self.headers,
+            raise_for_status=async_validate_response,
+            connector=async_get_clientsession(hass).connector,
+            connector_owner=False,
+            trace_configs=[self.metrics.trace_config()],
+        )
+
+    async def get_devices(self) -> list[dict]:
+        """
+        Get all devices associated with the API key.
+
+        :return: list of devices
+        """
+        return await self._async_cloud(DEVICES, None, REQUEST_PRIORITY.get(), super().get_devices())
+
+    async def get_device_state(self, sku: str, device: str, *args: Any, **kwargs: Any) -> dict:
+        """
+        Get the state of a device.
+
+        Concurrent callers for the same device share a single request, and a state fetched within the last
+        moments is returned without asking the device again.
+
+        :param sku: The SKU of the device
+        :param device: The device ID
+        :return: The device
+        """
+        if (fresh := self._states.get(device)) is not None and time.monotonic() - fresh[0] < STATE_FRESHNESS:
+            self.metrics.cache_hits += 1
+            return fresh[1]
+        if (request := self._requests.get(device)) is not None:
+            self.metrics.shared += 1
+        else:
+            self.metrics.cache_misses += 1
+            request = self._requests[device] = self._hass.async_create_task(
+                self._async_get_device_state(sku, device, *args, **kwargs), f"{DOMAIN} {device} state"
+            )
+            request.add_done_callback(partial(self._async_forget_request, device))
+        # A cancelled caller does not cancel the request the other callers wait for
+        return await asyncio.shield(request)
+
+    @callback
+    def _async_forget_request(self, device: str, request: asyncio.Task[dict]) -> None:
+        """
+        Stop sharing a finished state request, unless a newer one already took its place.
+
+        :param device: The device ID
+        :param request: The finished request
+        :return: None
+        """
+        if self._requests.get(device) is request:
+            del self._requests[device]
+
+    async def _async_get_device_state(self, sku: str, device: str, *args: Any, **kwargs: Any) -> dict:
+        """
+        Get the state of a device over the LAN if it answers there, from the cloud otherwise.
+
+        :param sku: The SKU of the device
+        :param device: The device ID
+        :return: The device
+        """
+        started = time.monotonic()
+        if self._lan_device(sku, device):
+            try:
+                state = lan_state(await self.lan.async_status(device))
+            except (TimeoutError, OSError) as e:
+                self.metrics.record(LAN_STATE, device, time.monotonic() - started, e)
+                _LOGGER.debug("No LAN status from %s, falling back to the cloud: %s", device, e)
+                self.lan.async_forget(device)
+            else:
+                self.metrics.record(LAN_STATE, device, time.monotonic() - started, None)
+                self.errors.pop(device, None)
+                self._async_store_state(device, started, state)
+                return state
+
+        try:
+            state = await self._async_cloud(
+                STATE, device, REQUEST_PRIORITY.get(), super().get_device_state(sku, device, *args, **kwargs)
+            )
+        except Exception as e:
+            self.errors[device] = e
+            raise
+        self.errors.pop(device, None)
+        self._async_store_state(device, started, state)
+        return state
+
+    @callback
+    def _async_store_state(self, device: str, started: float, state: dict) -> None:
+        """
+        Keep a fetched state for the freshness window, unless a command was sent to the device meanwhile.
+
+        :param device: The device ID
+        :param started: Time the state request started
+        :param state: The state of the device
+        :return: None
+        """
+        if self._commanded.get(device, 0) <= started:
+            self._states[device] = (started, state)
+
+    async def control_device(self, sku: str, device: str, capability: dict, *args: Any, **kwargs: Any) -> dict | None:
+        """
+        Control a device.
+
+        :param sku: The SKU of the device
+        :param device: The device ID
+        :param capability: The capability to control
+        :return: The capability
+        """
+        # States fetched before the command no longer describe the device, nor do the requests fetching them
+        started = self._commanded[device] = time.monotonic()
+        self._states.pop(device, None)
+        self._requests.pop(device, None)
+        if self._lan_device(sku, device) and (command := lan_command(capability)):
+            try:
+                await self.lan.async_control(device, command)
+            except (TimeoutError, OSError) as e:
+                self.metrics.record(LAN_CONTROL, device, time.monotonic() - started, e)
+                _LOGGER.debug("No LAN reply from %s, falling back to the cloud: %s", device, e)
+                self.lan.async_forget(device)
+            else:
+                self.metrics.record(LAN_CONTROL, device, time.monotonic() - started, None)
+                return {**capability, "state": {"status": "success"}}
+
+        return await self._async_cloud(
+            CONTROL, device, RequestPriority.COMMAND, super().control_device(sku, device, capability, *args, **kwargs)
+        )
+
+    def _lan_device(self, sku: str, device: str) -> bool:
+        """
+        Return True if a device is reached over the LAN.
+
+        :param sku: The SKU of the device
+        :param device: The device ID
+        :return: bool
+        """
+        return (
+            self.lan is not None
+            and device in self.lan.devices
+            and (description := get_sku(sku)) is not None
+            and description.lan
+        )
+
+    async def _async_cloud[T](
+        self, endpoint: str, device: str | None, priority: RequestPriority, request: Coroutine[Any, Any, T]
+    ) -> T:
+        """
+        Make a cloud request once the scheduler gives it a slot.
+
+        The request is counted in the quota and metrics and its outcome is reported to the breaker. Its latency
+        is measured from when it is sent, not from when it started waiting.
+
+        :param endpoint: Endpoint of the request
+        :param device: Device ID the request is about, None for account requests
+        :param priority: Priority of the request
+        :param request: The request, not started yet
+        :return: The result of the request
+        """
+        try:
+            await self.scheduler.async_acquire(priority)
+        except asyncio.CancelledError:
+            request.close()
+            raise
+        try:
+            return await self._async_send(endpoint, device, priority, request)
+        finally:
+            self.scheduler.async_release(priority)
+
+    async def _async_send[T](
+        self, endpoint: str, device: str | None, priority: RequestPriority, request: Coroutine[Any, Any, T]
+    ) -> T:
+        """
+        Send a cloud request, counting it in the quota and metrics and reporting its outcome to the breaker.
+
+        Requests answered from the state cache or the LAN never get here, so only requests that reach the cloud
+        take from the daily budget.
+
+        :param endpoint: Endpoint of the request
+        :param device: Device ID the request is about, None for account requests
+        :param priority: Priority of the request
+        :param request: The request
+        :raises GoveeDeferredError: If the daily quota has no room for the request right now
+        :return: The result of the request
+        """
+        if self.quota is not None:
+            if not self.quota.async_acquire(priority):
+                request.close()
+                raise GoveeDeferredError
+            self.quota.async_record()
+        started = time.monotonic()
+        try:
+            result = await request
+        except CLOUD_ERRORS as e:
+            rate_limited = isinstance(e, GoveeUnavailableError) and e.status == HTTPStatus.TOO_MANY_REQUESTS
+            self.metrics.record(endpoint, device, time.monotonic() - started, e, rate_limited=rate_limited)
+            if self.breaker is not None:
+                self.breaker.async_failure(e)
+            raise
+        except Exception as e:
+            # The cloud answered, the request itself was refused
+            self.metrics.record(endpoint, device, time.monotonic() - started, e)
+            if self.breaker is not None:
+                self.breaker.async_success()
+            raise
+        self.metrics.record(endpoint, device, time.monotonic() - started, None)
+        if self.breaker is not None:
+            self.breaker.async_success()
+        return result
+
+    async def async_prewarm(self) -> None:
+        """
+        Open a connection to the Govee cloud so the first poll does not pay for DNS and TLS.
+
+        :return: None
+        """
+        try:
+            async with self.client.head("/", raise_for_status=False):
+                pass
+        except aiohttp.ClientError as e:
+            _LOGGER.debug("Unable to pre-warm connection to the Govee API: %s", e)
+
+    async def async_close(self) -> None:
+        """
+        Release the client, the shared connection pool stays open.
+
+        :return: None
+        """
+        await self.client.close()
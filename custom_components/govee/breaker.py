@@ -0,0 +1,95 @@
+"""Account-wide circuit breaker for the Govee integration."""
+
+from __future__ import annotations
+
+import logging
+import time
+from typing import TYPE_CHECKING
+
+from homeassistant.core import callback
+
+from .const import BREAKER_COOLDOWN, BREAKER_THRESHOLD, MAX_BACKOFF
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class GoveeCircuitBreaker:
+    """
+    Stop polling an account while the Govee cloud keeps failing.
+
+    The breaker trips after a number of consecutive failed requests. While it is tripped polling stops, except
+    for a single probe request once the cooldown has passed. The cooldown doubles with every failed probe, and
+    the first successful request closes the breaker again.
+    """
+
+    def __init__(self, on_trip: Callable[[], None]) -> None:
+        """
+        Initialize the circuit breaker.
+
+        :param on_trip: Called when the breaker trips
+        """
+        self.failures = 0
+        self._on_trip = on_trip
+        self._cooldown = BREAKER_COOLDOWN.total_seconds()
+        self._retry_at: float | None = None
+
+    @property
+    def tripped(self) -> bool:
+        """
+        Return True if polling is stopped.
+
+        :return: bool
+        """
+        return self._retry_at is not None
+
+    @callback
+    def async_allow_probe(self) -> bool:
+        """
+        Check whether a tripped breaker lets a probe request through, and reserve it.
+
+        :return: True if a probe should be made
+        """
+        if self._retry_at is None or time.monotonic() < self._retry_at:
+            return False
+        # Only one probe per cooldown, whatever its outcome
+        self._retry_at = time.monotonic() + self._cooldown
+        return True
+
+    @callback
+    def async_success(self) -> None:
+        """
+        Record a request the Govee cloud answered.
+
+        :return: None
+        """
+        if self._retry_at is not None:
+            _LOGGER.info("Govee cloud is reachable again, resuming polling")
+            self._retry_at = None
+            self._cooldown = BREAKER_COOLDOWN.total_seconds()
+        self.failures = 0
+
+    @callback
+    def async_failure(self, error: Exception) -> None:
+        """
+        Record a request that did not reach the Govee cloud or that it failed to answer.
+
+        :param error: Error of the request
+        :return: None
+        """
+        self.failures += 1
+        if self._retry_at is not None:
+            self._cooldown = min(self._cooldown * 2, MAX_BACKOFF.total_seconds())
+            self._retry_at = time.monotonic() + self._cooldown
+            return
+        if self.failures >= BREAKER_THRESHOLD:
+            _LOGGER.warning(
+                "Govee cloud failed %s requests in a row, pausing polling and probing every %ss: %s",
+                self.failures,
+                int(self._cooldown),
+                error,
+            )
+            self._retry_at = time.monotonic() + self._cooldown
+            self._on_trip()
@@ -0,0 +1,213 @@
+"""Device command queue for the Govee integration."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.core import callback
+from homeassistant.helpers.debounce import Debouncer
+
+from .api import request_priority
+from .const import COMMAND_DEBOUNCE, RequestPriority
+
+if TYPE_CHECKING:
+    from homeassistant.core import HomeAssistant
+
+    from .coordinator import GoveeDataUpdateCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+# Fan speed and preset are both sent as the work mode capability, so only the latest of the two is kept
+WORK_MODE = "work_mode"
+OSCILLATION = "oscillation"
+
+
+class GoveeCommandQueue:
+    """Merge rapid changes to a device and send only the final state."""
+
+    def __init__(self, hass: HomeAssistant, coordinator: GoveeDataUpdateCoordinator) -> None:
+        """
+        Initialize the command queue.
+
+        :param hass: Home Assistant instance
+        :param coordinator: Coordinator of the device
+        """
+        self._coordinator = coordinator
+        self._pending: dict[str, tuple[str, Any]] = {}
+        self._debouncer = Debouncer(
+            hass,
+            _LOGGER,
+            cooldown=COMMAND_DEBOUNCE,
+            immediate=False,
+            function=self._async_send,
+        )
+
+    @property
+    def pending(self) -> bool:
+        """
+        Return True if changes are waiting to be sent.
+
+        :return: bool
+        """
+        return bool(self._pending)
+
+    @callback
+    def async_set_fan_speed(self, fan_speed: int) -> None:
+        """
+        Queue a fan speed change and show it right away.
+
+        :param fan_speed: Fan speed in the device's range
+        :return: None
+        """
+        self._coordinator.device.fan_speed = fan_speed
+        self._queue(WORK_MODE, ("fan_speed", fan_speed))
+
+    @callback
+    def async_set_work_mode(self, work_mode: str) -> None:
+        """
+        Queue a preset change and show it right away.
+
+        :param work_mode: Work mode of the device
+        :return: None
+        """
+        self._coordinator.device.work_mode = work_mode
+        self._queue(WORK_MODE, ("work_mode", work_mode))
+
+    @callback
+    def async_set_oscillation(self, oscillation: bool) -> None:
+        """
+        Queue an oscillation change and show it right away.
+
+        :param oscillation: True to turn on oscillation, False to turn off
+        :return: None
+        """
+        self._coordinator.device.oscillation_toggle = oscillation
+        self._queue(OSCILLATION, ("oscillation_toggle", oscillation))
+
+    async def async_turn_on(self, fan_speed: int | None = None, work_mode: str | None = None) -> None:
+        """
+        Turn on the device with an optional fan speed or preset in a single round-trip.
+
+        Power and work mode are separate capabilities, so their commands are sent at the same time and the
+        confirmed state is taken from their responses. Fan speed and preset are both sent as the work mode,
+        so a preset takes precedence over a fan speed.
+
+        :param fan_speed: Optional fan speed in the device's range
+        :param work_mode: Optional work mode of the device
+        :return: None
+        """
+        device = self._coordinator.device
+        api = self._coordinator.api
+
+        commands = [device.turn_on(api)]
+        device.power_switch = True
+        if work_mode is not None:
+            commands.append(device.set_work_mode(api, work_mode))
+            device.work_mode = work_mode
+        elif fan_speed is not None:
+            commands.append(device.set_fan_speed(api, fan_speed))
+            device.fan_speed = fan_speed
+        if len(commands) > 1:
+            # The new work mode supersedes any queued speed or preset change
+            self._pending.pop(WORK_MODE, None)
+        self._coordinator.async_update_listeners()
+
+        try:
+            # The library reads the device state within some commands, those reads must not wait behind the command
+            with request_priority(RequestPriority.COMMAND):
+                await asyncio.gather(*commands)
+        except Exception:
+            await self._coordinator.async_request_refresh()
+            raise
+
+        # The power command was confirmed, while a state read made within the work mode command may predate it
+        device.power_switch = True
+        self._coordinator.async_burst()
+        self._coordinator.async_update_listeners()
+
+    async def async_turn_off(self) -> None:
+        """
+        Turn off the device, dropping the queued changes so none of them is sent after it.
+
+        :return: None
+        """
+        self._pending.clear()
+        self._debouncer.async_cancel()
+
+        device = self._coordinator.device
+        device.power_switch = False
+        self._coordinator.async_update_listeners()
+
+        try:
+            with request_priority(RequestPriority.COMMAND):
+                await device.turn_off(self._coordinator.api)
+        except Exception:
+            await self._coordinator.async_request_refresh()
+            raise
+
+        self._coordinator.async_burst()
+        self._coordinator.async_update_listeners()
+
+    @callback
+    def async_shutdown(self) -> None:
+        """
+        Drop pending changes and stop sending commands.
+
+        :return: None
+        """
+        self._pending.clear()
+        self._debouncer.async_shutdown()
+
+    @callback
+    def _queue(self, key: str, change: tuple[str, Any]) -> None:
+        """
+        Replace any pending change for the same capability and schedule the send.
+
+        :param key: Capability the change is sent as
+        :param change: Name and value of the change
+        :return: None
+        """
+        self._pending.pop(key, None)
+        self._pending[key] = change
+        self._coordinator.async_update_listeners()
+        self._debouncer.async_schedule_call()
+
+    async def _async_send(self) -> None:
+        """
+        Send the pending changes, in the order they were last made.
+
+        Changes made while these are sent stay on show over the confirmed state and are sent next.
+
+        :return: None
+        """
+        pending = list(self._pending.values())
+        self._pending.clear()
+
+        device = self._coordinator.device
+        api = self._coordinator.api
+        try:
+            with request_priority(RequestPriority.COMMAND):
+                for name, value in pending:
+                    match name:
+                        case "fan_speed":
+                            await device.set_fan_speed(api, value)
+                        case "work_mode":
+                            await device.set_work_mode(api, value)
+                        case "oscillation_toggle":
+                            await device.toggle_oscillation(api, value)
+        except Exception as e:
+            # Drop the optimistic state and show what the device actually does
+            _LOGGER.exception("Error sending command to %s", device.device_id, exc_info=e)
+            await self._coordinator.async_request_refresh()
+        else:
+            self._coordinator.async_burst()
+
+        if self._pending:
+            # The responses only confirmed the changes that were sent
+            for name, value in self._pending.values():
+                setattr(device, name, value)
+            # The debouncer drops calls scheduled while it runs, so the send is scheduled again
+            self._debouncer.async_schedule_call()
+        self._coordinator.async_update_listeners()
@@ -1,29 +1,95 @@
 """Config flow for Govee integration."""
 
 import logging
+import time
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
 from typing import Any
 
 import homeassistant.helpers.config_validation as cv
 import voluptuous as vol
-from devices.air_purifier.h7126 import H7126
-from devices.fan.h7102 import H7102
-from devices.thermometer.h5179 import H5179
 from homeassistant import config_entries
 from homeassistant.config_entries import ConfigFlowResult
-from homeassistant.const import CONF_API_KEY, CONF_DEVICE_ID, CONF_NAME
-from util.govee_api import GoveeAPI
-
-supported_skus = ["H7126", "H7102", "H5179"]
+from homeassistant.const import CONF_API_KEY, CONF_DEVICE_ID, CONF_DEVICES, CONF_NAME, CONF_SCAN_INTERVAL
+from homeassistant.core import HomeAssistant, callback
+
+from .api import GoveeClient, account_id, request_priority
+from .const import (
+    ATTRIBUTE_MAX_AGE,
+    CONF_HEARTBEAT,
+    CONF_HUMIDITY_DEADBAND,
+    CONF_LAN,
+    CONF_MAX_AGE,
+    CONF_PUSH,
+    CONF_RELATIVE_DEADBAND,
+    CONF_STALE_LIMIT,
+    CONF_TEMPERATURE_DEADBAND,
+    DATA_ACCOUNTS,
+    DATA_DEVICE_CACHE,
+    DEFAULT_HEARTBEAT,
+    DEFAULT_STALE_LIMIT,
+    DEVICE_CACHE_TTL,
+    DOMAIN,
+    ENTRY_VERSION,
+    MIN_SCAN_INTERVAL,
+    SCAN_INTERVAL,
+    RequestPriority,
+)
+from .registry import SKUS, get_sku
 
 _LOGGER = logging.getLogger(__name__)
 
 
+@asynccontextmanager
+async def _async_client(hass: HomeAssistant, api_key: str) -> AsyncIterator[GoveeClient]:
+    """
+    Yield the client of an already set up account, or a temporary client for the flow.
+
+    :param hass: Home Assistant instance
+    :param api_key: Govee API key
+    :return: GoveeClient
+    """
+    if (account := hass.data.get(DOMAIN, {}).get(DATA_ACCOUNTS, {}).get(api_key)) is not None:
+        yield account.api
+        return
+
+    api = GoveeClient(hass, api_key)
+    try:
+        yield api
+    finally:
+        await api.async_close()
+
+
+async def _async_get_devices(hass: HomeAssistant, api_key: str) -> list[dict]:
+    """
+    Return the devices of an account, reusing a list fetched within the cache TTL.
+
+    :param hass: Home Assistant instance
+    :param api_key: Govee API key
+    :return: list of devices
+    """
+    cache: dict[str, tuple[float, list[dict]]] = hass.data.setdefault(DOMAIN, {}).setdefault(DATA_DEVICE_CACHE, {})
+    if (cached := cache.get(api_key)) is not None and time.monotonic() - cached[0] < DEVICE_CACHE_TTL.total_seconds():
+        return cached[1]
+
+    async with _async_client(hass, api_key) as api, request_priority(RequestPriority.SETUP):
+        devices = await api.get_devices()
+    cache[api_key] = (time.monotonic(), devices)
+    return devices
+
+
 class GoveeConfigFlow(config_entries.ConfigFlow, domain="govee"):
     """Config flow for Govee."""
 
-    VERSION = 1
+    VERSION = ENTRY_VERSION
     MINOR_VERSION = 1
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(_config_entry: config_entries.ConfigEntry) -> config_entries.OptionsFlow:
+        """Get the options flow for this handler."""
+        return GoveeOptionsFlow()
+
     def __init__(self) -> None:
         """Initialize the config flow."""
         self.api_key = None
@@ -39,25 +105,15 @@ class GoveeConfigFlow(config_entries.ConfigFlow, domain="govee"):
 
             try:
                 # Call API to get devices
-                api = GoveeAPI(api_key)
-                devices = await api.get_devices()
+                devices = await _async_get_devices(self.hass, api_key)
 
                 # Filter devices to only include supported devices
-                self.discovered_devices = [device for device in devices if device["sku"] in supported_skus]
-
-                # Filter out devices that are already configured
-                current_ids = {
-                    entry.unique_id for entry in self._async_current_entries() if entry.unique_id is not None
-                }
-
-                self.discovered_devices = [
-                    device for device in self.discovered_devices if device["device"] not in current_ids
-                ]
+                self.discovered_devices = [device for device in devices if device["sku"] in SKUS]
 
                 if not self.discovered_devices:
                     errors["base"] = "no_devices_found"
                 else:
-                    return await self.async_step_select_device()
+                    return await self.async_step_select_devices()
             except Exception as e:
                 errors["base"] = "cannot_connect"
                 _LOGGER.exception("Error connecting to Govee API", exc_info=e)
@@ -72,47 +128,48 @@ class GoveeConfigFlow(config_entries.ConfigFlow, domain="govee"):
             errors=errors,
         )
 
-    async def async_step_select_device(self, user_input: dict[str, Any] | None = None) -> ConfigFlowResult:
-        """Handle single device selection step."""
+    async def async_step_select_devices(self, user_input: dict[str, Any] | None = None) -> ConfigFlowResult:
+        """Handle device selection step, the account entry holds every selected device."""
         errors = {}
 
         if user_input is not None:
-            device_id = user_input[CONF_DEVICE_ID]
-            device_info = next((d for d in self.discovered_devices if d["device"] == device_id), None)
+            device_ids = user_input[CONF_DEVICES]
+            selected = [d for d in self.discovered_devices if d["device"] in device_ids]
 
-            if not device_info:
+            if not selected or len(selected) != len(device_ids):
                 errors["base"] = "invalid_device_selected"
             else:
-                # Set unique ID for this device
-                await self.async_set_unique_id(device_id)
-                self._abort_if_unique_id_configured()
-
-                # Map SKU to device type
-                device_type = device_info["sku"].lower()
-
-                # Create entry for this device
-                title = f"Govee {device_info['deviceName']}"
                 data = {
-                    CONF_DEVICE_ID: device_id,
                     CONF_API_KEY: self.api_key,
-                    CONF_NAME: device_type,
+                    CONF_DEVICES: [
+                        # Map SKU to device type
+                        {CONF_DEVICE_ID: d["device"], CONF_NAME: d["sku"].lower()}
+                        for d in selected
+                    ],
                 }
 
-                return self.async_create_entry(title=title, data=data)
+                # An account that is already set up gets its device list replaced
+                await self.async_set_unique_id(account_id(self.api_key))
+                self._abort_if_unique_id_configured(updates=data)
+
+                return self.async_create_entry(title="Govee", data=data)
 
         # Create a list of devices for selection
         device_options = {
             d["device"]: f"{d['deviceName']} - {d['sku']} ({d['device']})" for d in self.discovered_devices
         }
 
-        if not device_options:
-            return self.async_abort(reason="no_unconfigured_devices")
+        # Preselect the devices of an existing account, or every device of a new one
+        default = list(device_options)
+        if entry := self.hass.config_entries.async_entry_for_domain_unique_id(DOMAIN, account_id(self.api_key)):
+            configured = {d[CONF_DEVICE_ID] for d in entry.data[CONF_DEVICES]}
+            default = [device_id for device_id in device_options if device_id in configured]
 
         return self.async_show_form(
-            step_id="select_device",
+            step_id="select_devices",
             data_schema=vol.Schema(
                 {
-                    vol.Required(CONF_DEVICE_ID): vol.In(device_options),
+                    vol.Required(CONF_DEVICES, default=default): cv.multi_select(device_options),
                 }
             ),
             errors=errors,
@@ -126,14 +183,14 @@ class GoveeConfigFlow(config_entries.ConfigFlow, domain="govee"):
                 {
                     vol.Required(CONF_DEVICE_ID): cv.string,
                     vol.Required(CONF_API_KEY): cv.string,
-                    vol.Required(CONF_NAME, default="h7126"): vol.In(["h7126", "h7102", "h5179"]),
+                    vol.Required(CONF_NAME, default="h7126"): vol.In([sku.lower() for sku in SKUS]),
                 }
             ),
             errors=errors or {},
         )
 
     async def async_step_manual(self, user_input: dict[str, Any] | None = None) -> ConfigFlowResult:
-        """Handle manual device configuration."""
+        """Handle manual device configuration, the device is added to the entry of its account."""
         if user_input is None:
             return await self._show_setup_form()
 
@@ -143,35 +200,70 @@ class GoveeConfigFlow(config_entries.ConfigFlow, domain="govee"):
         api_key = user_input.get(CONF_API_KEY)
         name = user_input.get(CONF_NAME).lower()
 
+        if (description := get_sku(name)) is None:
+            errors["base"] = "unknown_device"
+            return await self._show_setup_form(errors)
+        device = await description.async_create_device(self.hass, device_id)
+
         try:
-            # Check if this device is already configured
-            await self.async_set_unique_id(device_id)
-            self._abort_if_unique_id_configured()
-
-            api = GoveeAPI(api_key)
-
-            match name:
-                case "h7126":
-                    device = H7126(device_id)
-                case "h7102":
-                    device = H7102(device_id)
-                case "h5179":
-                    device = H5179(device_id)
-                case _:
-                    errors["base"] = "unknown_device"
-                    return await self._show_setup_form(errors)
-
-            await device.update(api)
-
-            return self.async_create_entry(
-                title=f"Govee {device.device_name}",
-                data={
-                    CONF_DEVICE_ID: device_id,
-                    CONF_API_KEY: api_key,
-                    CONF_NAME: name,
-                },
-            )
+            async with _async_client(self.hass, api_key) as api:
+                await device.update(api)
         except Exception as e:
             errors["base"] = "cannot_connect"
             _LOGGER.exception("Error connecting to Govee API", exc_info=e)
             return await self._show_setup_form(errors)
+
+        devices = [{CONF_DEVICE_ID: device_id, CONF_NAME: name}]
+        await self.async_set_unique_id(account_id(api_key))
+        if entry := self.hass.config_entries.async_entry_for_domain_unique_id(DOMAIN, account_id(api_key)):
+            # Check if this device is already configured
+            if any(d[CONF_DEVICE_ID] == device_id for d in entry.data[CONF_DEVICES]):
+                return self.async_abort(reason="already_configured")
+            devices = [*entry.data[CONF_DEVICES], *devices]
+        self._abort_if_unique_id_configured(updates={CONF_API_KEY: api_key, CONF_DEVICES: devices})
+
+        return self.async_create_entry(title="Govee", data={CONF_API_KEY: api_key, CONF_DEVICES: devices})
+
+
+class GoveeOptionsFlow(config_entries.OptionsFlow):
+    """Options flow for Govee."""
+
+    async def async_step_init(self, user_input: dict[str, Any] | None = None) -> ConfigFlowResult:
+        """Manage the options."""
+        if user_input is not None:
+            return self.async_create_entry(data=user_input)
+
+        options = self.config_entry.options
+        # LAN control is only offered once a configured device answers the LAN API
+        lan = any(
+            (description := get_sku(device[CONF_NAME])) is not None and description.lan
+            for device in self.config_entry.data[CONF_DEVICES]
+        )
+        deadband = vol.All(vol.Coerce(float), vol.Range(min=0))
+        minutes = vol.All(vol.Coerce(int), vol.Range(min=1))
+        return self.async_show_form(
+            step_id="init",
+            data_schema=vol.Schema(
+                {
+                    vol.Required(CONF_PUSH, default=options.get(CONF_PUSH, False)): cv.boolean,
+                    **({vol.Required(CONF_LAN, default=options.get(CONF_LAN, False)): cv.boolean} if lan else {}),
+                    vol.Required(
+                        CONF_SCAN_INTERVAL, default=options.get(CONF_SCAN_INTERVAL, int(SCAN_INTERVAL.total_seconds()))
+                    ): vol.All(vol.Coerce(int), vol.Range(min=int(MIN_SCAN_INTERVAL.total_seconds()))),
+                    vol.Required(
+                        CONF_TEMPERATURE_DEADBAND, default=options.get(CONF_TEMPERATURE_DEADBAND, 0)
+                    ): deadband,
+                    vol.Required(CONF_HUMIDITY_DEADBAND, default=options.get(CONF_HUMIDITY_DEADBAND, 0)): deadband,
+                    vol.Required(CONF_RELATIVE_DEADBAND, default=options.get(CONF_RELATIVE_DEADBAND, 0)): deadband,
+                    vol.Required(CONF_HEARTBEAT, default=options.get(CONF_HEARTBEAT, DEFAULT_HEARTBEAT)): minutes,
+                    **{
+                        vol.Required(
+                            CONF_MAX_AGE.format(key),
+                            default=options.get(CONF_MAX_AGE.format(key), int(max_age.total_seconds() // 60)),
+                        ): minutes
+                        for key, max_age in ATTRIBUTE_MAX_AGE.items()
+                    },
+                    vol.Required(CONF_STALE_LIMIT, default=options.get(CONF_STALE_LIMIT, DEFAULT_STALE_LIMIT)): minutes,
+                }
+            ),
+        )
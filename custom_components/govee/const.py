@@ -1,3 +1,131 @@
 """Constants for the Govee integration."""
 
+from datetime import timedelta
+from enum import IntEnum
+
 DOMAIN = "govee"
+
+# Version 1 entries held a single device, version 2 entries hold every device of an API key
+ENTRY_VERSION = 2
+
+# Key in hass.data[DOMAIN] holding the account schedulers, keyed by API key
+DATA_ACCOUNTS = "accounts"
+
+# Key in hass.data[DOMAIN] holding the device lists fetched by the config flow, keyed by API key
+DATA_DEVICE_CACHE = "device_cache"
+
+# How long the config flow reuses a fetched device list
+DEVICE_CACHE_TTL = timedelta(minutes=5)
+
+# Option that enables push updates from the Govee OpenAPI MQTT feed
+CONF_PUSH = "push"
+
+# Option that enables local LAN control and status for devices that support it
+CONF_LAN = "lan"
+
+# Options suppressing temperature and humidity readings that differ from the last published value by no more
+# than an absolute deadband (in the sensor's unit) or a relative one (in percent of the published value),
+# unless the sensor has been silent for longer than the heartbeat (in minutes). A deadband of 0 disables it.
+CONF_TEMPERATURE_DEADBAND = "temperature_deadband"
+CONF_HUMIDITY_DEADBAND = "humidity_deadband"
+CONF_RELATIVE_DEADBAND = "relative_deadband"
+CONF_HEARTBEAT = "heartbeat"
+DEFAULT_HEARTBEAT = 60
+
+# Option holding the age in minutes past which the last known values of a device are no longer shown and its
+# entities go unavailable. Until then failed polls keep serving them.
+CONF_STALE_LIMIT = "stale_limit"
+DEFAULT_STALE_LIMIT = 60
+
+# Longest each device value is served before the device is refreshed for it in the background, and the option
+# (in minutes) overriding it. Values not listed here follow the device's poll schedule.
+CONF_MAX_AGE = "max_age_{}"
+ATTRIBUTE_MAX_AGE: dict[str, timedelta] = {
+    "air_quality": timedelta(minutes=2),
+    "filter_life": timedelta(hours=6),
+    "device_name": timedelta(days=1),
+}
+
+# Default base poll interval of a device, matches the default scan interval Home Assistant used for the polling
+# entities. It can be changed with the scan_interval option.
+SCAN_INTERVAL = timedelta(seconds=30)
+
+# Shortest base poll interval the options flow accepts
+MIN_SCAN_INTERVAL = timedelta(seconds=10)
+
+# How often the account scheduler looks for devices that are due for a poll
+POLL_TICK = timedelta(seconds=5)
+
+# Poll interval of a device for a while after it was sent a command, so its confirmed state shows up quickly
+BURST_INTERVAL = timedelta(seconds=5)
+BURST_DURATION = timedelta(minutes=1)
+
+# Longest interval offline or unreachable devices back off to, doubling the base interval on every failed poll
+MAX_BACKOFF = timedelta(minutes=30)
+
+# Consecutive failed cloud requests after which an account stops polling, and how long it waits before probing
+# the cloud with a single request. The wait doubles with every failed probe, up to MAX_BACKOFF.
+BREAKER_THRESHOLD = 5
+BREAKER_COOLDOWN = timedelta(seconds=30)
+
+# Largest multiple of the base interval sensors whose readings did not change slow down to
+STEADY_MAX_FACTOR = 4
+
+# Interval of the consistency poll while push updates are received
+PUSH_SCAN_INTERVAL = timedelta(minutes=10)
+
+# Govee OpenAPI MQTT broker, the topic of an account is GA/<API key>
+MQTT_HOST = "mqtt.openapi.govee.com"
+MQTT_PORT = 8883
+
+# Govee LAN API: scans go to the multicast group, devices answer on the listen port and take commands on the
+# control port
+LAN_MULTICAST_ADDRESS = "239.255.255.250"
+LAN_SCAN_PORT = 4001
+LAN_LISTEN_PORT = 4002
+LAN_CONTROL_PORT = 4003
+
+# Seconds to wait for a device to answer over the LAN before falling back to the cloud
+LAN_TIMEOUT = 2
+
+# Seconds a fetched device state is served to further callers without asking the device again
+STATE_FRESHNESS = 2
+
+# Maximum number of cloud requests an account has in flight at once
+MAX_CONCURRENT_REQUESTS = 5
+
+# Requests per day the Govee OpenAPI allows for an account
+DAILY_QUOTA = 10000
+
+# Requests per day held back from polling so user commands keep working
+QUOTA_COMMAND_RESERVE = 500
+
+# Share of the daily quota below which background polls are shed
+QUOTA_LOW_FRACTION = 0.2
+
+# Maximum number of polls the token bucket lets through in a burst
+QUOTA_BURST = 10
+
+# Window the request rate of the quota exhaustion forecast is measured over
+QUOTA_RATE_WINDOW = timedelta(hours=1)
+
+# Delay in seconds before the request counts are written to storage
+QUOTA_SAVE_DELAY = 60
+
+# Window in seconds in which fan speed, preset and oscillation changes are merged into one command
+COMMAND_DEBOUNCE = 0.5
+
+# Delay in seconds before device snapshots are written to storage
+SNAPSHOT_SAVE_DELAY = 300
+
+STORAGE_VERSION = 1
+
+
+class RequestPriority(IntEnum):
+    """Priority of a cloud request, lower values are more important."""
+
+    COMMAND = 0
+    # First fetch of a device that has no state to show yet, and the device list of the config flow
+    SETUP = 1
+    POLL = 2
+    BACKGROUND = 3
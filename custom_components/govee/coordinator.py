@@ -0,0 +1,619 @@
+"""Data update coordinator for the Govee integration."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from datetime import timedelta
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.const import Platform
+from homeassistant.core import callback
+from homeassistant.helpers.event import async_call_later, async_track_time_interval
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+from homeassistant.util import dt as dt_util
+
+from .api import CLOUD_ERRORS, GoveeClient, GoveeDeferredError, account_id, request_priority
+from .breaker import GoveeCircuitBreaker
+from .commands import GoveeCommandQueue
+from .const import (
+    ATTRIBUTE_MAX_AGE,
+    BREAKER_THRESHOLD,
+    BURST_DURATION,
+    BURST_INTERVAL,
+    CONF_MAX_AGE,
+    CONF_STALE_LIMIT,
+    DEFAULT_STALE_LIMIT,
+    DOMAIN,
+    MAX_BACKOFF,
+    POLL_TICK,
+    PUSH_SCAN_INTERVAL,
+    SCAN_INTERVAL,
+    STEADY_MAX_FACTOR,
+    RequestPriority,
+)
+from .lan import GoveeLan
+from .metrics import LoopLagProbe
+from .push import GoveePushClient, apply_capabilities
+from .quota import GoveeQuota
+from .registry import get_sku
+from .snapshot import GoveeSnapshots, device_snapshot
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable
+    from datetime import datetime
+
+    from devices.air_purifier.h7126 import H7126
+    from devices.fan.h7102 import H7102
+    from devices.thermometer.h5179 import H5179
+    from homeassistant.config_entries import ConfigEntry
+    from homeassistant.core import HomeAssistant
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class GoveeRefreshLogger(logging.LoggerAdapter[logging.Logger]):
+    """
+    Log the refreshes of a device, lowered to debug while its failures are part of an outage of the cloud.
+
+    The circuit breaker reports an outage once for the whole account, when it trips and when the cloud answers
+    again, so the failure and recovery of every single device would only repeat it.
+    """
+
+    def __init__(self, logger: logging.Logger) -> None:
+        """
+        Initialize the logger.
+
+        :param logger: Logger to write to
+        """
+        super().__init__(logger)
+        self.quiet = False
+
+    def log(self, level: int, msg: object, *args: object, **kwargs: Any) -> None:
+        """
+        Log a message, at debug level while quiet.
+
+        :param level: Level of the message
+        :param msg: Message
+        :return: None
+        """
+        super().log(logging.DEBUG if self.quiet and level > logging.DEBUG else level, msg, *args, **kwargs)
+
+
+class GoveeAccount:
+    """Poll every device of a Govee account from a single scheduler."""
+
+    def __init__(self, hass: HomeAssistant, api_key: str) -> None:
+        """
+        Initialize the account.
+
+        :param hass: Home Assistant instance
+        :param api_key: Govee API key of the account
+        """
+        self.hass = hass
+        self.api_key = api_key
+        self.quota = GoveeQuota(hass, account_id(api_key))
+        self.snapshots = GoveeSnapshots(hass, account_id(api_key))
+        self.breaker = GoveeCircuitBreaker(self._async_tripped)
+        self.api = GoveeClient(hass, api_key, self.quota, self.breaker)
+        self.coordinators: dict[str, GoveeDataUpdateCoordinator] = {}
+        self.push: GoveePushClient | None = None
+        # Base poll interval of the account's devices, each device adapts it to its own activity
+        self.scan_interval = SCAN_INTERVAL
+        self._polling = False
+        self._listeners: list[Callable[[], None]] = []
+        self._setup_task: asyncio.Task[None] | None = None
+        self._unsub_poll: Callable[[], None] | None = None
+        # The event loop lag shows whether slow polls are the cloud's fault or Home Assistant's
+        self._loop_probe = LoopLagProbe(hass.loop, self.api.metrics)
+
+    async def async_setup(self) -> None:
+        """
+        Restore the account's request count and device snapshots and open a connection to the cloud.
+
+        Entries of the same account set up concurrently all wait on the same setup, so the count is restored
+        before any of them makes a request.
+
+        :return: None
+        """
+        if self._setup_task is None:
+            self._setup_task = self.hass.async_create_task(self._async_setup(), eager_start=True)
+        await self._setup_task
+
+    async def _async_setup(self) -> None:
+        """
+        Restore the stored state and pre-warm the client at the same time.
+
+        :return: None
+        """
+        await asyncio.gather(self.quota.async_load(), self.snapshots.async_load(), self.api.async_prewarm())
+
+    async def async_enable_push(self) -> None:
+        """
+        Subscribe to the account's MQTT event feed, polling slows down while it is healthy.
+
+        :return: None
+        """
+        if self.push is None:
+            self.push = GoveePushClient(self.hass, self.api_key, self._async_handle_event)
+            await self.push.async_start()
+
+    async def async_enable_lan(self) -> None:
+        """
+        Use the local LAN API for devices that answer on the network, the cloud stays the fallback.
+
+        Nothing is started unless a device of the account has a SKU that speaks the LAN API.
+
+        :return: None
+        """
+        if self.api.lan is not None:
+            return
+        if not any(get_sku(c.device.sku).lan for c in self.coordinators.values()):
+            _LOGGER.debug("No device of the account speaks the LAN API, using the cloud only")
+            return
+        lan = GoveeLan(self.hass)
+        try:
+            await lan.async_start()
+        except OSError as e:
+            _LOGGER.warning("Unable to listen for Govee devices on the LAN, using the cloud only: %s", e)
+            return
+        self.api.lan = lan
+
+    @callback
+    def _async_handle_event(self, event: dict) -> None:
+        """
+        Apply a push event to the device it is about.
+
+        :param event: Event from the MQTT feed
+        :return: None
+        """
+        if (coordinator := self.coordinators.get(event.get("device", ""))) is None:
+            return
+        before = device_snapshot(coordinator.device)
+        if not (applied := apply_capabilities(coordinator.device, event.get("capabilities", []))):
+            return
+        coordinator.pushed |= applied
+        coordinator.async_touch(applied)
+        if device_snapshot(coordinator.device) != before:
+            self.snapshots.async_update(coordinator.device, coordinator.updated_at)
+            coordinator.async_set_updated_data(coordinator.device)
+
+    @callback
+    def _async_tripped(self) -> None:
+        """
+        Mark the last update of every device of the account as failed when the circuit breaker trips.
+
+        The breaker already logged the outage, so the devices are marked without logging an error each. Their
+        entities keep serving the last known values until these outlive the stale limit.
+
+        :return: None
+        """
+        for coordinator in self.coordinators.values():
+            coordinator.async_set_outage()
+
+    async def async_fetch(self, device: H7126 | H7102 | H5179, priority: RequestPriority) -> bool:
+        """
+        Fetch the state of a device, its cloud request waits for a slot behind any queued commands.
+
+        :param device: Device instance to update
+        :param priority: Priority of the poll
+        :raises UpdateFailed: If the Govee cloud could not be reached
+        :return: False if the poll was deferred to fit into the daily quota
+        """
+        online = device.online
+        with request_priority(priority):
+            await device.update(self.api)
+        if (error := self.api.errors.get(device.device_id)) is not None:
+            # A failed or deferred request does not mean the device went offline
+            device.online = online
+            if isinstance(error, GoveeDeferredError):
+                return False
+            msg = f"Error fetching state of {device.device_id}: {error}"
+            raise UpdateFailed(msg) from error
+        return True
+
+    @callback
+    def async_add_coordinator(self, coordinator: GoveeDataUpdateCoordinator) -> None:
+        """
+        Register a device coordinator with the account scheduler.
+
+        :param coordinator: Coordinator of the device
+        :return: None
+        """
+        self.coordinators[coordinator.device.device_id] = coordinator
+        if self._unsub_poll is None:
+            self._unsub_poll = async_track_time_interval(
+                self.hass, self.async_poll, POLL_TICK, name=f"{DOMAIN} account poll", cancel_on_shutdown=True
+            )
+            self._loop_probe.async_start()
+
+    @callback
+    def async_remove_coordinator(self, coordinator: GoveeDataUpdateCoordinator) -> bool:
+        """
+        Remove a device coordinator from the account scheduler.
+
+        :param coordinator: Coordinator of the device
+        :return: True if the account has no devices left
+        """
+        self.coordinators.pop(coordinator.device.device_id, None)
+        if self.coordinators:
+            return False
+        self.async_shutdown()
+        return True
+
+    @callback
+    def async_shutdown(self) -> None:
+        """
+        Stop polling the account.
+
+        :return: None
+        """
+        if self._unsub_poll is not None:
+            self._unsub_poll()
+            self._unsub_poll = None
+        self._loop_probe.async_stop()
+
+    @callback
+    def async_add_listener(self, update_callback: Callable[[], None]) -> Callable[[], None]:
+        """
+        Listen for changes to the account's request accounting, called after every poll.
+
+        :param update_callback: Called after a poll of the account
+        :return: Callable that removes the listener
+        """
+        self._listeners.append(update_callback)
+
+        @callback
+        def remove_listener() -> None:
+            self._listeners.remove(update_callback)
+
+        return remove_listener
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """
+        Notify the account's listeners.
+
+        :return: None
+        """
+        for update_callback in list(self._listeners):
+            update_callback()
+
+    async def async_close(self) -> None:
+        """
+        Stop polling the account, persist its request count and snapshots and release its API client.
+
+        :return: None
+        """
+        self.async_shutdown()
+        if self.push is not None:
+            await self.push.async_stop()
+        if self.api.lan is not None:
+            self.api.lan.async_stop()
+        await asyncio.gather(self.quota.async_save(), self.snapshots.async_save())
+        await self.api.async_close()
+
+    async def async_poll(self, now: datetime) -> None:
+        """
+        Refresh the devices of the account that are due for a poll.
+
+        :param now: Time of the poll
+        :return: None
+        """
+        if self._polling:
+            _LOGGER.debug("Previous poll of the account is still running, skipping")
+            return
+        if self.breaker.tripped:
+            if not self.coordinators or not self.breaker.async_allow_probe():
+                return
+            # A single request tells whether the cloud is back, the other devices wait for its outcome
+            due = [min(self.coordinators.values(), key=lambda c: c.next_poll)]
+        elif not (due := [c for c in self.coordinators.values() if c.next_poll <= now]):
+            return
+        elif self.api.scheduler.commands:
+            _LOGGER.debug("Commands are in flight, deferring %s polls to the next tick", len(due))
+            return
+        self._polling = True
+        if self.api.lan is not None:
+            # Pick up devices that joined the network or changed address since the last poll
+            self.api.lan.async_scan()
+        try:
+            # Devices with queued commands are polled on a later tick so the poll does not overwrite their
+            # optimistic state. Polls the daily quota has no room for are deferred by the client.
+            polls = [
+                coordinator
+                for coordinator in sorted(due, key=lambda c: c.poll_priority)
+                if not coordinator.commands.pending
+            ]
+            await asyncio.gather(*(coordinator.async_refresh() for coordinator in polls))
+        finally:
+            self._polling = False
+            self.async_update_listeners()
+
+
+class GoveeDataUpdateCoordinator(DataUpdateCoordinator["H7126 | H7102 | H5179"]):
+    """Hold the state of a single Govee device for all of its entities."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry: ConfigEntry,
+        account: GoveeAccount,
+        device: H7126 | H7102 | H5179,
+    ) -> None:
+        """
+        Initialize the coordinator.
+
+        The account scheduler drives the refreshes, so the coordinator has no update interval of its own.
+
+        :param hass: Home Assistant instance
+        :param entry: Config entry of the device
+        :param account: Account the device belongs to
+        :param device: Device instance (H7126, H7102 or H5179)
+        """
+        self._logger = GoveeRefreshLogger(_LOGGER)
+        super().__init__(
+            hass,
+            self._logger,
+            config_entry=entry,
+            name=f"{DOMAIN} {device.device_id}",
+        )
+        self.account = account
+        self.device = device
+        self.commands = GoveeCommandQueue(hass, self)
+        # Device values the listeners were last notified of, and the ones that changed in that notification
+        self._snapshot = device_snapshot(device)
+        self.changed: frozenset[str] = frozenset(self._snapshot)
+        # Adaptive poll schedule of the device
+        self.next_poll = dt_util.utcnow()
+        self._failures = 0
+        self._steady = 0
+        self._burst_until: datetime | None = None
+        # Devices that can be controlled keep the base interval so changes made on the device show up
+        self._slow_when_steady = Platform.FAN not in get_sku(device.sku).platforms
+        # Device values the entities are built from, and the ones that arrived over the push feed
+        self.watched: set[str] = set()
+        self.pushed: set[str] = set()
+        # When each device value was last confirmed by the device, and the timer marking the oldest stale
+        self.updated_at: dict[str, datetime] = {}
+        self._stale_limit = timedelta(minutes=entry.options.get(CONF_STALE_LIMIT, DEFAULT_STALE_LIMIT))
+        self._max_age = {
+            key: timedelta(minutes=entry.options.get(CONF_MAX_AGE.format(key), max_age.total_seconds() / 60))
+            for key, max_age in ATTRIBUTE_MAX_AGE.items()
+        }
+        self._unsub_stale: Callable[[], None] | None = None
+
+    @property
+    def api(self) -> GoveeClient:
+        """
+        Return the Govee API client of the account.
+
+        :return: GoveeClient
+        """
+        return self.account.api
+
+    @property
+    def poll_priority(self) -> RequestPriority:
+        """
+        Return the priority of the device's polls.
+
+        A device that was never fetched has nothing to show until its first poll, which is not paced by
+        the quota. Devices that are offline or switched off only have slow-moving values such as filter
+        life to report, so their polls are shed first when the quota runs low.
+
+        :return: RequestPriority
+        """
+        if not self.updated_at:
+            return RequestPriority.SETUP
+        if not self.device.online or getattr(self.device, "power_switch", True) is False:
+            return RequestPriority.BACKGROUND
+        return RequestPriority.POLL
+
+    @property
+    def poll_interval(self) -> timedelta:
+        """
+        Return the interval until the next poll of the device.
+
+        Devices that were just sent a command are polled quickly, offline or unreachable devices back off
+        exponentially and sensors whose readings did not change slow down. While the push feed delivers every
+        value the device's entities are built from, polls only check for missed events.
+
+        :return: timedelta
+        """
+        if self._burst_until is not None and dt_util.utcnow() < self._burst_until:
+            return BURST_INTERVAL
+        base = self.account.scan_interval
+        if self._failures:
+            interval = min(base * 2**self._failures, MAX_BACKOFF)
+        elif self._slow_when_steady:
+            interval = base * min(2**self._steady, STEADY_MAX_FACTOR)
+        else:
+            interval = base
+        if self.account.push is not None and self.account.push.connected and self.watched <= self.pushed:
+            # Only values the feed actually delivers are left to it, anything else keeps being polled
+            interval = max(interval, PUSH_SCAN_INTERVAL)
+        return interval
+
+    @property
+    def expires_at(self) -> datetime | None:
+        """
+        Return when the first device value listed in the max age table outlives its max age.
+
+        :return: datetime or None if the device has no such value
+        """
+        return min(
+            (
+                self.updated_at.get(key, dt_util.utcnow()) + max_age
+                for key, max_age in self._max_age.items()
+                if key in self._snapshot
+            ),
+            default=None,
+        )
+
+    def is_expired(self, keys: Iterable[str]) -> bool:
+        """
+        Return True if any of the device values outlived its max age, the base interval for unlisted values.
+
+        :param keys: Device values to check
+        :return: bool
+        """
+        now = dt_util.utcnow()
+        return any(
+            (updated_at := self.updated_at.get(key)) is not None
+            and now - updated_at >= self._max_age.get(key, self.account.scan_interval)
+            for key in keys
+        )
+
+    def is_stale(self, keys: Iterable[str]) -> bool:
+        """
+        Return True if any of the device values is older than the stale limit and no longer shown.
+
+        :param keys: Device values to check
+        :return: bool
+        """
+        cutoff = dt_util.utcnow() - self._stale_limit
+        return any((updated_at := self.updated_at.get(key)) is not None and updated_at <= cutoff for key in keys)
+
+    @callback
+    def async_set_outage(self) -> None:
+        """
+        Mark the last update as failed by an outage of the cloud, without logging the failure or the recovery.
+
+        :return: None
+        """
+        self._logger.quiet = True
+        if self.last_update_success:
+            self.last_update_success = False
+            self.async_update_listeners()
+
+    @callback
+    def async_touch(self, keys: Iterable[str]) -> None:
+        """
+        Record that device values were just confirmed by the device.
+
+        :param keys: Device values that were confirmed
+        :return: None
+        """
+        self.updated_at.update(dict.fromkeys(keys, dt_util.utcnow()))
+        self._async_schedule_stale()
+
+    @callback
+    def async_restore(self, updated_at: dict[str, datetime]) -> None:
+        """
+        Start from the last known state of the device.
+
+        :param updated_at: When each restored value was last confirmed by the device
+        :return: None
+        """
+        self.updated_at = updated_at
+        self._async_schedule_stale()
+        self.async_set_updated_data(self.device)
+
+    @callback
+    def async_revalidate(self) -> None:
+        """
+        Refresh the device on the next tick of the account scheduler, its entities keep the last known values.
+
+        :return: None
+        """
+        self.next_poll = min(self.next_poll, dt_util.utcnow())
+
+    @callback
+    def async_burst(self) -> None:
+        """
+        Poll the device quickly for a while, after it was sent a command.
+
+        :return: None
+        """
+        now = dt_util.utcnow()
+        self._burst_until = now + BURST_DURATION
+        self.next_poll = min(self.next_poll, now + BURST_INTERVAL)
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """
+        Notify the entities of the device, along with the device values that changed since the last notification.
+
+        :return: None
+        """
+        snapshot = device_snapshot(self.device)
+        self.changed = frozenset(key for key, value in snapshot.items() if self._snapshot.get(key) != value)
+        self._snapshot = snapshot
+        super().async_update_listeners()
+
+    async def async_shutdown(self) -> None:
+        """
+        Stop refreshing the device and sending its commands.
+
+        :return: None
+        """
+        await super().async_shutdown()
+        self.commands.async_shutdown()
+        if self._unsub_stale is not None:
+            self._unsub_stale()
+            self._unsub_stale = None
+
+    @callback
+    def _async_schedule_poll(self) -> None:
+        """
+        Schedule the next poll, before any value listed in the max age table outlives its max age.
+
+        :return: None
+        """
+        self.next_poll = dt_util.utcnow() + self.poll_interval
+        if not self._failures and (expires_at := self.expires_at) is not None:
+            self.next_poll = min(self.next_poll, expires_at)
+
+    @callback
+    def _async_schedule_stale(self) -> None:
+        """
+        Notify the entities when the next device value outlives the stale limit.
+
+        :return: None
+        """
+        if self._unsub_stale is not None:
+            self._unsub_stale()
+            self._unsub_stale = None
+        cutoff = dt_util.utcnow() - self._stale_limit
+        if pending := [updated_at for updated_at in self.updated_at.values() if updated_at > cutoff]:
+            self._unsub_stale = async_call_later(self.hass, min(pending) - cutoff, self._async_went_stale)
+
+    @callback
+    def _async_went_stale(self, _now: datetime) -> None:
+        """
+        Let the entities of a value that outlived the stale limit go unavailable.
+
+        :param _now: Time the timer fired
+        :return: None
+        """
+        self._unsub_stale = None
+        self.async_update_listeners()
+        self._async_schedule_stale()
+
+    async def _async_update_data(self) -> H7126 | H7102 | H5179:
+        """
+        Fetch the latest device state from the Govee cloud.
+
+        :return: The updated device instance
+        """
+        try:
+            fetched = await self.account.async_fetch(self.device, self.poll_priority)
+        except UpdateFailed as e:
+            self._failures += 1
+            # An unreachable cloud is reported by the circuit breaker, and by the device only if it is the only one
+            self._logger.quiet = isinstance(e.__cause__, CLOUD_ERRORS)
+            if self._logger.quiet and self._failures == BREAKER_THRESHOLD and not self.account.breaker.tripped:
+                _LOGGER.warning("Govee cloud failed %s polls of %s in a row: %s", self._failures, self.name, e)
+            self._async_schedule_poll()
+            raise
+        if not fetched:
+            # Nothing was learnt, the device stays due and is retried on the next tick
+            _LOGGER.debug("Deferred poll of %s to fit into the daily quota", self.device.device_id)
+            return self.device
+        self._failures = 0 if self.device.online else self._failures + 1
+        self._steady = self._steady + 1 if device_snapshot(self.device) == self._snapshot else 0
+        # The values of an offline device are the ones the cloud last heard from it
+        self.async_touch(device_snapshot(self.device) if self.device.online else ("online",))
+        self._async_schedule_poll()
+        self.account.snapshots.async_update(self.device, self.updated_at)
+        return self.device
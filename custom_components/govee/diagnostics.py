@@ -0,0 +1,89 @@
+"""Diagnostics support for the Govee integration."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.const import CONF_API_KEY
+
+from .const import DATA_ACCOUNTS, DOMAIN
+from .snapshot import device_snapshot
+
+if TYPE_CHECKING:
+    from homeassistant.config_entries import ConfigEntry
+    from homeassistant.core import HomeAssistant
+    from homeassistant.helpers.device_registry import DeviceEntry
+
+    from .coordinator import GoveeAccount, GoveeDataUpdateCoordinator
+
+TO_REDACT = {CONF_API_KEY}
+
+
+async def async_get_config_entry_diagnostics(hass: HomeAssistant, entry: ConfigEntry) -> dict[str, Any]:
+    """
+    Return diagnostics of an account entry and all of its devices.
+
+    :param hass: Home Assistant instance
+    :param entry: Config entry
+    :return: dict
+    """
+    account: GoveeAccount = hass.data[DOMAIN][DATA_ACCOUNTS][entry.data[CONF_API_KEY]]
+    coordinators: dict[str, GoveeDataUpdateCoordinator] = hass.data[DOMAIN][entry.entry_id]
+    return {
+        "entry": async_redact_data(entry.as_dict(), TO_REDACT),
+        "account": {
+            "scan_interval": account.scan_interval.total_seconds(),
+            "quota": {
+                "daily_limit": account.quota.daily_limit,
+                "used": account.quota.used,
+                "remaining": account.quota.remaining,
+            },
+            "scheduler": {
+                "active": account.api.scheduler.active,
+                "commands": account.api.scheduler.commands,
+                "waiting": account.api.scheduler.waiting,
+            },
+            "breaker": {"tripped": account.breaker.tripped, "consecutive_failures": account.breaker.failures},
+            "push_connected": account.push.connected if account.push is not None else None,
+            "lan_devices": len(account.api.lan.devices) if account.api.lan is not None else None,
+            "metrics": account.api.metrics.as_dict(),
+        },
+        "devices": {device_id: _device_diagnostics(coordinator) for device_id, coordinator in coordinators.items()},
+    }
+
+
+async def async_get_device_diagnostics(hass: HomeAssistant, entry: ConfigEntry, device: DeviceEntry) -> dict[str, Any]:
+    """
+    Return diagnostics of a single device.
+
+    :param hass: Home Assistant instance
+    :param entry: Config entry
+    :param device: Device registry entry of the device
+    :return: dict
+    """
+    coordinators: dict[str, GoveeDataUpdateCoordinator] = hass.data[DOMAIN][entry.entry_id]
+    for domain, device_id in device.identifiers:
+        if domain == DOMAIN and (coordinator := coordinators.get(device_id)) is not None:
+            return _device_diagnostics(coordinator)
+    return {}
+
+
+def _device_diagnostics(coordinator: GoveeDataUpdateCoordinator) -> dict[str, Any]:
+    """
+    Return the state, poll schedule and request metrics of a device.
+
+    :param coordinator: Coordinator of the device
+    :return: dict
+    """
+    metrics = coordinator.api.metrics.devices.get(coordinator.device.device_id)
+    return {
+        "state": device_snapshot(coordinator.device),
+        "last_update_success": coordinator.last_update_success,
+        "last_exception": repr(coordinator.last_exception) if coordinator.last_exception else None,
+        "poll_interval": coordinator.poll_interval.total_seconds(),
+        "next_poll": coordinator.next_poll.isoformat(),
+        "updated_at": {key: updated_at.isoformat() for key, updated_at in coordinator.updated_at.items()},
+        "pending_commands": coordinator.commands.pending,
+        "metrics": metrics.as_dict() if metrics is not None else None,
+    }
@@ -0,0 +1,97 @@
+"""Base entity for the Govee integration."""
+
+from __future__ import annotations
+
+from homeassistant.core import callback
+from homeassistant.helpers.device_registry import DeviceInfo
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from .const import DOMAIN
+from .coordinator import GoveeDataUpdateCoordinator
+
+
+class GoveeEntity(CoordinatorEntity[GoveeDataUpdateCoordinator]):
+    """
+    Entity of a Govee device.
+
+    Attributes that never change are set once when the entity is created, the state is copied from the device
+    into the _attr_* attributes by _async_update_attrs. The state is only written when the availability of the
+    entity or one of the device values it is built from (_device_attrs) changed, so unchanged polls cause no
+    state changes. Entities always serve the last known values, the device is refreshed in the background.
+    """
+
+    # Device values the state of the entity is built from
+    _device_attrs: tuple[str, ...] = ()
+
+    def __init__(self, coordinator: GoveeDataUpdateCoordinator, key: str | None = None) -> None:
+        """
+        Initialize the entity.
+
+        :param coordinator: Coordinator of the device
+        :param key: Key of the entity within the device, None for the device's main entity
+        """
+        super().__init__(coordinator)
+        self._device = coordinator.device
+        self._attr_unique_id = self._device.device_id if key is None else f"{self._device.device_id}_{key}"
+        self._attr_device_info = DeviceInfo(
+            identifiers={(DOMAIN, self._device.device_id)},
+            name=self._device.device_name,
+            manufacturer="Govee",
+            model=self._device.sku,
+            model_id=self._device.sku,
+        )
+        coordinator.watched.update(attr for attr in self._device_attrs if hasattr(self._device, attr))
+        self._online: bool = self._device.online
+        self._available = self.available
+        self._async_update_attrs()
+
+    @property
+    def available(self) -> bool:
+        """
+        Return True if entity is available.
+
+        Failed polls keep the last known values of an online device on show until they outlive the stale limit.
+
+        :return: bool
+        """
+        return self._online and not self.coordinator.is_stale(self._device_attrs)
+
+    async def async_update(self) -> None:
+        """
+        Serve the last known state right away and refresh the device in the background if it is out of date.
+
+        :return: None
+        """
+        if self.coordinator.is_expired(self._device_attrs):
+            self.coordinator.async_revalidate()
+
+    @callback
+    def _async_update_attrs(self) -> None:
+        """
+        Copy the state of the device into the entity's attributes.
+
+        :return: None
+        """
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """
+        Update the entity from the coordinator.
+
+        :return: None
+        """
+        self._online = self._device.online
+        if self.available == self._available and not self._async_device_changed():
+            return
+        self._available = self.available
+        self._async_update_attrs()
+        super()._handle_coordinator_update()
+
+    @callback
+    def _async_device_changed(self) -> bool:
+        """
+        Return True if a device value the state of the entity is built from changed.
+
+        :return: bool
+        """
+        return not self.coordinator.changed.isdisjoint(self._device_attrs)
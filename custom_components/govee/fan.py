@@ -4,30 +4,33 @@ from __future__ import annotations
 
 import logging
 import math
-from pprint import pformat
 from typing import TYPE_CHECKING
 
 # Import the device class from the component that you want to support
 import homeassistant.helpers.config_validation as cv
 import voluptuous as vol
-from devices.air_purifier.h7126 import H7126
-from devices.fan.h7102 import H7102
-from homeassistant.components.fan import PLATFORM_SCHEMA, FanEntity, FanEntityFeature
-from homeassistant.const import CONF_API_KEY, CONF_DEVICE_ID, CONF_NAME
-from homeassistant.core import DOMAIN
-from homeassistant.helpers.device_registry import DeviceInfo
+from homeassistant.components.fan import PLATFORM_SCHEMA, FanEntity
+from homeassistant.const import CONF_API_KEY, CONF_DEVICE_ID, CONF_NAME, Platform
+from homeassistant.core import callback
 
 if TYPE_CHECKING:
+    from devices.air_purifier.h7126 import H7126
+    from devices.fan.h7102 import H7102
     from homeassistant.config_entries import ConfigEntry
     from homeassistant.core import HomeAssistant
     from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
+    from .coordinator import GoveeDataUpdateCoordinator
+
 from homeassistant.util.percentage import (
     percentage_to_ranged_value,
     ranged_value_to_percentage,
 )
 from homeassistant.util.scaling import int_states_in_range
-from util.govee_api import GoveeAPI
+
+from .const import DOMAIN as GOVEE_DOMAIN
+from .entity import GoveeEntity
+from .registry import get_sku
 
 _LOGGER = logging.getLogger("govee")
 
@@ -54,175 +57,51 @@ async def async_setup_entry(
     :return: None
     """
     # Add devices
-    _LOGGER.info("Setting up fan entry: %s", entry.data)
-
-    fan = {
-        "device_id": entry.data[CONF_DEVICE_ID],
-        "api_key": entry.data[CONF_API_KEY],
-        "name": entry.data[CONF_NAME],
-    }
+    coordinators: dict[str, GoveeDataUpdateCoordinator] = hass.data[GOVEE_DOMAIN][entry.entry_id]
 
-    api = GoveeAPI(fan["api_key"])
+    async_add_entities(
+        GoveeFan(coordinator)
+        for coordinator in coordinators.values()
+        if Platform.FAN in get_sku(coordinator.device.sku).platforms
+    )
 
-    match fan["name"].lower():
-        case "h7126":
-            device = H7126(fan["device_id"])
-            await device.update(api)
-        case "h7102":
-            device = H7102(fan["device_id"])
-            await device.update(api)
-        case _:
-            device = None
 
-    async_add_entities([GoveeFan(fan, api, device)])
-
-
-class GoveeFan(FanEntity):
+class GoveeFan(GoveeEntity, FanEntity):
     """Representation of a Govee Fan."""
 
-    def __init__(self, fan: dict, api: GoveeAPI, device: H7126 | H7102) -> None:
+    _device: H7126 | H7102
+    _device_attrs = ("power_switch", "work_mode", "oscillation_toggle", "fan_speed")
+
+    def __init__(self, coordinator: GoveeDataUpdateCoordinator) -> None:
         """
         Initialize the fan entity.
 
-        :param fan: Fan configuration dictionary
-        :param api: Govee API instance
-        :param device: Device instance (H7126 or H7102)
+        :param coordinator: Coordinator of the device (H7126 or H7102)
         """
-        _LOGGER.info(pformat(fan))
-        self._attr_unique_id = fan["device_id"]
-        self._api = api
-        self._fan = device
-
-        if hasattr(self._fan, "online"):
-            self._online = self._fan.online
-        if hasattr(self._fan, "device_name"):
-            self._name = self._fan.device_name
-        if hasattr(self._fan, "power_switch"):
-            self._is_on = self._fan.power_switch
-        if hasattr(self._fan, "oscillation_toggle"):
-            self._oscillating = self._fan.oscillation_toggle
-        if hasattr(self._fan, "fan_speed"):
-            self._current_speed = self._fan.fan_speed
-        if hasattr(self._fan, "work_mode"):
-            self._preset_mode = self._fan.work_mode
-        if hasattr(self._fan, "work_mode_dict"):
-            self._preset_modes = list(self._fan.work_mode_dict.values())
-        if hasattr(self._fan, "max_fan_speed"):
-            self.speed_range = (self._fan.min_fan_speed, self._fan.max_fan_speed)
+        device: H7126 | H7102 = coordinator.device
+        self._attr_name = device.device_name
+        self._attr_supported_features = get_sku(device.sku).fan_features
+        self._attr_preset_modes = list(device.work_mode_dict.values())
+        if hasattr(device, "max_fan_speed"):
+            self.speed_range = (device.min_fan_speed, device.max_fan_speed)
+            self._attr_speed_count = int_states_in_range(self.speed_range)
         else:
             self.speed_range = (0, 0)
+        super().__init__(coordinator)
 
-    @property
-    def name(self) -> str:
-        """
-        Return the display name of this fan.
-
-        :return: str
-        """
-        return self._name
-
-    @property
-    def available(self) -> bool:
-        """
-        Return True if entity is available.
-
-        :return: bool
-        """
-        return self._online
-
-    @property
-    def is_on(self) -> bool:
-        """
-        Return True if the fan is on.
-
-        :return: bool
-        """
-        return self._is_on
-
-    @property
-    def oscillating(self) -> bool:
-        """
-        Return True if the fan is oscillating.
-
-        :return: bool
-        """
-        return self._oscillating
-
-    @property
-    def percentage(self) -> int:
-        """
-        Return the current speed of the fan as a percentage.
-
-        :return: int
+    @callback
+    def _async_update_attrs(self) -> None:
         """
-        return ranged_value_to_percentage(self.speed_range, self._current_speed)
+        Copy the state of the fan into the entity's attributes.
 
-    @property
-    def preset_mode(self) -> str:
-        """
-        Return the current preset mode of the fan.
-
-        :return: str
-        """
-        return self._preset_mode
-
-    @property
-    def preset_modes(self) -> list[str]:
-        """
-        Return the list of available preset modes.
-
-        :return: list[str]
-        """
-        return self._preset_modes
-
-    @property
-    def speed_count(self) -> int:
-        """
-        Return the number of speed settings available for the fan.
-
-        :return: int
-        """
-        return int_states_in_range(self.speed_range)
-
-    @property
-    def device_info(self) -> DeviceInfo:
-        """
-        Return the device info for the fan.
-
-        :return: DeviceInfo
-        """
-        identifiers = {
-            (DOMAIN, self._fan.device_id),
-        }
-        return DeviceInfo(
-            identifiers=identifiers,
-            name=self._fan.device_name,
-            manufacturer="Govee",
-            model=self._fan.sku,
-            model_id=self._fan.sku,
-        )
-
-    @property
-    def supported_features(self) -> FanEntityFeature:
-        """
-        Return the supported features of the fan.
-
-        :return: Supported features
+        :return: None
         """
-        features = FanEntityFeature(0)
-        match self._fan.sku.lower():
-            case "h7102":
-                features |= FanEntityFeature.SET_SPEED
-                features |= FanEntityFeature.OSCILLATE
-                features |= FanEntityFeature.TURN_ON
-                features |= FanEntityFeature.TURN_OFF
-                features |= FanEntityFeature.PRESET_MODE
-            case "h7126":
-                features |= FanEntityFeature.TURN_ON
-                features |= FanEntityFeature.TURN_OFF
-                features |= FanEntityFeature.PRESET_MODE
-
-        return features
+        self._attr_is_on = self._device.power_switch
+        self._attr_preset_mode = self._device.work_mode
+        if hasattr(self._device, "oscillation_toggle"):
+            self._attr_oscillating = self._device.oscillation_toggle
+        if hasattr(self._device, "fan_speed"):
+            self._attr_percentage = ranged_value_to_percentage(self.speed_range, self._device.fan_speed)
 
     async def async_set_preset_mode(self, preset_mode: str) -> None:
         """
@@ -231,8 +110,7 @@ class GoveeFan(FanEntity):
         :param preset_mode: Preset mode to set.
         :return: None
         """
-        await self._fan.set_work_mode(self._api, preset_mode)
-        self._preset_mode = self._fan.work_mode
+        self.coordinator.commands.async_set_work_mode(preset_mode)
 
     async def async_set_percentage(self, percentage: int) -> None:
         """
@@ -242,8 +120,7 @@ class GoveeFan(FanEntity):
         :return: None
         """
         value_in_range = math.ceil(percentage_to_ranged_value(self.speed_range, percentage))
-        await self._fan.set_fan_speed(self._api, value_in_range)
-        self._current_speed = self._fan.fan_speed
+        self.coordinator.commands.async_set_fan_speed(value_in_range)
 
     async def async_turn_on(self, percentage: int | None = None, preset_mode: str | None = None) -> None:
         """
@@ -253,12 +130,10 @@ class GoveeFan(FanEntity):
         :param preset_mode: Optional preset mode.
         :return: None
         """
-        await self._fan.turn_on(self._api)
+        fan_speed = None
         if percentage:
-            await self._fan.set_fan_speed(self._api, percentage)
-        if preset_mode:
-            await self._fan.set_work_mode(self._api, preset_mode)
-        await self.async_update()
+            fan_speed = math.ceil(percentage_to_ranged_value(self.speed_range, percentage))
+        await self.coordinator.commands.async_turn_on(fan_speed, preset_mode)
 
     async def async_turn_off(self) -> None:
         """
@@ -266,8 +141,7 @@ class GoveeFan(FanEntity):
 
         :return: None
         """
-        await self._fan.turn_off(self._api)
-        self._is_on = self._fan.power_switch
+        await self.coordinator.commands.async_turn_off()
 
     async def async_oscillate(self, oscillating: bool) -> None:
         """
@@ -276,19 +150,4 @@ class GoveeFan(FanEntity):
         :param oscillating: True to turn on oscillation, False to turn off
         :return: None
         """
-        await self._fan.toggle_oscillation(self._api, oscillating)
-        self._oscillating = self._fan.oscillation_toggle
-
-    async def async_update(self) -> None:
-        """
-        Update the fan state.
-
-        :return: None
-        """
-        await self._fan.update(self._api)
-        self._is_on = self._fan.power_switch
-        if hasattr(self._fan, "oscillation_toggle"):
-            self._oscillating = self._fan.oscillation_toggle
-        if hasattr(self._fan, "fan_speed"):
-            self._current_speed = self._fan.fan_speed
-        self._preset_mode = self._fan.work_mode
+        self.coordinator.commands.async_set_oscillation(oscillating)
@@ -0,0 +1,207 @@
+"""Local LAN transport for the Govee integration."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import socket
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.core import callback
+
+from .const import LAN_CONTROL_PORT, LAN_LISTEN_PORT, LAN_MULTICAST_ADDRESS, LAN_SCAN_PORT, LAN_TIMEOUT
+
+if TYPE_CHECKING:
+    from homeassistant.core import HomeAssistant
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def lan_state(status: dict[str, Any]) -> dict[str, Any]:
+    """
+    Translate a LAN status reply into the shape of a cloud state payload.
+
+    :param status: Data of a devStatus reply
+    :return: dict
+    """
+    capabilities = [
+        {"type": "devices.capabilities.online", "instance": "online", "state": {"value": True}},
+        {"type": "devices.capabilities.on_off", "instance": "powerSwitch", "state": {"value": status["onOff"]}},
+    ]
+    if "brightness" in status:
+        capabilities.append(
+            {"type": "devices.capabilities.range", "instance": "brightness", "state": {"value": status["brightness"]}}
+        )
+    if color := status.get("color"):
+        rgb = (color["r"] << 16) + (color["g"] << 8) + color["b"]
+        capabilities.append(
+            {"type": "devices.capabilities.color_setting", "instance": "colorRgb", "state": {"value": rgb}}
+        )
+    if kelvin := status.get("colorTemInKelvin"):
+        capabilities.append(
+            {"type": "devices.capabilities.color_setting", "instance": "colorTemperatureK", "state": {"value": kelvin}}
+        )
+    return {"capabilities": capabilities}
+
+
+def lan_command(capability: dict[str, Any]) -> dict[str, Any] | None:
+    """
+    Translate a cloud control capability into a LAN command.
+
+    :param capability: Capability of a cloud control request
+    :return: The LAN command, or None if the LAN API has no equivalent
+    """
+    value = capability["value"]
+    match capability["instance"]:
+        case "powerSwitch":
+            return {"cmd": "turn", "data": {"value": value}}
+        case "brightness":
+            return {"cmd": "brightness", "data": {"value": value}}
+        case "colorRgb":
+            color = {"r": (value >> 16) & 0xFF, "g": (value >> 8) & 0xFF, "b": value & 0xFF}
+            return {"cmd": "colorwc", "data": {"color": color, "colorTemInKelvin": 0}}
+        case "colorTemperatureK":
+            return {"cmd": "colorwc", "data": {"color": {"r": 0, "g": 0, "b": 0}, "colorTemInKelvin": value}}
+    return None
+
+
+class GoveeLan(asyncio.DatagramProtocol):
+    """Discover Govee devices on the local network and talk to them over UDP."""
+
+    def __init__(
+        self, hass: HomeAssistant, scan_address: tuple[str, int] | None = None, listen_port: int = LAN_LISTEN_PORT
+    ) -> None:
+        """
+        Initialize the LAN transport.
+
+        :param hass: Home Assistant instance
+        :param scan_address: Address scans are sent to, a local stand-in can be used for testing
+        :param listen_port: Port replies are received on, 0 picks a free one for testing
+        """
+        self.hass = hass
+        # IP address of every device that answered a scan, keyed by device ID
+        self.devices: dict[str, str] = {}
+        self._scan_address = scan_address or (LAN_MULTICAST_ADDRESS, LAN_SCAN_PORT)
+        self._control_port = LAN_CONTROL_PORT if scan_address is None else scan_address[1]
+        self._status: dict[str, asyncio.Future[dict[str, Any]]] = {}
+        self._listen_port = listen_port
+        self._transport: asyncio.DatagramTransport | None = None
+
+    async def async_start(self) -> None:
+        """
+        Listen for replies and scan for devices.
+
+        :raises OSError: If the listen port is not available
+        :return: None
+        """
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_TTL, 2)
+        try:
+            sock.bind(("", self._listen_port))
+        except OSError:
+            sock.close()
+            raise
+        self._transport, _ = await self.hass.loop.create_datagram_endpoint(lambda: self, sock=sock)
+        self.async_scan()
+
+    @callback
+    def async_stop(self) -> None:
+        """
+        Stop listening for replies.
+
+        :return: None
+        """
+        if self._transport is not None:
+            self._transport.close()
+            self._transport = None
+        for future in self._status.values():
+            future.cancel()
+        self._status.clear()
+
+    @callback
+    def async_scan(self) -> None:
+        """
+        Ask every device on the network to announce itself.
+
+        :return: None
+        """
+        self._send({"cmd": "scan", "data": {"account_topic": "reserve"}}, self._scan_address)
+
+    @callback
+    def async_forget(self, device_id: str) -> None:
+        """
+        Stop using the LAN for a device until it answers a scan again.
+
+        :param device_id: Device ID
+        :return: None
+        """
+        self.devices.pop(device_id, None)
+
+    async def async_status(self, device_id: str) -> dict[str, Any]:
+        """
+        Request the status of a device.
+
+        :param device_id: Device ID
+        :raises TimeoutError: If the device does not answer in time
+        :return: Data of the devStatus reply
+        """
+        ip = self.devices[device_id]
+        if (future := self._status.get(ip)) is None:
+            future = self._status[ip] = self.hass.loop.create_future()
+            self._send({"cmd": "devStatus", "data": {}}, (ip, self._control_port))
+        try:
+            async with asyncio.timeout(LAN_TIMEOUT):
+                return await asyncio.shield(future)
+        finally:
+            if future.done():
+                self._status.pop(ip, None)
+
+    async def async_control(self, device_id: str, command: dict[str, Any]) -> None:
+        """
+        Send a command to a device and confirm it took effect.
+
+        The LAN API does not acknowledge commands, so the device's status is read back.
+
+        :param device_id: Device ID
+        :param command: LAN command
+        :raises TimeoutError: If the device does not answer in time
+        :return: None
+        """
+        self._send(command, (self.devices[device_id], self._control_port))
+        await self.async_status(device_id)
+
+    def datagram_received(self, data: bytes, addr: tuple[str, int]) -> None:
+        """
+        Handle a reply from a device.
+
+        :param data: Payload of the reply
+        :param addr: Address of the device
+        :return: None
+        """
+        try:
+            message = json.loads(data)["msg"]
+        except (ValueError, KeyError, TypeError):
+            _LOGGER.debug("Ignoring malformed LAN message from %s: %s", addr[0], data)
+            return
+
+        match message.get("cmd"):
+            case "scan":
+                reply = message.get("data", {})
+                if "device" in reply and "ip" in reply:
+                    self.devices[reply["device"]] = reply["ip"]
+            case "devStatus":
+                if (future := self._status.get(addr[0])) is not None and not future.done():
+                    future.set_result(message.get("data", {}))
+
+    def _send(self, message: dict[str, Any], addr: tuple[str, int]) -> None:
+        """
+        Send a message to a device or the multicast group.
+
+        :param message: Message without the msg envelope
+        :param addr: Address to send to
+        :return: None
+        """
+        if self._transport is not None:
+            self._transport.sendto(json.dumps({"msg": message}).encode(), addr)
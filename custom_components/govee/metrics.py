@@ -0,0 +1,293 @@
+"""Request metrics for the Govee integration."""
+
+from __future__ import annotations
+
+import bisect
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any
+
+import aiohttp
+from homeassistant.core import callback
+from homeassistant.util import dt as dt_util
+
+if TYPE_CHECKING:
+    import asyncio
+    from collections.abc import Awaitable, Callable
+    from datetime import datetime
+    from types import SimpleNamespace
+
+# Upper bounds in seconds of the latency histogram buckets, the last bucket holds everything slower
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+# Endpoints the requests are counted under
+DEVICES = "user/devices"
+STATE = "device/state"
+CONTROL = "device/control"
+LAN_STATE = "lan/state"
+LAN_CONTROL = "lan/control"
+CLOUD_ENDPOINTS = frozenset({DEVICES, STATE, CONTROL})
+
+# Weight of the latest request in the moving average of the cloud latency
+LATENCY_SMOOTHING = 0.2
+
+# Phases of opening a connection to the cloud. The TLS handshake is part of connecting, aiohttp does not trace it
+# on its own.
+DNS = "dns"
+CONNECT = "connect"
+POOL_WAIT = "pool_wait"
+
+# Seconds between the probes of the event loop lag
+LOOP_PROBE_INTERVAL = 5
+
+
+@dataclass(kw_only=True)
+class RequestMetrics:
+    """Counters of the requests to an endpoint or a device."""
+
+    requests: int = 0
+    errors: int = 0
+    rate_limited: int = 0
+    latency_total: float = 0.0
+    latency_buckets: list[int] = field(default_factory=lambda: [0] * (len(LATENCY_BUCKETS) + 1))
+    last_success: datetime | None = None
+    last_error: str | None = None
+
+    def record(self, latency: float, error: Exception | None, *, rate_limited: bool) -> None:
+        """
+        Count a request.
+
+        :param latency: Seconds the request took
+        :param error: Error of the request, None if it succeeded
+        :param rate_limited: True if the cloud answered with 429
+        :return: None
+        """
+        self.requests += 1
+        self.latency_total += latency
+        self.latency_buckets[bisect.bisect_left(LATENCY_BUCKETS, latency)] += 1
+        if error is None:
+            self.last_success = dt_util.utcnow()
+            return
+        self.errors += 1
+        self.rate_limited += rate_limited
+        self.last_error = repr(error)
+
+    def as_dict(self) -> dict[str, Any]:
+        """
+        Return the counters for diagnostics.
+
+        :return: dict
+        """
+        bounds = [f"<={bound}s" for bound in LATENCY_BUCKETS] + [f">{LATENCY_BUCKETS[-1]}s"]
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "rate_limited": self.rate_limited,
+            "error_rate": self.errors / self.requests if self.requests else 0,
+            "mean_latency": self.latency_total / self.requests if self.requests else None,
+            "latency_histogram": dict(zip(bounds, self.latency_buckets, strict=True)),
+            "last_success": self.last_success.isoformat() if self.last_success else None,
+            "last_error": self.last_error,
+        }
+
+
+@dataclass(kw_only=True)
+class PhaseMetrics:
+    """Durations of a phase of opening a connection."""
+
+    count: int = 0
+    total: float = 0.0
+    maximum: float = 0.0
+
+    def record(self, duration: float) -> None:
+        """
+        Count a phase.
+
+        :param duration: Seconds the phase took
+        :return: None
+        """
+        self.count += 1
+        self.total += duration
+        self.maximum = max(self.maximum, duration)
+
+    def as_dict(self) -> dict[str, Any]:
+        """
+        Return the durations for diagnostics.
+
+        :return: dict
+        """
+        return {"count": self.count, "mean": self.total / self.count if self.count else None, "max": self.maximum}
+
+
+class GoveeMetrics:
+    """Counters of every request an account's client makes, by endpoint and by device."""
+
+    def __init__(self) -> None:
+        """Initialize the counters."""
+        self.endpoints: defaultdict[str, RequestMetrics] = defaultdict(RequestMetrics)
+        self.devices: defaultdict[str, RequestMetrics] = defaultdict(RequestMetrics)
+        # State requests answered from the freshness window, joined to an in-flight request, or sent
+        self.cache_hits = 0
+        self.shared = 0
+        self.cache_misses = 0
+        # Exponential moving average in seconds of the cloud latency, None until the first cloud request
+        self.cloud_latency: float | None = None
+        # Time spent opening connections to the cloud by phase, and requests sent on a pooled connection instead
+        self.phases: defaultdict[str, PhaseMetrics] = defaultdict(PhaseMetrics)
+        self.reused_connections = 0
+        # Seconds the event loop ran the lag probe late, as a moving average and at worst
+        self.loop_lag: float | None = None
+        self.loop_lag_max = 0.0
+
+    def record(
+        self, endpoint: str, device: str | None, latency: float, error: Exception | None, *, rate_limited: bool = False
+    ) -> None:
+        """
+        Count a request.
+
+        :param endpoint: Endpoint of the request
+        :param device: Device ID the request was about, None for account requests
+        :param latency: Seconds the request took
+        :param error: Error of the request, None if it succeeded
+        :param rate_limited: True if the cloud answered with 429
+        :return: None
+        """
+        self.endpoints[endpoint].record(latency, error, rate_limited=rate_limited)
+        if endpoint in CLOUD_ENDPOINTS:
+            previous = latency if self.cloud_latency is None else self.cloud_latency
+            self.cloud_latency = previous + LATENCY_SMOOTHING * (latency - previous)
+        if device is not None:
+            self.devices[device].record(latency, error, rate_limited=rate_limited)
+
+    def record_loop_lag(self, lag: float) -> None:
+        """
+        Count a probe of the event loop.
+
+        :param lag: Seconds the probe ran late
+        :return: None
+        """
+        previous = lag if self.loop_lag is None else self.loop_lag
+        self.loop_lag = previous + LATENCY_SMOOTHING * (lag - previous)
+        self.loop_lag_max = max(self.loop_lag_max, lag)
+
+    def trace_config(self) -> aiohttp.TraceConfig:
+        """
+        Return a trace config timing the phases of opening the connections of a session.
+
+        :return: aiohttp.TraceConfig
+        """
+        trace_config = aiohttp.TraceConfig()
+        for phase, start, end in (
+            (DNS, trace_config.on_dns_resolvehost_start, trace_config.on_dns_resolvehost_end),
+            (CONNECT, trace_config.on_connection_create_start, trace_config.on_connection_create_end),
+            (POOL_WAIT, trace_config.on_connection_queued_start, trace_config.on_connection_queued_end),
+        ):
+            start.append(self._phase_started(phase))
+            end.append(self._phase_ended(phase))
+
+        async def on_connection_reuseconn(*_args: Any) -> None:
+            self.reused_connections += 1
+
+        trace_config.on_connection_reuseconn.append(on_connection_reuseconn)
+        return trace_config
+
+    @staticmethod
+    def _phase_started(phase: str) -> Callable[..., Awaitable[None]]:
+        """
+        Return a trace callback noting when a phase of a request started.
+
+        :param phase: Name of the phase
+        :return: The callback
+        """
+
+        async def on_start(_session: aiohttp.ClientSession, context: SimpleNamespace, _params: Any) -> None:
+            setattr(context, phase, time.monotonic())
+
+        return on_start
+
+    def _phase_ended(self, phase: str) -> Callable[..., Awaitable[None]]:
+        """
+        Return a trace callback counting how long a phase of a request took.
+
+        :param phase: Name of the phase
+        :return: The callback
+        """
+
+        async def on_end(_session: aiohttp.ClientSession, context: SimpleNamespace, _params: Any) -> None:
+            if (started := getattr(context, phase, None)) is not None:
+                self.phases[phase].record(time.monotonic() - started)
+
+        return on_end
+
+    def as_dict(self) -> dict[str, Any]:
+        """
+        Return the account-wide counters for diagnostics.
+
+        :return: dict
+        """
+        lookups = self.cache_hits + self.shared + self.cache_misses
+        return {
+            "endpoints": {endpoint: metrics.as_dict() for endpoint, metrics in sorted(self.endpoints.items())},
+            "cloud_latency": self.cloud_latency,
+            "state_cache": {
+                "hits": self.cache_hits,
+                "shared": self.shared,
+                "misses": self.cache_misses,
+                "hit_rate": (self.cache_hits + self.shared) / lookups if lookups else 0,
+            },
+            "connections": {
+                **{phase: metrics.as_dict() for phase, metrics in sorted(self.phases.items())},
+                "reused": self.reused_connections,
+            },
+            "loop_lag": {"mean": self.loop_lag, "max": self.loop_lag_max},
+        }
+
+
+class LoopLagProbe:
+    """Measure how late the event loop runs a callback scheduled at a fixed interval."""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, metrics: GoveeMetrics) -> None:
+        """
+        Initialize the probe.
+
+        :param loop: Event loop to probe
+        :param metrics: Metrics the lag is recorded in
+        """
+        self._loop = loop
+        self._metrics = metrics
+        self._expected = 0.0
+        self._handle: asyncio.TimerHandle | None = None
+
+    @callback
+    def async_start(self) -> None:
+        """
+        Schedule the next probe, unless one is scheduled already.
+
+        :return: None
+        """
+        if self._handle is None:
+            self._expected = self._loop.time() + LOOP_PROBE_INTERVAL
+            self._handle = self._loop.call_at(self._expected, self._async_probe)
+
+    @callback
+    def async_stop(self) -> None:
+        """
+        Cancel the next probe.
+
+        :return: None
+        """
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+
+    @callback
+    def _async_probe(self) -> None:
+        """
+        Record how late the probe ran and schedule the next one.
+
+        :return: None
+        """
+        self._handle = None
+        self._metrics.record_loop_lag(max(self._loop.time() - self._expected, 0))
+        self.async_start()
@@ -0,0 +1,183 @@
+"""Push updates from the Govee OpenAPI MQTT feed."""
+
+from __future__ import annotations
+
+import json
+import logging
+import ssl
+from typing import TYPE_CHECKING, Any
+
+import paho.mqtt.client as mqtt
+from homeassistant.core import callback
+
+from .const import MQTT_HOST, MQTT_PORT
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from devices.air_purifier.h7126 import H7126
+    from devices.fan.h7102 import H7102
+    from devices.thermometer.h5179 import H5179
+    from homeassistant.core import HomeAssistant
+
+_LOGGER = logging.getLogger(__name__)
+
+# Device attribute and parser of every capability instance a push event can carry
+CAPABILITY_ATTRIBUTES: dict[str, tuple[str, Callable[[Any], Any]]] = {
+    "online": ("online", bool),
+    "powerSwitch": ("power_switch", lambda value: value == 1),
+    "oscillationToggle": ("oscillation_toggle", lambda value: value == 1),
+    "sensorTemperature": ("temperature", float),
+    "sensorHumidity": ("humidity", float),
+    "airQuality": ("air_quality", int),
+    "filterLifeTime": ("filter_life", int),
+}
+
+
+def apply_capabilities(device: H7126 | H7102 | H5179, capabilities: list[dict]) -> set[str]:
+    """
+    Apply the capabilities of a push event to a device.
+
+    :param device: Device instance
+    :param capabilities: Capabilities of the event
+    :return: Device values the event carried, changed or not
+    """
+    applied: set[str] = set()
+    for capability in capabilities:
+        if (attribute := CAPABILITY_ATTRIBUTES.get(capability.get("instance", ""))) is None:
+            continue
+        name, parse = attribute
+        if not hasattr(device, name):
+            continue
+
+        state = capability.get("state")
+        # Events carry a list of named states, state payloads a single value
+        if isinstance(state, list):
+            state = state[0] if state else None
+        if not isinstance(state, dict) or "value" not in state:
+            continue
+
+        setattr(device, name, parse(state["value"]))
+        applied.add(name)
+    return applied
+
+
+class GoveePushClient:
+    """Subscribe to the MQTT event feed of a Govee account."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        api_key: str,
+        on_event: Callable[[dict], None],
+        broker: tuple[str, int] | None = None,
+    ) -> None:
+        """
+        Initialize the push client.
+
+        :param hass: Home Assistant instance
+        :param api_key: Govee API key of the account
+        :param on_event: Callback run in the event loop for every event
+        :param broker: Host and port of a local broker to test against, connected to without TLS
+        """
+        self.hass = hass
+        self.connected = False
+        self._api_key = api_key
+        self._on_event = on_event
+        self._host, self._port = broker or (MQTT_HOST, MQTT_PORT)
+        self._tls = broker is None
+        self._topic = f"GA/{api_key}"
+        self._client: mqtt.Client | None = None
+
+    async def async_start(self) -> None:
+        """
+        Connect to the broker, paho reconnects on its own thread from then on.
+
+        :return: None
+        """
+        self._client = await self.hass.async_add_executor_job(self._create_client)
+        self._client.connect_async(self._host, self._port)
+        self._client.loop_start()
+
+    async def async_stop(self) -> None:
+        """
+        Disconnect from the broker.
+
+        :return: None
+        """
+        if self._client is None:
+            return
+        client, self._client = self._client, None
+        client.disconnect()
+        await self.hass.async_add_executor_job(client.loop_stop)
+        self.connected = False
+
+    def _create_client(self) -> mqtt.Client:
+        """
+        Create the MQTT client, loading the TLS context blocks so this runs in the executor.
+
+        :return: mqtt.Client
+        """
+        client = mqtt.Client(mqtt.CallbackAPIVersion.VERSION2)
+        client.username_pw_set(self._api_key, self._api_key)
+        if self._tls:
+            client.tls_set_context(ssl.create_default_context())
+        client.reconnect_delay_set(min_delay=1, max_delay=120)
+        client.on_connect = self._on_connect
+        client.on_disconnect = self._on_disconnect
+        client.on_message = self._on_message
+        return client
+
+    def _on_connect(self, client: mqtt.Client, _userdata: Any, _flags: Any, reason_code: Any, _properties: Any) -> None:
+        """
+        Subscribe to the account's topic once connected.
+
+        :return: None
+        """
+        if reason_code.is_failure:
+            _LOGGER.warning("Unable to connect to the Govee MQTT feed: %s", reason_code)
+            return
+        client.subscribe(self._topic)
+        self.hass.loop.call_soon_threadsafe(self._async_connected)
+
+    def _on_disconnect(
+        self, _client: mqtt.Client, _userdata: Any, _flags: Any, reason_code: Any, _properties: Any
+    ) -> None:
+        """
+        Fall back to regular polling while disconnected.
+
+        :return: None
+        """
+        _LOGGER.debug("Disconnected from the Govee MQTT feed: %s", reason_code)
+        self.hass.loop.call_soon_threadsafe(self._async_disconnected)
+
+    def _on_message(self, _client: mqtt.Client, _userdata: Any, message: mqtt.MQTTMessage) -> None:
+        """
+        Hand an event over to the event loop.
+
+        :return: None
+        """
+        try:
+            event = json.loads(message.payload)
+        except ValueError:
+            _LOGGER.warning("Ignoring malformed Govee MQTT event: %s", message.payload)
+            return
+        self.hass.loop.call_soon_threadsafe(self._on_event, event)
+
+    @callback
+    def _async_connected(self) -> None:
+        """
+        Record that the subscription is healthy.
+
+        :return: None
+        """
+        self.connected = True
+
+    @callback
+    def _async_disconnected(self) -> None:
+        """
+        Record that the subscription is down.
+
+        :return: None
+        """
+        self.connected = False
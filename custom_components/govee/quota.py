@@ -0,0 +1,196 @@
+"""Daily request quota accounting for the Govee integration."""
+
+from __future__ import annotations
+
+import logging
+import time
+from collections import deque
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.core import callback
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    DAILY_QUOTA,
+    DOMAIN,
+    QUOTA_BURST,
+    QUOTA_COMMAND_RESERVE,
+    QUOTA_LOW_FRACTION,
+    QUOTA_RATE_WINDOW,
+    QUOTA_SAVE_DELAY,
+    STORAGE_VERSION,
+    RequestPriority,
+)
+
+if TYPE_CHECKING:
+    from homeassistant.core import HomeAssistant
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class GoveeQuota:
+    """Count the requests of an account and pace polling to fit its daily quota."""
+
+    def __init__(self, hass: HomeAssistant, account_id: str, daily_limit: int = DAILY_QUOTA) -> None:
+        """
+        Initialize the quota.
+
+        :param hass: Home Assistant instance
+        :param account_id: Identifier of the account, never the API key itself
+        :param daily_limit: Requests per day the account is allowed
+        """
+        self.daily_limit = daily_limit
+        self.used = 0
+        self._day = dt_util.utcnow().date()
+        self._tokens = float(QUOTA_BURST)
+        self._last_refill = time.monotonic()
+        self._store: Store[dict[str, Any]] = Store(hass, STORAGE_VERSION, f"{DOMAIN}.quota.{account_id}")
+        # Times of the requests within the rate window, for the exhaustion forecast
+        self._recent: deque[float] = deque()
+        self._started = time.monotonic()
+        # When today's quota ran out, so the forecast stays put once it came true
+        self._exhausted: datetime | None = None
+
+    @property
+    def remaining(self) -> int:
+        """
+        Return the number of requests left today.
+
+        :return: int
+        """
+        self._roll_over()
+        return max(self.daily_limit - self.used, 0)
+
+    @property
+    def rate(self) -> float:
+        """
+        Return the recent request rate in requests per second.
+
+        :return: float
+        """
+        now = time.monotonic()
+        window = QUOTA_RATE_WINDOW.total_seconds()
+        while self._recent and now - self._recent[0] > window:
+            self._recent.popleft()
+        return len(self._recent) / max(min(window, now - self._started), 1)
+
+    @property
+    def exhausted_at(self) -> datetime | None:
+        """
+        Return when the quota runs out at the recent request rate, None if it lasts until the daily reset.
+
+        The forecast is rounded to the minute, so it only moves when the request rate does.
+
+        :return: datetime or None
+        """
+        if self.remaining == 0:
+            if self._exhausted is None:
+                self._exhausted = dt_util.utcnow().replace(second=0, microsecond=0)
+            return self._exhausted
+        if (rate := self.rate) == 0:
+            return None
+        exhausted_at = dt_util.utcnow() + timedelta(seconds=self.remaining / rate)
+        if exhausted_at >= self._next_reset():
+            return None
+        return exhausted_at.replace(second=0, microsecond=0)
+
+    async def async_load(self) -> None:
+        """
+        Restore today's request count from storage.
+
+        :return: None
+        """
+        if (data := await self._store.async_load()) is None:
+            return
+        if data.get("day") == self._day.isoformat():
+            self.used = data.get("used", 0)
+        _LOGGER.debug("Restored %s requests used today", self.used)
+
+    async def async_save(self) -> None:
+        """
+        Write the request count to storage right away.
+
+        :return: None
+        """
+        await self._store.async_save(self._data_to_save())
+
+    @callback
+    def async_record(self) -> None:
+        """
+        Count a request made to the Govee cloud.
+
+        :return: None
+        """
+        self._roll_over()
+        self.used += 1
+        self._recent.append(time.monotonic())
+        if self.used == self.daily_limit:
+            _LOGGER.warning("Govee API daily quota of %s requests is used up", self.daily_limit)
+        self._store.async_delay_save(self._data_to_save, QUOTA_SAVE_DELAY)
+
+    @callback
+    def async_acquire(self, priority: RequestPriority) -> bool:
+        """
+        Check whether a request of the given priority fits into the budget.
+
+        Commands and setup requests are always let through. Polls take a token from a bucket refilled
+        at the rate that spreads the remaining quota over the rest of the day, and background polls
+        are shed first once the quota runs low.
+
+        :param priority: Priority of the request
+        :return: True if the request should be made
+        """
+        if priority <= RequestPriority.SETUP:
+            return True
+
+        self._refill()
+        if priority is RequestPriority.BACKGROUND and self.remaining < self.daily_limit * QUOTA_LOW_FRACTION:
+            return False
+        if self._tokens < 1:
+            return False
+        self._tokens -= 1
+        return True
+
+    def _refill(self) -> None:
+        """
+        Add the tokens earned since the last refill.
+
+        :return: None
+        """
+        now = time.monotonic()
+        elapsed = now - self._last_refill
+        self._last_refill = now
+
+        seconds_left = max((self._next_reset() - dt_util.utcnow()).total_seconds(), 1)
+        rate = max(self.remaining - QUOTA_COMMAND_RESERVE, 0) / seconds_left
+
+        self._tokens = min(float(QUOTA_BURST), self._tokens + elapsed * rate)
+
+    def _next_reset(self) -> datetime:
+        """
+        Return when the daily quota resets, at midnight UTC.
+
+        :return: datetime
+        """
+        return datetime.combine(dt_util.utcnow().date() + timedelta(days=1), datetime.min.time(), tzinfo=dt_util.UTC)
+
+    def _roll_over(self) -> None:
+        """
+        Reset the request count when a new day starts.
+
+        :return: None
+        """
+        if (today := dt_util.utcnow().date()) != self._day:
+            self._day = today
+            self.used = 0
+            self._exhausted = None
+
+    def _data_to_save(self) -> dict[str, Any]:
+        """
+        Return the request count to persist.
+
+        :return: dict
+        """
+        return {"day": self._day.isoformat(), "used": self.used}
@@ -0,0 +1,104 @@
+"""Supported Govee devices and what the integration builds for them."""
+
+from __future__ import annotations
+
+import importlib
+import logging
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from homeassistant.components.fan import FanEntityFeature
+from homeassistant.const import Platform
+
+if TYPE_CHECKING:
+    from devices.air_purifier.h7126 import H7126
+    from devices.fan.h7102 import H7102
+    from devices.thermometer.h5179 import H5179
+    from homeassistant.core import HomeAssistant
+
+NO_FAN_FEATURES = FanEntityFeature(0)
+
+
+def _drop_state_errors(record: logging.LogRecord) -> bool:
+    """
+    Drop the error the device classes log for every failed state update.
+
+    The client keeps the error and the coordinator of the device reports it, or the circuit breaker once for the
+    whole account when the cloud is down.
+
+    :param record: Log record of the device module
+    :return: False if the record is dropped
+    """
+    return not record.getMessage().startswith("Error updating device state")
+
+
+@dataclass(frozen=True, kw_only=True)
+class GoveeSkuDescription:
+    """Describe a supported Govee SKU."""
+
+    sku: str
+    # The device class is imported from this module the first time a configured device needs it
+    module: str
+    class_name: str
+    platforms: tuple[Platform, ...]
+    sensors: tuple[str, ...]
+    fan_features: FanEntityFeature = NO_FAN_FEATURES
+    # The device answers the local LAN API, none of the supported SKUs does so far
+    lan: bool = False
+
+    async def async_create_device(self, hass: HomeAssistant, device_id: str) -> H7126 | H7102 | H5179:
+        """
+        Create the device instance, importing its module outside the event loop.
+
+        :param hass: Home Assistant instance
+        :param device_id: Device ID
+        :return: Device instance
+        """
+        module = await hass.async_add_import_executor_job(importlib.import_module, self.module)
+        # The device classes log with loggers named after their module
+        logging.getLogger(self.module).addFilter(_drop_state_errors)
+        return getattr(module, self.class_name)(device_id)
+
+
+SKUS: dict[str, GoveeSkuDescription] = {
+    description.sku: description
+    for description in (
+        GoveeSkuDescription(
+            sku="H7126",
+            module="devices.air_purifier.h7126",
+            class_name="H7126",
+            platforms=(Platform.FAN, Platform.SENSOR),
+            sensors=("online", "filter_life", "air_quality"),
+            fan_features=FanEntityFeature.TURN_ON | FanEntityFeature.TURN_OFF | FanEntityFeature.PRESET_MODE,
+        ),
+        GoveeSkuDescription(
+            sku="H7102",
+            module="devices.fan.h7102",
+            class_name="H7102",
+            platforms=(Platform.FAN, Platform.SENSOR),
+            sensors=("online",),
+            fan_features=FanEntityFeature.SET_SPEED
+            | FanEntityFeature.OSCILLATE
+            | FanEntityFeature.TURN_ON
+            | FanEntityFeature.TURN_OFF
+            | FanEntityFeature.PRESET_MODE,
+        ),
+        GoveeSkuDescription(
+            sku="H5179",
+            module="devices.thermometer.h5179",
+            class_name="H5179",
+            platforms=(Platform.SENSOR,),
+            sensors=("online", "humidity", "temperature"),
+        ),
+    )
+}
+
+
+def get_sku(name: str) -> GoveeSkuDescription | None:
+    """
+    Return the description of a SKU, as stored in lower case in config entries.
+
+    :param name: SKU of the device
+    :return: GoveeSkuDescription or None if the SKU is not supported
+    """
+    return SKUS.get(name.upper())
@@ -0,0 +1,95 @@
+"""Prioritized request scheduling for the Govee integration."""
+
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+
+from homeassistant.core import callback
+
+from .const import MAX_CONCURRENT_REQUESTS, RequestPriority
+
+
+class GoveeRequestScheduler:
+    """
+    Hand out an account's cloud request slots by priority.
+
+    Waiting requests are started in order of priority, then of arrival, so a command jumps ahead of every
+    queued poll. Polls are also held back while any command is in flight, so they do not compete with it for
+    the connection and the rate limit.
+    """
+
+    def __init__(self, limit: int = MAX_CONCURRENT_REQUESTS) -> None:
+        """
+        Initialize the scheduler.
+
+        :param limit: Maximum number of requests in flight at once
+        """
+        self.active = 0
+        self.commands = 0
+        self._limit = limit
+        self._order = itertools.count()
+        self._waiters: list[tuple[RequestPriority, int, asyncio.Future[None]]] = []
+
+    @property
+    def waiting(self) -> int:
+        """
+        Return the number of requests waiting for a slot.
+
+        :return: int
+        """
+        return sum(not future.done() for _priority, _order, future in self._waiters)
+
+    async def async_acquire(self, priority: RequestPriority) -> None:
+        """
+        Wait for a request slot.
+
+        :param priority: Priority of the request
+        :return: None
+        """
+        future: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._order), future))
+        self._async_start_waiters()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # The slot was handed out just as the request was cancelled
+                self.async_release(priority)
+            else:
+                self._async_start_waiters()
+            raise
+
+    @callback
+    def async_release(self, priority: RequestPriority) -> None:
+        """
+        Give back the slot of a finished request.
+
+        :param priority: Priority of the request
+        :return: None
+        """
+        self.active -= 1
+        if priority is RequestPriority.COMMAND:
+            self.commands -= 1
+        self._async_start_waiters()
+
+    @callback
+    def _async_start_waiters(self) -> None:
+        """
+        Start the waiting requests that fit, stopping at the first that does not so none is overtaken.
+
+        :return: None
+        """
+        while self._waiters:
+            priority, _order, future = self._waiters[0]
+            if future.done():
+                heapq.heappop(self._waiters)
+                continue
+            if self.active >= self._limit or (priority is not RequestPriority.COMMAND and self.commands):
+                return
+            heapq.heappop(self._waiters)
+            self.active += 1
+            if priority is RequestPriority.COMMAND:
+                self.commands += 1
+            future.set_result(None)
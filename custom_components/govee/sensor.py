@@ -1,24 +1,48 @@
 """Govee Sensor Platform for Home Assistant."""
 
 import logging
-from pprint import pformat
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import datetime, timedelta
 
 import homeassistant.helpers.config_validation as cv
 import voluptuous as vol
-from devices.air_purifier.h7126 import H7126
-from devices.fan.h7102 import H7102
-from devices.thermometer.h5179 import H5179
 from homeassistant.components.sensor import (
     PLATFORM_SCHEMA,
     SensorDeviceClass,
     SensorEntity,
+    SensorEntityDescription,
+    SensorStateClass,
 )
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import CONF_API_KEY, CONF_DEVICE_ID, CONF_NAME, UnitOfTemperature
-from homeassistant.core import DOMAIN, HomeAssistant
-from homeassistant.helpers.device_registry import DeviceInfo
+from homeassistant.const import (
+    CONF_API_KEY,
+    CONF_DEVICE_ID,
+    CONF_NAME,
+    PERCENTAGE,
+    EntityCategory,
+    UnitOfTemperature,
+    UnitOfTime,
+)
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.device_registry import DeviceEntryType, DeviceInfo
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from util.govee_api import GoveeAPI
+from homeassistant.helpers.typing import StateType
+
+from .api import account_id
+from .const import (
+    CONF_HEARTBEAT,
+    CONF_HUMIDITY_DEADBAND,
+    CONF_RELATIVE_DEADBAND,
+    CONF_TEMPERATURE_DEADBAND,
+    DATA_ACCOUNTS,
+    DEFAULT_HEARTBEAT,
+)
+from .const import DOMAIN as GOVEE_DOMAIN
+from .coordinator import GoveeAccount, GoveeDataUpdateCoordinator
+from .entity import GoveeEntity
+from .registry import get_sku
 
 _LOGGER = logging.getLogger("govee")
 
@@ -45,499 +69,290 @@ async def async_setup_entry(
     :return: None
     """
     # Add devices
-    _LOGGER.info("Setting up fan entry: %s", entry.data)
-
-    sensor = {
-        "device_id": entry.data[CONF_DEVICE_ID],
-        "api_key": entry.data[CONF_API_KEY],
-        "name": entry.data[CONF_NAME],
-    }
-
-    api = GoveeAPI(sensor["api_key"])
-
-    match sensor["name"].lower():
-        case "h7126":
-            device = H7126(sensor["device_id"])
-            await device.update(api)
-            async_add_entities(
-                [
-                    GoveeOnlineSensor(sensor, api, device),
-                    GoveeFilterLifeSensor(sensor, api, device),
-                    GoveeAirQualitySensor(sensor, api, device),
-                ]
-            )
-        case "h7102":
-            device = H7102(sensor["device_id"])
-            await device.update(api)
-            async_add_entities([GoveeOnlineSensor(sensor, api, device)])
-        case "h5179":
-            device = H5179(sensor["device_id"])
-            await device.update(api)
-            async_add_entities(
-                [
-                    GoveeOnlineSensor(sensor, api, device),
-                    GoveeHumiditySensor(sensor, api, device),
-                    GoveeTemperatureSensor(sensor, api, device),
-                ]
-            )
-        case _:
-            _LOGGER.warning("Unknown device name: %s", sensor["name"])
-
-
-class GoveeOnlineSensor(SensorEntity):
-    """Representation of a Govee Online Sensor."""
-
-    def __init__(self, sensor: dict, api: GoveeAPI, device: H5179 | H7126 | H7102) -> None:
-        """
-        Initialize an Govee Online Sensor.
-
-        :param sensor: Dictionary containing sensor configuration
-        :param api: GoveeAPI instance
-        :param device: Device instance
-        """
-        _LOGGER.info(pformat(sensor))
-        self._attr_unique_id = f"{sensor['device_id']}_online"
-        self._api = api
-        self._sensor = device
-
-        if hasattr(self._sensor, "online"):
-            self._online = self._sensor.online
-
-    @property
-    def available(self) -> bool:
-        """
-        Return True if entity is available.
-
-        :return: bool
-        """
-        return self._online
-
-    @property
-    def name(self) -> str:
-        """
-        Return the display name of this sensor.
+    coordinators: dict[str, GoveeDataUpdateCoordinator] = hass.data[GOVEE_DOMAIN][entry.entry_id]
 
-        :return: str
-        """
-        return "Status"
+    async_add_entities(
+        SENSOR_TYPES[key](coordinator)
+        for coordinator in coordinators.values()
+        for key in get_sku(coordinator.device.sku).sensors
+    )
 
-    @property
-    def device_class(self) -> str:
-        """
-        Return the device class of this sensor.
+    account: GoveeAccount = hass.data[GOVEE_DOMAIN][DATA_ACCOUNTS][entry.data[CONF_API_KEY]]
+    async_add_entities(GoveeAccountSensor(account, description) for description in ACCOUNT_SENSORS)
 
-        :return: str
-        """
-        return SensorDeviceClass.ENUM
 
-    @property
-    def options(self) -> list[str]:
-        """
-        Return the list of options for the sensor.
+class GoveeOnlineSensor(GoveeEntity, SensorEntity):
+    """Representation of a Govee Online Sensor."""
 
-        :return: list[str]
-        """
-        return ["Online", "Offline", "Unknown"]
+    _attr_name = "Status"
+    _attr_device_class = SensorDeviceClass.ENUM
+    _device_attrs = ("online",)
 
-    @property
-    def native_value(self) -> str:
+    def __init__(self, coordinator: GoveeDataUpdateCoordinator) -> None:
         """
-        Return the status of the sensor.
+        Initialize an Govee Online Sensor.
 
-        :return: str
-        """
-        if self._online:
-            return "Online"
-        if self._sensor.online is False:
-            return "Offline"
-        return "Unknown"
-
-    @property
-    def device_info(self) -> DeviceInfo:
+        :param coordinator: Coordinator of the device
         """
-        Return device information for the sensor.
+        self._attr_options = ["Online", "Offline", "Unknown"]
+        super().__init__(coordinator, "online")
 
-        :return: DeviceInfo
+    @callback
+    def _async_update_attrs(self) -> None:
         """
-        identifiers = {
-            (DOMAIN, self._sensor.device_id),
-        }
-        return DeviceInfo(
-            identifiers=identifiers,
-            name=self._sensor.device_name,
-            manufacturer="Govee",
-            model=self._sensor.sku,
-            model_id=self._sensor.sku,
-        )
-
-    async def async_update(self) -> None:
-        """
-        Update the sensor state.
+        Copy the status of the device into the sensor.
 
         :return: None
         """
-        await self._sensor.update(self._api)
-        if hasattr(self._sensor, "online"):
-            self._online = self._sensor.online
+        if self._device.online:
+            self._attr_native_value = "Online"
+        elif self._device.online is False:
+            self._attr_native_value = "Offline"
+        else:
+            self._attr_native_value = "Unknown"
 
 
-class GoveeFilterLifeSensor(SensorEntity):
+class GoveeFilterLifeSensor(GoveeEntity, SensorEntity):
     """Representation of a Govee Filter Life Sensor."""
 
-    def __init__(self, sensor: dict, api: GoveeAPI, device: H7126) -> None:
-        """
-        Initialize an Govee Filter Life Sensor.
-
-        :param sensor: Dictionary containing sensor configuration
-        :param api: GoveeAPI instance
-        :param device: Device instance
-        """
-        _LOGGER.info(pformat(sensor))
-        self._attr_unique_id = f"{sensor['device_id']}_filter_life"
-        self._api = api
-        self._sensor = device
-
-        if hasattr(self._sensor, "filter_life"):
-            self._filter_life = self._sensor.filter_life
-        if hasattr(self._sensor, "online"):
-            self._online = self._sensor.online
-
-    @property
-    def available(self) -> bool:
-        """
-        Return True if entity is available.
+    _attr_name = "Filter Life"
+    _attr_device_class = SensorDeviceClass.POWER_FACTOR
+    _device_attrs = ("filter_life",)
 
-        :return: bool
+    def __init__(self, coordinator: GoveeDataUpdateCoordinator) -> None:
         """
-        return self._online
+        Initialize an Govee Filter Life Sensor.
 
-    @property
-    def name(self) -> str:
+        :param coordinator: Coordinator of the device
         """
-        Return the display name of this sensor.
+        super().__init__(coordinator, "filter_life")
 
-        :return: str
+    @callback
+    def _async_update_attrs(self) -> None:
         """
-        return "Filter Life"
+        Copy the filter life of the device into the sensor.
 
-    @property
-    def device_class(self) -> str:
+        :return: None
         """
-        Return the device class of this sensor.
+        self._attr_native_value = self._device.filter_life
 
-        :return: str
-        """
-        return SensorDeviceClass.POWER_FACTOR
 
-    @property
-    def native_value(self) -> int:
-        """
-        Return the filter life value.
+class GoveeAirQualitySensor(GoveeEntity, SensorEntity):
+    """Representation of a Govee Air Quality Sensor."""
 
-        :return: int
-        """
-        return self._filter_life
+    _attr_name = "Air Quality"
+    _attr_device_class = SensorDeviceClass.AQI
+    _device_attrs = ("air_quality",)
 
-    @property
-    def device_info(self) -> DeviceInfo:
+    def __init__(self, coordinator: GoveeDataUpdateCoordinator) -> None:
         """
-        Return device information for the sensor.
+        Initialize an Govee Air Quality Sensor.
 
-        :return: DeviceInfo
+        :param coordinator: Coordinator of the device
         """
-        identifiers = {
-            (DOMAIN, self._sensor.device_id),
-        }
-        return DeviceInfo(
-            identifiers=identifiers,
-            name=self._sensor.device_name,
-            manufacturer="Govee",
-            model=self._sensor.sku,
-            model_id=self._sensor.sku,
-        )
+        super().__init__(coordinator, "air_quality")
 
-    async def async_update(self) -> None:
+    @callback
+    def _async_update_attrs(self) -> None:
         """
-        Update the sensor state.
+        Copy the air quality of the device into the sensor.
 
         :return: None
         """
-        await self._sensor.update(self._api)
-        if hasattr(self._sensor, "filter_life"):
-            self._filter_life = self._sensor.filter_life
+        self._attr_native_value = self._device.air_quality
 
 
-class GoveeAirQualitySensor(SensorEntity):
-    """Representation of a Govee Air Quality Sensor."""
-
-    def __init__(self, sensor: dict, api: GoveeAPI, device: H7126) -> None:
-        """
-        Initialize an Govee Fan.
-
-        :param sensor: Dictionary containing sensor configuration
-        :param api: GoveeAPI instance
-        :param device: Device instance
-        """
-        _LOGGER.info(pformat(sensor))
-        self._attr_unique_id = f"{sensor['device_id']}_air_quality"
-        self._api = api
-        self._sensor = device
-
-        if hasattr(self._sensor, "air_quality"):
-            self._air_quality = self._sensor.air_quality
-        if hasattr(self._sensor, "online"):
-            self._online = self._sensor.online
-
-    @property
-    def available(self) -> bool:
-        """
-        Return True if entity is available.
-
-        :return: bool
-        """
-        return self._online
-
-    @property
-    def name(self) -> str:
-        """
-        Return the display name of this sensor.
-
-        :return: str
-        """
-        return "Air Quality"
+class GoveeMeasurementSensor(GoveeEntity, SensorEntity):
+    """
+    Representation of a Govee sensor that filters out insignificant changes of its reading.
 
-    @property
-    def device_class(self) -> str:
-        """
-        Return the device class of this sensor.
+    A reading is only published when it differs from the last published one by more than the entry's absolute
+    or relative deadband, or when the sensor has been silent for longer than the heartbeat.
+    """
 
-        :return: str
-        """
-        return SensorDeviceClass.AQI
+    # Option holding the absolute deadband of the sensor
+    _deadband_option: str
 
-    @property
-    def native_value(self) -> int:
+    def __init__(self, coordinator: GoveeDataUpdateCoordinator, key: str) -> None:
         """
-        Return the air quality value.
+        Initialize the sensor.
 
-        :return: int
+        :param coordinator: Coordinator of the device
+        :param key: Key of the sensor within the device
         """
-        return self._air_quality
+        super().__init__(coordinator, key)
+        options = coordinator.config_entry.options
+        self._deadband: float = options.get(self._deadband_option, 0)
+        self._relative_deadband: float = options.get(CONF_RELATIVE_DEADBAND, 0) / 100
+        self._heartbeat = timedelta(minutes=options.get(CONF_HEARTBEAT, DEFAULT_HEARTBEAT)).total_seconds()
 
-    @property
-    def device_info(self) -> DeviceInfo:
+    @callback
+    def _async_device_changed(self) -> bool:
         """
-        Return device information for the sensor.
+        Return True if the reading differs significantly from the published one.
 
-        :return: DeviceInfo
+        :return: bool
         """
-        identifiers = {
-            (DOMAIN, self._sensor.device_id),
-        }
-        return DeviceInfo(
-            identifiers=identifiers,
-            name=self._sensor.device_name,
-            manufacturer="Govee",
-            model=self._sensor.sku,
-            model_id=self._sensor.sku,
-        )
+        value = getattr(self._device, self._device_attrs[0])
+        if value is None or (published := self._attr_native_value) is None:
+            return True
+        if time.monotonic() - self._published_at >= self._heartbeat:
+            return True
+        if value == published:
+            return False
+        band = max(self._deadband, abs(published) * self._relative_deadband)
+        return abs(value - published) > band
 
-    async def async_update(self) -> None:
+    @callback
+    def _async_update_attrs(self) -> None:
         """
-        Update the sensor state.
+        Publish the reading of the device.
 
         :return: None
         """
-        await self._sensor.update(self._api)
-        if hasattr(self._sensor, "air_quality"):
-            self._air_quality = self._sensor.air_quality
+        self._attr_native_value = getattr(self._device, self._device_attrs[0])
+        self._published_at = time.monotonic()
 
 
-class GoveeHumiditySensor(SensorEntity):
+class GoveeHumiditySensor(GoveeMeasurementSensor):
     """Representation of a Govee Humidity Sensor."""
 
-    def __init__(self, sensor: dict, api: GoveeAPI, device: H5179) -> None:
-        """
-        Initialize an Govee Humidity Sensor.
+    _attr_name = "Humidity"
+    _attr_device_class = SensorDeviceClass.HUMIDITY
+    _attr_native_unit_of_measurement = PERCENTAGE
+    _device_attrs = ("humidity",)
+    _deadband_option = CONF_HUMIDITY_DEADBAND
 
-        :param sensor: Dictionary containing sensor configuration
-        :param api: GoveeAPI instance
-        :param device: Device instance
+    def __init__(self, coordinator: GoveeDataUpdateCoordinator) -> None:
         """
-        _LOGGER.info(pformat(sensor))
-        self._attr_unique_id = f"{sensor['device_id']}_humidity"
-        self._api = api
-        self._sensor = device
-
-        if hasattr(self._sensor, "humidity"):
-            self._humidity = self._sensor.humidity
-        if hasattr(self._sensor, "online"):
-            self._online = self._sensor.online
-
-    @property
-    def available(self) -> bool:
-        """
-        Return True if entity is available.
-
-        :return: bool
-        """
-        return self._online
+        Initialize an Govee Humidity Sensor.
 
-    @property
-    def name(self) -> str:
+        :param coordinator: Coordinator of the device
         """
-        Return the display name of this sensor.
+        super().__init__(coordinator, "humidity")
 
-        :return: str
-        """
-        return "Humidity"
 
-    @property
-    def device_class(self) -> str:
-        """
-        Return the device class of this sensor.
+class GoveeTemperatureSensor(GoveeMeasurementSensor):
+    """Representation of a Govee Temperature Sensor."""
 
-        :return: str
-        """
-        return SensorDeviceClass.HUMIDITY
+    _attr_name = "Temperature"
+    _attr_device_class = SensorDeviceClass.TEMPERATURE
+    _attr_native_unit_of_measurement = UnitOfTemperature.FAHRENHEIT
+    _device_attrs = ("temperature",)
+    _deadband_option = CONF_TEMPERATURE_DEADBAND
+
+    def __init__(self, coordinator: GoveeDataUpdateCoordinator) -> None:
+        """
+        Initialize an Govee Temperature Sensor.
+
+        :param coordinator: Coordinator of the device
+        """
+        super().__init__(coordinator, "temperature")
+
+
+# Sensor entity of every key a SKU can list in the registry
+SENSOR_TYPES: dict[str, type[GoveeEntity]] = {
+    "online": GoveeOnlineSensor,
+    "filter_life": GoveeFilterLifeSensor,
+    "air_quality": GoveeAirQualitySensor,
+    "humidity": GoveeHumiditySensor,
+    "temperature": GoveeTemperatureSensor,
+}
+
+
+@dataclass(frozen=True, kw_only=True)
+class GoveeAccountSensorDescription(SensorEntityDescription):
+    """Description of a Govee account sensor."""
+
+    value_fn: Callable[[GoveeAccount], StateType | datetime]
+
+
+# Health of the account, all taken from the integration's own request accounting
+ACCOUNT_SENSORS = (
+    GoveeAccountSensorDescription(
+        key="requests_used",
+        name="API requests today",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda account: account.quota.used,
+    ),
+    GoveeAccountSensorDescription(
+        key="requests_remaining",
+        name="API requests remaining",
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda account: account.quota.remaining,
+    ),
+    GoveeAccountSensorDescription(
+        key="quota_exhausted_at",
+        name="API quota exhausted",
+        device_class=SensorDeviceClass.TIMESTAMP,
+        value_fn=lambda account: account.quota.exhausted_at,
+    ),
+    GoveeAccountSensorDescription(
+        key="cloud_latency",
+        name="Cloud latency",
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        suggested_display_precision=0,
+        value_fn=lambda account: (
+            round(account.api.metrics.cloud_latency * 1000) if account.api.metrics.cloud_latency is not None else None
+        ),
+    ),
+    GoveeAccountSensorDescription(
+        key="consecutive_errors",
+        name="Consecutive cloud errors",
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda account: account.breaker.failures,
+    ),
+)
 
-    @property
-    def native_unit_of_measurement(self) -> str:
-        """
-        Return the unit of measurement for the sensor.
 
-        :return: str
-        """
-        return "%"
+class GoveeAccountSensor(SensorEntity):
+    """
+    Representation of a Govee account health sensor.
 
-    @property
-    def native_value(self) -> float:
-        """
-        Return the air quality value.
+    The sensors read the account's request accounting after every poll and never make a request of their own.
+    """
 
-        :return: int
-        """
-        return self._humidity
+    entity_description: GoveeAccountSensorDescription
+    _attr_has_entity_name = True
+    _attr_should_poll = False
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
 
-    @property
-    def device_info(self) -> DeviceInfo:
+    def __init__(self, account: GoveeAccount, description: GoveeAccountSensorDescription) -> None:
         """
-        Return device information for the sensor.
+        Initialize a Govee account sensor.
 
-        :return: DeviceInfo
+        :param account: Account the sensor reports on
+        :param description: Description of the sensor
         """
-        identifiers = {
-            (DOMAIN, self._sensor.device_id),
-        }
-        return DeviceInfo(
-            identifiers=identifiers,
-            name=self._sensor.device_name,
+        self.entity_description = description
+        self._account = account
+        self._attr_unique_id = f"{account_id(account.api_key)}_{description.key}"
+        self._attr_device_info = DeviceInfo(
+            identifiers={(GOVEE_DOMAIN, account_id(account.api_key))},
+            name="Govee account",
             manufacturer="Govee",
-            model=self._sensor.sku,
-            model_id=self._sensor.sku,
+            entry_type=DeviceEntryType.SERVICE,
         )
+        self._attr_native_value = description.value_fn(account)
 
-    async def async_update(self) -> None:
+    async def async_added_to_hass(self) -> None:
         """
-        Update the sensor state.
+        Listen for polls of the account.
 
         :return: None
         """
-        await self._sensor.update(self._api)
-        if hasattr(self._sensor, "humidity"):
-            self._humidity = self._sensor.humidity
-
-
-class GoveeTemperatureSensor(SensorEntity):
-    """Representation of a Govee Temperature Sensor."""
-
-    def __init__(self, sensor: dict, api: GoveeAPI, device: H5179) -> None:
-        """
-        Initialize an Govee Humidity Sensor.
-
-        :param sensor: Dictionary containing sensor configuration
-        :param api: GoveeAPI instance
-        :param device: Device instance
-        """
-        _LOGGER.info(pformat(sensor))
-        self._attr_unique_id = f"{sensor['device_id']}_temperature"
-        self._api = api
-        self._sensor = device
-
-        if hasattr(self._sensor, "temperature"):
-            self._temperature = self._sensor.temperature
-        if hasattr(self._sensor, "online"):
-            self._online = self._sensor.online
-
-    @property
-    def available(self) -> bool:
-        """
-        Return True if entity is available.
-
-        :return: bool
-        """
-        return self._online
-
-    @property
-    def name(self) -> str:
-        """
-        Return the display name of this sensor.
-
-        :return: str
-        """
-        return "Temperature"
-
-    @property
-    def device_class(self) -> str:
-        """
-        Return the device class of this sensor.
-
-        :return: str
-        """
-        return SensorDeviceClass.TEMPERATURE
-
-    @property
-    def native_unit_of_measurement(self) -> str:
-        """
-        Return the unit of measurement for the sensor.
-
-        :return: str
-        """
-        return UnitOfTemperature.FAHRENHEIT
-
-    @property
-    def native_value(self) -> float:
-        """
-        Return the air quality value.
-
-        :return: int
-        """
-        return self._temperature
-
-    @property
-    def device_info(self) -> DeviceInfo:
-        """
-        Return device information for the sensor.
-
-        :return: DeviceInfo
-        """
-        identifiers = {
-            (DOMAIN, self._sensor.device_id),
-        }
-        return DeviceInfo(
-            identifiers=identifiers,
-            name=self._sensor.device_name,
-            manufacturer="Govee",
-            model=self._sensor.sku,
-            model_id=self._sensor.sku,
-        )
+        await super().async_added_to_hass()
+        self.async_on_remove(self._account.async_add_listener(self._handle_account_update))
 
-    async def async_update(self) -> None:
+    @callback
+    def _handle_account_update(self) -> None:
         """
-        Update the sensor state.
+        Write the state when the value changed.
 
         :return: None
         """
-        await self._sensor.update(self._api)
-        if hasattr(self._sensor, "temperature"):
-            self._temperature = self._sensor.temperature
+        if (value := self.entity_description.value_fn(self._account)) != self._attr_native_value:
+            self._attr_native_value = value
+            self.async_write_ha_state()
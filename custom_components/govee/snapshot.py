@@ -0,0 +1,114 @@
+"""Last known device state for the Govee integration."""
+
+from __future__ import annotations
+
+import logging
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.core import callback
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN, SNAPSHOT_SAVE_DELAY, STORAGE_VERSION
+
+# Key of a snapshot holding when each of its values was last confirmed by the device
+UPDATED_AT = "updated_at"
+
+if TYPE_CHECKING:
+    from datetime import datetime
+
+    from devices.air_purifier.h7126 import H7126
+    from devices.fan.h7102 import H7102
+    from devices.thermometer.h5179 import H5179
+    from homeassistant.core import HomeAssistant
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def device_snapshot(device: H7126 | H7102 | H5179) -> dict[str, Any]:
+    """
+    Return the name, sku, ranges and values of a device.
+
+    :param device: Device instance
+    :return: dict
+    """
+    return {key: value for key, value in vars(device).items() if isinstance(value, bool | int | float | str)}
+
+
+class GoveeSnapshots:
+    """Persist the last known state of every device of an account."""
+
+    def __init__(self, hass: HomeAssistant, account_id: str) -> None:
+        """
+        Initialize the snapshots.
+
+        :param hass: Home Assistant instance
+        :param account_id: Identifier of the account, never the API key itself
+        """
+        self._snapshots: dict[str, dict[str, Any]] = {}
+        self._store: Store[dict[str, dict[str, Any]]] = Store(hass, STORAGE_VERSION, f"{DOMAIN}.snapshots.{account_id}")
+
+    async def async_load(self) -> None:
+        """
+        Load the snapshots from storage.
+
+        :return: None
+        """
+        self._snapshots = await self._store.async_load() or {}
+
+    @callback
+    def async_restore(self, device: H7126 | H7102 | H5179) -> dict[str, datetime] | None:
+        """
+        Apply the last known state to a device.
+
+        Values of snapshots written before their age was stored are taken as just confirmed.
+
+        :param device: Device instance
+        :return: When each restored value was last confirmed by the device, None if no snapshot of the device exists
+        """
+        if (snapshot := self._snapshots.get(device.device_id)) is None or snapshot.get("sku") != device.sku:
+            return None
+        for key, value in snapshot.items():
+            if hasattr(device, key):
+                setattr(device, key, value)
+        _LOGGER.debug("Restored %s from its last known state", device.device_id)
+        now = dt_util.utcnow()
+        updated_at = snapshot.get(UPDATED_AT, {})
+        return {
+            key: dt_util.utc_from_timestamp(updated_at[key]) if key in updated_at else now
+            for key in device_snapshot(device)
+        }
+
+    @callback
+    def async_update(self, device: H7126 | H7102 | H5179, updated_at: dict[str, datetime]) -> None:
+        """
+        Remember the current state of a device.
+
+        :param device: Device instance
+        :param updated_at: When each value of the device was last confirmed by the device
+        :return: None
+        """
+        self._snapshots[device.device_id] = {
+            **device_snapshot(device),
+            UPDATED_AT: {key: timestamp.timestamp() for key, timestamp in updated_at.items()},
+        }
+        self._store.async_delay_save(lambda: self._snapshots, SNAPSHOT_SAVE_DELAY)
+
+    @callback
+    def async_remove(self, device_id: str) -> None:
+        """
+        Forget the state of a removed device.
+
+        :param device_id: Device ID
+        :return: None
+        """
+        if self._snapshots.pop(device_id, None) is not None:
+            self._store.async_delay_save(lambda: self._snapshots, SNAPSHOT_SAVE_DELAY)
+
+    async def async_save(self) -> None:
+        """
+        Write the snapshots to storage right away.
+
+        :return: None
+        """
+        await self._store.async_save(self._snapshots)
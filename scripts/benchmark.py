@@ -0,0 +1,338 @@
+#!/usr/bin/env python3
+"""
+Benchmark the setup latency and cloud traffic of the Govee integration.
+
+Runs async_setup_entry of the integration, fan and sensor platforms against a fake Govee cloud with injected
+latency and reports, for every device count, the wall-clock setup time, the cloud calls made per device and
+the calls made by one poll cycle. Every size is set up twice on the same storage: once cold, and once warm
+from the snapshots the first setup left behind. The quota lets a whole poll cycle through in one burst, polls
+it defers nonetheless are reported on their own.
+
+Usage: scripts/benchmark.py --devices 1 10 100 500 --latency 0.3
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+import sys
+import tempfile
+import time
+from collections import Counter
+from contextlib import asynccontextmanager
+from pathlib import Path
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Any
+from unittest.mock import patch
+
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.const import CONF_API_KEY, CONF_DEVICE_ID, CONF_DEVICES, CONF_NAME
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import device_registry as dr
+from homeassistant.util import dt as dt_util
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from fake_cloud import CAPABILITIES, fake_devices
+
+from custom_components import govee
+from custom_components.govee import fan, sensor
+from custom_components.govee.api import GoveeClient, GoveeDeferredError
+from custom_components.govee.const import DATA_ACCOUNTS, DOMAIN, ENTRY_VERSION, QUOTA_BURST, STATE_FRESHNESS
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterator, Callable
+
+    from homeassistant.const import Platform
+
+API_KEY = "benchmark"
+
+
+class FakeResponse:
+    """Response of the fake Govee cloud."""
+
+    def __init__(self, payload: dict[str, Any]) -> None:
+        """
+        Initialize the response.
+
+        :param payload: JSON body of the response
+        """
+        self.status = 200
+        self._payload = payload
+
+    async def json(self) -> dict[str, Any]:
+        """
+        Return the JSON body.
+
+        :return: dict
+        """
+        return self._payload
+
+
+class FakeSession:
+    """Stand-in for the aiohttp session of GoveeClient that answers like the Govee OpenAPI."""
+
+    def __init__(self, devices: dict[str, str], latency: float, jitter: float) -> None:
+        """
+        Initialize the fake cloud.
+
+        :param devices: SKU of every device, keyed by device ID
+        :param latency: Seconds every request takes
+        :param jitter: Maximum random seconds added to the latency
+        """
+        self.devices = devices
+        self.calls: Counter[str] = Counter()
+        self._latency = latency
+        self._jitter = jitter
+
+    def get(self, path: str, **_kwargs: Any) -> Any:
+        """
+        Handle a GET request.
+
+        :param path: Request path
+        :return: Async context manager yielding the response
+        """
+        return self._respond(path, {})
+
+    def post(self, path: str, json: dict[str, Any], **_kwargs: Any) -> Any:
+        """
+        Handle a POST request.
+
+        :param path: Request path
+        :param json: Request body
+        :return: Async context manager yielding the response
+        """
+        return self._respond(path, json)
+
+    def head(self, path: str, **_kwargs: Any) -> Any:
+        """
+        Handle a HEAD request.
+
+        :param path: Request path
+        :return: Async context manager yielding the response
+        """
+        return self._respond(path, {})
+
+    async def close(self) -> None:
+        """
+        Close the session.
+
+        :return: None
+        """
+
+    @asynccontextmanager
+    async def _respond(self, path: str, body: dict[str, Any]) -> AsyncIterator[FakeResponse]:
+        """
+        Answer a request after the injected latency.
+
+        :param path: Request path
+        :param body: Request body
+        :return: The response
+        """
+        self.calls[path] += 1
+        await asyncio.sleep(self._latency + random.uniform(0, self._jitter))  # noqa: S311
+
+        payload: dict[str, Any] = {"code": 200, "requestId": body.get("requestId")}
+        if path.endswith("/user/devices"):
+            payload["data"] = [{"device": device_id, "sku": sku} for device_id, sku in self.devices.items()]
+        elif path.endswith("/device/state"):
+            device = body["payload"]
+            payload["payload"] = {**device, "capabilities": CAPABILITIES[device["sku"]]}
+        elif path.endswith("/device/control"):
+            payload["capability"] = {**body["payload"]["capability"], "state": {"status": "success"}}
+        yield FakeResponse(payload)
+
+
+class BenchmarkEntry:
+    """The parts of a config entry the integration uses during setup."""
+
+    def __init__(self, hass: HomeAssistant, devices: dict[str, str]) -> None:
+        """
+        Initialize the entry.
+
+        :param hass: Home Assistant instance
+        :param devices: SKU of every device, keyed by device ID
+        """
+        self.hass = hass
+        self.entry_id = "benchmark"
+        self.version = ENTRY_VERSION
+        self.state = ConfigEntryState.SETUP_IN_PROGRESS
+        self.options: MappingProxyType[str, Any] = MappingProxyType({})
+        self.data = MappingProxyType(
+            {
+                CONF_API_KEY: API_KEY,
+                CONF_DEVICES: [
+                    {CONF_DEVICE_ID: device_id, CONF_NAME: sku.lower()} for device_id, sku in devices.items()
+                ],
+            }
+        )
+        self._on_unload: list[Callable[[], Any]] = []
+
+    def async_on_unload(self, func: Callable[[], Any]) -> None:
+        """
+        Register a function to call when the entry is unloaded.
+
+        :param func: Function to call
+        :return: None
+        """
+        self._on_unload.append(func)
+
+    def add_update_listener(self, _listener: Callable[..., Any]) -> Callable[[], None]:
+        """
+        Register an update listener, entries are never updated during the benchmark.
+
+        :return: Function removing the listener
+        """
+        return lambda: None
+
+    def async_create_background_task(self, hass: HomeAssistant, target: Any, name: str) -> asyncio.Task[Any]:
+        """
+        Create a background task of the entry.
+
+        :param hass: Home Assistant instance
+        :param target: Coroutine to run
+        :param name: Name of the task
+        :return: The task
+        """
+        return hass.async_create_background_task(target, name)
+
+    async def async_unload(self) -> None:
+        """
+        Run the unload callbacks of the entry.
+
+        :return: None
+        """
+        for func in reversed(self._on_unload):
+            if asyncio.iscoroutine(result := func()):
+                await result
+
+
+class BenchmarkConfigEntries:
+    """Forward platform setups straight to the fan and sensor platforms."""
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """
+        Initialize the config entries stand-in.
+
+        :param hass: Home Assistant instance
+        """
+        self.hass = hass
+        self.entities: list[Any] = []
+
+    async def async_forward_entry_setups(self, entry: BenchmarkEntry, _platforms: list[Platform]) -> None:
+        """
+        Set up the fan and sensor platforms of an entry concurrently.
+
+        :param entry: Config entry
+        :return: None
+        """
+        await asyncio.gather(
+            fan.async_setup_entry(self.hass, entry, self.entities.extend),
+            sensor.async_setup_entry(self.hass, entry, self.entities.extend),
+        )
+
+    async def async_unload_platforms(self, _entry: BenchmarkEntry, _platforms: list[Platform]) -> bool:
+        """
+        Unload the platforms of an entry.
+
+        :return: True
+        """
+        return True
+
+
+async def async_run(config_dir: str, devices: dict[str, str], latency: float, jitter: float) -> dict[str, float]:
+    """
+    Set up the integration once, run one poll cycle and unload it again.
+
+    :param config_dir: Home Assistant config directory, its storage is kept between runs
+    :param devices: SKU of every device, keyed by device ID
+    :param latency: Seconds every request takes
+    :param jitter: Maximum random seconds added to the latency
+    :return: Measurements of the run
+    """
+    hass = HomeAssistant(config_dir)
+    hass.config_entries = BenchmarkConfigEntries(hass)
+    # Setup moves devices registered by earlier versions, so the device registry must be loaded
+    await dr.async_load(hass)
+    session = FakeSession(devices, latency, jitter)
+    entry = BenchmarkEntry(hass, devices)
+
+    def client(hass: HomeAssistant, api_key: str, quota: Any = None, breaker: Any = None) -> GoveeClient:
+        """Build the account's client on the fake cloud."""
+        return GoveeClient(hass, api_key, quota, breaker, session=session)
+
+    with (
+        patch("custom_components.govee.coordinator.GoveeClient", client),
+        # The cycle is measured, not the pacing of the daily quota, which would cap it at the burst
+        patch("custom_components.govee.quota.QUOTA_BURST", max(len(devices), QUOTA_BURST)),
+    ):
+        start = time.perf_counter()
+        await govee.async_setup_entry(hass, entry)
+        setup = time.perf_counter() - start
+        # Background refreshes of snapshot-restored devices belong to the setup traffic
+        await hass.async_block_till_done(wait_background_tasks=True)
+        setup_calls = session.calls.total()
+
+        account = hass.data[DOMAIN][DATA_ACCOUNTS][API_KEY]
+        # States fetched during setup would otherwise be served from the client's cache
+        await asyncio.sleep(STATE_FRESHNESS)
+        session.calls.clear()
+        start = time.perf_counter()
+        # One base interval later, when every device polled during setup is due again
+        await account.async_poll(dt_util.utcnow() + account.scan_interval)
+        poll = time.perf_counter() - start
+        poll_calls = session.calls.total()
+        deferred = sum(isinstance(error, GoveeDeferredError) for error in account.api.errors.values())
+
+        await govee.async_unload_entry(hass, entry)
+        await entry.async_unload()
+
+    await hass.async_stop(force=True)
+    return {
+        "entities": len(hass.config_entries.entities),
+        "setup": setup,
+        "calls_per_device": setup_calls / len(devices),
+        "poll": poll,
+        "poll_calls": poll_calls,
+        "deferred": deferred,
+    }
+
+
+async def async_main(args: argparse.Namespace) -> None:
+    """
+    Run the benchmark for every device count.
+
+    :param args: Command line arguments
+    :return: None
+    """
+    sys.stdout.write(
+        f"{'devices':>8} {'entities':>9} {'cold s':>8} {'warm s':>8} "
+        f"{'calls/dev':>10} {'poll s':>8} {'calls/poll':>11} {'deferred':>9}\n"
+    )
+    for count in args.devices:
+        devices = fake_devices(count)
+        with tempfile.TemporaryDirectory() as config_dir:
+            cold = await async_run(config_dir, devices, args.latency, args.jitter)
+            warm = await async_run(config_dir, devices, args.latency, args.jitter)
+        sys.stdout.write(
+            f"{count:>8} {cold['entities']:>9} {cold['setup']:>8.3f} {warm['setup']:>8.3f} "
+            f"{cold['calls_per_device']:>10.2f} {cold['poll']:>8.3f} {cold['poll_calls']:>11} {cold['deferred']:>9}\n"
+        )
+
+
+def main() -> None:
+    """
+    Parse the command line and run the benchmark.
+
+    :return: None
+    """
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--devices", type=int, nargs="+", default=[1, 10, 100, 500], help="Device counts to set up")
+    parser.add_argument("--latency", type=float, default=0.3, help="Seconds every cloud request takes")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Maximum random seconds added to the latency")
+    asyncio.run(async_main(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
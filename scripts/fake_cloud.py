@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the Govee OpenAPI.
+
+Serves the user/devices, device/state and device/control endpoints for a set of fake devices and injects
+latency, 429 rate limiting, 5xx errors and offline devices. Used by load_test.py, and can be run on its own
+to point a development instance at it.
+
+Usage: scripts/fake_cloud.py --devices 50 --latency 0.3 --rate-limit 10 --error-rate 0.01 --offline 0.1
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+import time
+from collections import Counter, deque
+from typing import Any
+
+from aiohttp import web
+
+API_PATH = "/router/api/v1"
+
+# State capabilities the device classes of every supported SKU parse
+CAPABILITIES: dict[str, list[dict[str, Any]]] = {
+    "H7126": [
+        {"type": "devices.capabilities.online", "instance": "online", "state": {"value": True}},
+        {"type": "devices.capabilities.on_off", "instance": "powerSwitch", "state": {"value": 1}},
+        {
+            "type": "devices.capabilities.work_mode",
+            "instance": "workMode",
+            "state": {"value": {"workMode": 1, "modeValue": 1}},
+        },
+        {"type": "devices.capabilities.property", "instance": "filterLifeTime", "state": {"value": 80}},
+        {"type": "devices.capabilities.property", "instance": "airQuality", "state": {"value": 12}},
+    ],
+    "H7102": [
+        {"type": "devices.capabilities.online", "instance": "online", "state": {"value": True}},
+        {"type": "devices.capabilities.on_off", "instance": "powerSwitch", "state": {"value": 1}},
+        {"type": "devices.capabilities.toggle", "instance": "oscillationToggle", "state": {"value": 0}},
+        {
+            "type": "devices.capabilities.work_mode",
+            "instance": "workMode",
+            "state": {"value": {"workMode": 1, "modeValue": 3}},
+        },
+    ],
+    "H5179": [
+        {"type": "devices.capabilities.online", "instance": "online", "state": {"value": True}},
+        {"type": "devices.capabilities.property", "instance": "sensorTemperature", "state": {"value": 71.2}},
+        {"type": "devices.capabilities.property", "instance": "sensorHumidity", "state": {"value": 43.5}},
+    ],
+}
+
+OFFLINE = [{"type": "devices.capabilities.online", "instance": "online", "state": {"value": False}}]
+
+
+def fake_devices(count: int) -> dict[str, str]:
+    """
+    Return device IDs for a number of devices, cycling through the supported SKUs.
+
+    :param count: Number of devices
+    :return: SKU of every device, keyed by device ID
+    """
+    skus = list(CAPABILITIES)
+    return {f"AA:BB:CC:DD:{index // 256:02X}:{index % 256:02X}": skus[index % len(skus)] for index in range(count)}
+
+
+class FakeGoveeCloud:
+    """aiohttp application answering like the Govee OpenAPI."""
+
+    def __init__(  # noqa: PLR0913
+        self,
+        devices: dict[str, str],
+        *,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        rate_limit: int = 0,
+        error_rate: float = 0.0,
+        offline: float = 0.0,
+    ) -> None:
+        """
+        Initialize the fake cloud.
+
+        :param devices: SKU of every device, keyed by device ID
+        :param latency: Seconds every request takes
+        :param jitter: Maximum random seconds added to the latency
+        :param rate_limit: Requests per second answered before returning 429, 0 for no limit
+        :param error_rate: Fraction of requests answered with a 5xx error
+        :param offline: Fraction of the devices that report being offline
+        """
+        self.devices = devices
+        self.offline = set(random.sample(sorted(devices), round(len(devices) * offline)))
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_limit = rate_limit
+        self.error_rate = error_rate
+        # Responses sent, keyed by endpoint and HTTP status
+        self.calls: Counter[tuple[str, int]] = Counter()
+        self._recent: deque[float] = deque()
+
+    @property
+    def app(self) -> web.Application:
+        """
+        Return the aiohttp application serving the endpoints.
+
+        :return: web.Application
+        """
+        app = web.Application(middlewares=[self._middleware])
+        app.router.add_get(f"{API_PATH}/user/devices", self._handle_devices)
+        app.router.add_post(f"{API_PATH}/device/state", self._handle_state)
+        app.router.add_post(f"{API_PATH}/device/control", self._handle_control)
+        # Connection pre-warming
+        app.router.add_route("HEAD", "/", self._handle_root)
+        return app
+
+    @web.middleware
+    async def _middleware(self, request: web.Request, handler: Any) -> web.StreamResponse:
+        """
+        Apply latency, authentication, rate limiting and injected errors to every request.
+
+        :param request: Incoming request
+        :param handler: Handler of the endpoint
+        :return: The response
+        """
+        await asyncio.sleep(self.latency + random.uniform(0, self.jitter))  # noqa: S311
+        response = await self._respond(request, handler)
+        self.calls[request.path.removeprefix(API_PATH), response.status] += 1
+        return response
+
+    async def _respond(self, request: web.Request, handler: Any) -> web.StreamResponse:
+        """
+        Answer a request, or reject it the way the Govee cloud does.
+
+        :param request: Incoming request
+        :param handler: Handler of the endpoint
+        :return: The response
+        """
+        if request.method == "HEAD":
+            return await handler(request)
+        if not request.headers.get("Govee-API-Key"):
+            return web.json_response({"code": 401, "msg": "Invalid API Key"}, status=401)
+
+        now = time.monotonic()
+        while self._recent and now - self._recent[0] > 1:
+            self._recent.popleft()
+        if self.rate_limit and len(self._recent) >= self.rate_limit:
+            return web.json_response({"code": 429, "msg": "Too Many Requests"}, status=429)
+        self._recent.append(now)
+
+        if random.random() < self.error_rate:  # noqa: S311
+            return web.json_response({"code": 503, "msg": "Service Unavailable"}, status=503)
+        return await handler(request)
+
+    async def _handle_root(self, _request: web.Request) -> web.Response:
+        """
+        Answer the connection pre-warming request.
+
+        :return: The response
+        """
+        return web.Response(status=404)
+
+    async def _handle_devices(self, _request: web.Request) -> web.Response:
+        """
+        List the devices of the account.
+
+        :return: The response
+        """
+        data = [{"device": device_id, "sku": sku} for device_id, sku in self.devices.items()]
+        return web.json_response({"code": 200, "message": "success", "data": data})
+
+    async def _handle_state(self, request: web.Request) -> web.Response:
+        """
+        Report the state of a device.
+
+        :param request: Incoming request
+        :return: The response
+        """
+        body = await request.json()
+        device = body["payload"]
+        if (sku := self.devices.get(device["device"])) is None:
+            return web.json_response({"code": 400, "msg": "devices not exist"}, status=400)
+        capabilities = OFFLINE if device["device"] in self.offline else CAPABILITIES[sku]
+        payload = {**device, "capabilities": capabilities}
+        return web.json_response({"code": 200, "msg": "success", "requestId": body["requestId"], "payload": payload})
+
+    async def _handle_control(self, request: web.Request) -> web.Response:
+        """
+        Apply a command to a device.
+
+        :param request: Incoming request
+        :return: The response
+        """
+        body = await request.json()
+        payload = body["payload"]
+        if payload["device"] not in self.devices:
+            return web.json_response({"code": 400, "msg": "devices not exist"}, status=400)
+        if payload["device"] in self.offline:
+            return web.json_response({"code": 400, "msg": "devices offline"}, status=400)
+        capability = {**payload["capability"], "state": {"status": "success"}}
+        return web.json_response(
+            {"code": 200, "msg": "success", "requestId": body["requestId"], "capability": capability}
+        )
+
+
+def main() -> None:
+    """
+    Parse the command line and serve the fake cloud.
+
+    :return: None
+    """
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8080, help="Port to listen on")
+    parser.add_argument("--devices", type=int, default=10, help="Number of devices of the account")
+    parser.add_argument("--latency", type=float, default=0.3, help="Seconds every request takes")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Maximum random seconds added to the latency")
+    parser.add_argument("--rate-limit", type=int, default=0, help="Requests per second before returning 429")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests failing with 503")
+    parser.add_argument("--offline", type=float, default=0.0, help="Fraction of devices that are offline")
+    args = parser.parse_args()
+
+    cloud = FakeGoveeCloud(
+        fake_devices(args.devices),
+        latency=args.latency,
+        jitter=args.jitter,
+        rate_limit=args.rate_limit,
+        error_rate=args.error_rate,
+        offline=args.offline,
+    )
+    web.run_app(cloud.app, host="127.0.0.1", port=args.port)
+
+
+if __name__ == "__main__":
+    main()
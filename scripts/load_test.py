@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+Load test the Govee integration against the local fake Govee cloud.
+
+Serves fake_cloud.py on a local port, sets up the integration with its real API client pointed at it, adds
+the fan and sensor entities to Home Assistant and drives them through a number of poll cycles. Reports the
+requests per second the cloud served, the p50/p99 latency from the start of a cycle to the update of each
+device, the state writes and the quota used.
+
+Usage: scripts/load_test.py --devices 100 --cycles 20 --latency 0.3 --rate-limit 10 --error-rate 0.05
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import statistics
+import sys
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+from unittest.mock import patch
+
+import aiohttp
+from aiohttp import web
+from benchmark import BenchmarkConfigEntries, BenchmarkEntry
+from fake_cloud import FakeGoveeCloud, fake_devices
+from homeassistant.const import CONF_API_KEY, EVENT_STATE_CHANGED, Platform
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.entity_platform import EntityPlatform
+from homeassistant.util import dt as dt_util
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from custom_components import govee
+from custom_components.govee import fan, sensor
+from custom_components.govee.api import GoveeClient, async_validate_response
+from custom_components.govee.const import DATA_ACCOUNTS, DOMAIN, QUOTA_BURST, SCAN_INTERVAL
+
+if TYPE_CHECKING:
+    from custom_components.govee.coordinator import GoveeAccount
+
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class LoadTestConfigEntries(BenchmarkConfigEntries):
+    """Add the entities of the fan and sensor platforms to Home Assistant."""
+
+    async def async_forward_entry_setups(self, entry: BenchmarkEntry, _platforms: list[Platform]) -> None:
+        """
+        Set up the fan and sensor platforms of an entry and add their entities to entity platforms.
+
+        :param entry: Config entry
+        :return: None
+        """
+        for domain, module in ((Platform.FAN, fan), (Platform.SENSOR, sensor)):
+            platform = EntityPlatform(
+                hass=self.hass,
+                logger=_LOGGER,
+                domain=domain,
+                platform_name=DOMAIN,
+                platform=None,
+                scan_interval=SCAN_INTERVAL,
+                entity_namespace=None,
+            )
+            entities: list[Any] = []
+            await module.async_setup_entry(self.hass, entry, entities.extend)
+            await platform.async_add_entities(entities)
+            self.entities.extend(entities)
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    """
+    Return a percentile of the values.
+
+    :param values: Measured values
+    :param fraction: Percentile as a fraction between 0 and 1
+    :return: float
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+
+async def async_main(args: argparse.Namespace) -> None:
+    """
+    Run the load test.
+
+    :param args: Command line arguments
+    :return: None
+    """
+    devices = fake_devices(args.devices)
+    cloud = FakeGoveeCloud(
+        devices,
+        latency=args.latency,
+        jitter=args.jitter,
+        rate_limit=args.rate_limit,
+        error_rate=args.error_rate,
+        offline=args.offline,
+    )
+    runner = web.AppRunner(cloud.app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = runner.addresses[0][1]
+
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = HomeAssistant(config_dir)
+        await asyncio.gather(dr.async_load(hass), er.async_load(hass))
+        hass.config_entries = LoadTestConfigEntries(hass)
+        entry = BenchmarkEntry(hass, devices)
+
+        state_writes = 0
+
+        @callback
+        def async_count_write(_event: Any) -> None:
+            nonlocal state_writes
+            state_writes += 1
+
+        def client(hass: HomeAssistant, api_key: str, quota: Any = None, breaker: Any = None) -> GoveeClient:
+            """Build the account's client on a session of its own pointed at the fake cloud."""
+            session = aiohttp.ClientSession(
+                base_url=f"http://127.0.0.1:{port}",
+                headers={"Govee-API-Key": api_key, "Content-Type": "application/json"},
+                raise_for_status=async_validate_response,
+            )
+            return GoveeClient(hass, api_key, quota, breaker, session=session)
+
+        with (
+            patch("custom_components.govee.coordinator.GoveeClient", client),
+            patch("custom_components.govee.quota.QUOTA_BURST", args.burst),
+            # Every cycle stands for a whole base interval, so no state is fresh enough to be served again
+            patch("custom_components.govee.api.STATE_FRESHNESS", 0),
+        ):
+            await govee.async_setup_entry(hass, entry)
+            await hass.async_block_till_done(wait_background_tasks=True)
+            account: GoveeAccount = hass.data[DOMAIN][DATA_ACCOUNTS][entry.data[CONF_API_KEY]]
+            # The account scheduler is driven by the load test instead of the clock
+            account.async_shutdown()
+
+            cycle_start = 0.0
+            latencies: list[float] = []
+            for coordinator in account.coordinators.values():
+                coordinator.async_add_listener(lambda: latencies.append(time.perf_counter() - cycle_start))
+
+            cloud.calls.clear()
+            used = account.quota.used
+            hass.bus.async_listen(EVENT_STATE_CHANGED, async_count_write)
+            start = time.perf_counter()
+            for _ in range(args.cycles):
+                cycle_start = time.perf_counter()
+                # Every cycle stands for one base interval, devices that backed off or slowed down are not due
+                await account.async_poll(dt_util.utcnow() + account.scan_interval)
+                await asyncio.sleep(args.interval)
+            elapsed = time.perf_counter() - start
+            failed = sum(not coordinator.last_update_success for coordinator in account.coordinators.values())
+            used = account.quota.used - used
+            remaining = account.quota.remaining
+
+            await govee.async_unload_entry(hass, entry)
+            await entry.async_unload()
+        await hass.async_stop(force=True)
+
+    await runner.cleanup()
+
+    requests = cloud.calls.total()
+    entities = len(hass.config_entries.entities)
+    by_status: Counter[int] = Counter()
+    for (_path, status), count in cloud.calls.items():
+        by_status[status] += count
+    sys.stdout.write(
+        f"devices            {len(devices)} ({len(cloud.offline)} offline), {entities} entities\n"
+        f"cycles             {args.cycles} in {elapsed:.2f}s\n"
+        f"requests           {requests} ({requests / elapsed:.1f}/s), by status {dict(sorted(by_status.items()))}\n"
+        f"updates            {len(latencies)} of {len(devices) * args.cycles} device polls\n"
+        f"update latency     p50 {percentile(latencies, 0.5):.3f}s, p99 {percentile(latencies, 0.99):.3f}s, "
+        f"mean {statistics.fmean(latencies) if latencies else 0:.3f}s\n"
+        f"failed devices     {failed} after the last cycle\n"
+        f"state writes       {state_writes}\n"
+        f"quota              {used} used, {remaining} remaining today\n"
+    )
+
+
+def main() -> None:
+    """
+    Parse the command line and run the load test.
+
+    :return: None
+    """
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--devices", type=int, default=100, help="Number of devices of the account")
+    parser.add_argument("--cycles", type=int, default=20, help="Poll cycles to run")
+    parser.add_argument("--interval", type=float, default=0.0, help="Seconds between poll cycles")
+    parser.add_argument("--latency", type=float, default=0.3, help="Seconds every cloud request takes")
+    parser.add_argument("--jitter", type=float, default=0.1, help="Maximum random seconds added to the latency")
+    parser.add_argument("--rate-limit", type=int, default=0, help="Requests per second before the cloud returns 429")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests failing with 503")
+    parser.add_argument("--offline", type=float, default=0.0, help="Fraction of devices that are offline")
+    parser.add_argument(
+        "--burst",
+        type=int,
+        default=QUOTA_BURST,
+        help="Polls the quota pacing lets through at once, raise it to load the cloud beyond the daily budget",
+    )
+    asyncio.run(async_main(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Fixtures for the Govee integration tests."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import pytest
+from homeassistant.const import CONF_API_KEY, CONF_DEVICES
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.govee.const import DOMAIN, ENTRY_VERSION
+from custom_components.govee.coordinator import GoveeAccount, GoveeDataUpdateCoordinator
+from custom_components.govee.registry import get_sku
+
+from .local_mqtt import LocalMqttBroker
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterator, Awaitable, Callable
+
+    from homeassistant.core import HomeAssistant
+
+API_KEY = "test-api-key"
+DEVICE_ID = "AA:BB:CC:DD:EE:FF:00:11"
+
+type AddDevice = Callable[..., Awaitable[GoveeDataUpdateCoordinator]]
+
+
+@pytest.fixture
+async def mqtt_broker(socket_enabled: None) -> AsyncIterator[LocalMqttBroker]:
+    """
+    Serve a local MQTT broker stand-in on a free loopback port.
+
+    :param socket_enabled: Lets the test open loopback sockets
+
+    :return: The running broker
+    """
+    broker = LocalMqttBroker()
+    await broker.async_start()
+    yield broker
+    await broker.async_stop()
+
+
+@pytest.fixture
+def config_entry(hass: HomeAssistant) -> MockConfigEntry:
+    """
+    Add an account entry without devices, the tests add the devices they need to the account directly.
+
+    :param hass: Home Assistant instance
+    :return: The entry
+    """
+    entry = MockConfigEntry(domain=DOMAIN, data={CONF_API_KEY: API_KEY, CONF_DEVICES: []}, version=ENTRY_VERSION)
+    entry.add_to_hass(hass)
+    return entry
+
+
+@pytest.fixture
+async def account(hass: HomeAssistant) -> AsyncIterator[GoveeAccount]:
+    """
+    Create the account of the entry and release it and its devices after the test.
+
+    :param hass: Home Assistant instance
+    :return: The account
+    """
+    account = GoveeAccount(hass, API_KEY)
+    yield account
+    for coordinator in list(account.coordinators.values()):
+        await coordinator.async_shutdown()
+    account.async_shutdown()
+    await account.api.async_close()
+
+
+@pytest.fixture
+def add_device(hass: HomeAssistant, config_entry: MockConfigEntry, account: GoveeAccount) -> AddDevice:
+    """
+    Return a function adding a device of the given SKU to the account.
+
+    :param hass: Home Assistant instance
+    :param config_entry: Entry of the account
+    :param account: The account
+    :return: Function taking the SKU and optionally the device ID, returning the coordinator of the device
+    """
+
+    async def _add_device(sku: str, device_id: str = DEVICE_ID) -> GoveeDataUpdateCoordinator:
+        device = await get_sku(sku).async_create_device(hass, device_id)
+        coordinator = GoveeDataUpdateCoordinator(hass, config_entry, account, device)
+        account.async_add_coordinator(coordinator)
+        return coordinator
+
+    return _add_device
@@ -0,0 +1,68 @@
+"""Local stand-in for a Govee device answering the LAN API over UDP."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+from typing import Any
+
+
+class LanDeviceStandIn(asyncio.DatagramProtocol):
+    """Answer scans, status requests and commands like a Govee device on the loopback interface."""
+
+    def __init__(self, device_id: str, status: dict[str, Any]) -> None:
+        """
+        Initialize the device.
+
+        :param device_id: Device ID announced in scan replies
+        :param status: Data of the devStatus reply, updated by commands
+        """
+        self.device_id = device_id
+        self.status = status
+        self.silent = False
+        self.received: list[dict[str, Any]] = []
+        self.port = 0
+        self._transport: asyncio.DatagramTransport | None = None
+
+    async def async_start(self) -> None:
+        """
+        Listen on a free loopback port.
+
+        :return: None
+        """
+        loop = asyncio.get_running_loop()
+        self._transport, _ = await loop.create_datagram_endpoint(lambda: self, local_addr=("127.0.0.1", 0))
+        self.port = self._transport.get_extra_info("sockname")[1]
+
+    def stop(self) -> None:
+        """
+        Stop listening.
+
+        :return: None
+        """
+        if self._transport is not None:
+            self._transport.close()
+
+    def datagram_received(self, data: bytes, addr: tuple[str, int]) -> None:
+        """
+        Answer a message, or stay quiet when told to.
+
+        :param data: Payload of the message
+        :param addr: Address of the sender
+        :return: None
+        """
+        message = json.loads(data)["msg"]
+        self.received.append(message)
+        if self.silent or self._transport is None:
+            return
+        match message["cmd"]:
+            case "scan":
+                reply = {"cmd": "scan", "data": {"ip": "127.0.0.1", "device": self.device_id, "sku": "H6008"}}
+            case "devStatus":
+                reply = {"cmd": "devStatus", "data": self.status}
+            case "turn":
+                self.status["onOff"] = message["data"]["value"]
+                return
+            case _:
+                return
+        self._transport.sendto(json.dumps({"msg": reply}).encode(), addr)
@@ -0,0 +1,142 @@
+"""Local stand-in for the Govee MQTT broker, speaking just enough MQTT 3.1.1 for a subscriber."""
+
+from __future__ import annotations
+
+import asyncio
+import struct
+
+CONNECT = 1
+PUBLISH = 3
+SUBSCRIBE = 8
+PINGREQ = 12
+DISCONNECT = 14
+
+
+def _encode_length(length: int) -> bytes:
+    """
+    Encode the remaining length of a packet.
+
+    :param length: Remaining length
+    :return: bytes
+    """
+    encoded = bytearray()
+    while True:
+        length, digit = divmod(length, 128)
+        encoded.append(digit | (0x80 if length else 0))
+        if not length:
+            return bytes(encoded)
+
+
+class LocalMqttBroker:
+    """Accept subscribers on a loopback port and publish to them."""
+
+    def __init__(self) -> None:
+        """Initialize the broker."""
+        self.port = 0
+        self.credentials: list[tuple[str, str]] = []
+        self.topics: list[str] = []
+        self.subscribed = asyncio.Event()
+        self._server: asyncio.Server | None = None
+        self._subscribers: list[asyncio.StreamWriter] = []
+
+    async def async_start(self) -> None:
+        """
+        Listen on a free loopback port.
+
+        :return: None
+        """
+        self._server = await asyncio.start_server(self._async_serve, "127.0.0.1", 0)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def async_stop(self) -> None:
+        """
+        Drop every subscriber and stop listening.
+
+        :return: None
+        """
+        for writer in self._subscribers:
+            writer.close()
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    def publish(self, topic: str, payload: bytes) -> None:
+        """
+        Send a QoS 0 message to every subscriber.
+
+        :param topic: Topic of the message
+        :param payload: Payload of the message
+        :return: None
+        """
+        body = struct.pack("!H", len(topic)) + topic.encode() + payload
+        for writer in self._subscribers:
+            writer.write(bytes([PUBLISH << 4]) + _encode_length(len(body)) + body)
+
+    async def _async_serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """
+        Answer the packets of one client until it disconnects.
+
+        :param reader: Stream of the client
+        :param writer: Stream to the client
+        :return: None
+        """
+        try:
+            while True:
+                packet_type, body = await self._async_read_packet(reader)
+                if packet_type == CONNECT:
+                    self.credentials.append(self._credentials(body))
+                    writer.write(b"\x20\x02\x00\x00")
+                elif packet_type == SUBSCRIBE:
+                    (packet_id,) = struct.unpack("!H", body[:2])
+                    (length,) = struct.unpack("!H", body[2:4])
+                    self.topics.append(body[4 : 4 + length].decode())
+                    self._subscribers.append(writer)
+                    writer.write(b"\x90\x03" + struct.pack("!H", packet_id) + b"\x00")
+                    self.subscribed.set()
+                elif packet_type == PINGREQ:
+                    writer.write(b"\xd0\x00")
+                elif packet_type == DISCONNECT:
+                    break
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            if writer in self._subscribers:
+                self._subscribers.remove(writer)
+            writer.close()
+
+    @staticmethod
+    async def _async_read_packet(reader: asyncio.StreamReader) -> tuple[int, bytes]:
+        """
+        Read one packet.
+
+        :param reader: Stream of the client
+        :return: Type and body of the packet
+        """
+        header = (await reader.readexactly(1))[0]
+        length = shift = 0
+        while True:
+            digit = (await reader.readexactly(1))[0]
+            length += (digit & 0x7F) << shift
+            shift += 7
+            if not digit & 0x80:
+                break
+        return header >> 4, await reader.readexactly(length)
+
+    @staticmethod
+    def _credentials(body: bytes) -> tuple[str, str]:
+        """
+        Read the username and password of a CONNECT packet.
+
+        :param body: Body of the packet
+        :return: Username and password
+        """
+        (name_length,) = struct.unpack("!H", body[:2])
+        offset = 2 + name_length + 4
+        fields = []
+        while offset < len(body):
+            (length,) = struct.unpack("!H", body[offset : offset + 2])
+            fields.append(body[offset + 2 : offset + 2 + length].decode())
+            offset += 2 + length
+        # Client ID, then username and password
+        return fields[-2], fields[-1]
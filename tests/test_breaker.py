@@ -0,0 +1,54 @@
+"""Tests of how an outage of the Govee cloud is reported."""
+
+from __future__ import annotations
+
+import logging
+from typing import TYPE_CHECKING
+from unittest.mock import AsyncMock, patch
+
+import aiohttp
+from homeassistant.util import dt as dt_util
+
+from custom_components.govee.const import MAX_BACKOFF
+
+if TYPE_CHECKING:
+    import pytest
+
+    from custom_components.govee.coordinator import GoveeAccount
+
+    from .conftest import AddDevice
+
+DEVICE_IDS = [f"AA:BB:CC:DD:EE:FF:00:{index:02}" for index in range(8)]
+
+
+async def test_outage_is_logged_once(
+    account: GoveeAccount, add_device: AddDevice, caplog: pytest.LogCaptureFixture
+) -> None:
+    """An outage is logged when the breaker trips and when the cloud answers again, not once per device."""
+    # Every poll is let through, however many the test makes in a row
+    account.api.quota = None
+    coordinators = [await add_device("H7102", device_id) for device_id in DEVICE_IDS]
+    state = AsyncMock(side_effect=aiohttp.ClientConnectionError("Cannot connect"))
+    caplog.set_level(logging.INFO)
+    with patch("util.govee_api.GoveeAPI.get_device_state", state):
+        await account.async_poll(dt_util.utcnow())
+        assert account.breaker.tripped
+        assert not any(coordinator.last_update_success for coordinator in coordinators)
+
+        # Failed probes while the breaker is open
+        for _ in range(3):
+            account.breaker._retry_at = 0
+            await account.async_poll(dt_util.utcnow())
+
+        state.side_effect = None
+        state.return_value = {"capabilities": []}
+        account.breaker._retry_at = 0
+        await account.async_poll(dt_util.utcnow())
+        assert not account.breaker.tripped
+        await account.async_poll(dt_util.utcnow() + MAX_BACKOFF)
+    assert all(coordinator.last_update_success for coordinator in coordinators)
+
+    assert [(record.levelno, record.name) for record in caplog.records] == [
+        (logging.WARNING, "custom_components.govee.breaker"),
+        (logging.INFO, "custom_components.govee.breaker"),
+    ]
@@ -0,0 +1,82 @@
+"""Tests of the sharing of device state requests by the client."""
+
+from __future__ import annotations
+
+import asyncio
+from typing import TYPE_CHECKING, Any
+from unittest.mock import AsyncMock, patch
+
+from .conftest import DEVICE_ID
+
+if TYPE_CHECKING:
+    from custom_components.govee.coordinator import GoveeAccount
+
+SKU = "H7102"
+POWER_ON = {"type": "devices.capabilities.on_off", "instance": "powerSwitch", "value": 1}
+
+
+async def test_concurrent_callers_share_one_request(account: GoveeAccount) -> None:
+    """Callers asking while the state of a device is being fetched wait for that request instead of sending theirs."""
+    release = asyncio.Event()
+
+    async def get_device_state(_sku: str, _device: str, *_args: Any, **_kwargs: Any) -> dict:
+        await release.wait()
+        return {"capabilities": []}
+
+    cloud = AsyncMock(side_effect=get_device_state)
+    with patch("util.govee_api.GoveeAPI.get_device_state", cloud):
+        callers = [asyncio.create_task(account.api.get_device_state(SKU, DEVICE_ID)) for _ in range(3)]
+        await asyncio.sleep(0)
+        release.set()
+        states = await asyncio.gather(*callers)
+
+    assert cloud.await_count == 1
+    assert states == [{"capabilities": []}] * 3
+    assert account.api.metrics.shared == 2
+
+
+async def test_fresh_state_is_served_until_it_expires_or_a_command_is_sent(account: GoveeAccount) -> None:
+    """A state fetched moments ago is served again, until it ages out or the device is sent a command."""
+    cloud = AsyncMock(return_value={"capabilities": []})
+    with (
+        patch("util.govee_api.GoveeAPI.get_device_state", cloud),
+        patch("util.govee_api.GoveeAPI.control_device", AsyncMock(return_value=POWER_ON)),
+        patch("custom_components.govee.api.STATE_FRESHNESS", 0.05),
+    ):
+        await account.api.get_device_state(SKU, DEVICE_ID)
+        await account.api.get_device_state(SKU, DEVICE_ID)
+        assert cloud.await_count == 1
+        assert account.api.metrics.cache_hits == 1
+
+        await asyncio.sleep(0.05)
+        await account.api.get_device_state(SKU, DEVICE_ID)
+        assert cloud.await_count == 2
+
+        await account.api.control_device(SKU, DEVICE_ID, POWER_ON)
+        await account.api.get_device_state(SKU, DEVICE_ID)
+        assert cloud.await_count == 3
+
+
+async def test_request_started_before_command_is_not_joined(account: GoveeAccount) -> None:
+    """A caller asking after a command gets a state fetched after it, not the one in flight when it was sent."""
+    release = asyncio.Event()
+    states = iter(({"capabilities": ["before"]}, {"capabilities": ["after"]}))
+
+    async def get_device_state(_sku: str, _device: str, *_args: Any, **_kwargs: Any) -> dict:
+        state = next(states)
+        await release.wait()
+        return state
+
+    with (
+        patch("util.govee_api.GoveeAPI.get_device_state", AsyncMock(side_effect=get_device_state)),
+        patch("util.govee_api.GoveeAPI.control_device", AsyncMock(return_value=POWER_ON)),
+    ):
+        before = asyncio.create_task(account.api.get_device_state(SKU, DEVICE_ID))
+        await asyncio.sleep(0)
+        await account.api.control_device(SKU, DEVICE_ID, POWER_ON)
+        after = asyncio.create_task(account.api.get_device_state(SKU, DEVICE_ID))
+        await asyncio.sleep(0)
+        release.set()
+
+        assert await before == {"capabilities": ["before"]}
+        assert await after == {"capabilities": ["after"]}
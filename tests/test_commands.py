@@ -0,0 +1,130 @@
+"""Tests of the commands sent to Govee devices."""
+
+from __future__ import annotations
+
+import asyncio
+from typing import TYPE_CHECKING, Any
+from unittest.mock import AsyncMock, patch
+
+if TYPE_CHECKING:
+    from .conftest import AddDevice
+
+
+async def test_state_read_within_command_is_not_held_back(add_device: AddDevice) -> None:
+    """The state the library reads while switching to Normal is fetched while the power command is in flight."""
+    coordinator = await add_device("H7102")
+    read = asyncio.Event()
+
+    async def get_device_state(_sku: str, _device: str, *_args: Any, **_kwargs: Any) -> dict:
+        read.set()
+        return {"capabilities": []}
+
+    async def control_device(_sku: str, _device: str, capability: dict, *_args: Any, **_kwargs: Any) -> dict:
+        if capability["instance"] == "powerSwitch":
+            # The power command only completes once the state was read
+            await read.wait()
+        return capability
+
+    with (
+        patch("util.govee_api.GoveeAPI.get_device_state", AsyncMock(side_effect=get_device_state)),
+        patch("util.govee_api.GoveeAPI.control_device", AsyncMock(side_effect=control_device)),
+    ):
+        async with asyncio.timeout(5):
+            await coordinator.commands.async_turn_on(work_mode="Normal")
+    assert coordinator.device.power_switch
+    assert coordinator.device.work_mode == "Normal"
+
+
+async def test_change_made_during_slow_send_is_sent_next(add_device: AddDevice) -> None:
+    """A change queued while the previous one waits on the cloud is shown right away and sent after it."""
+    with patch("custom_components.govee.commands.COMMAND_DEBOUNCE", 0.01):
+        coordinator = await add_device("H7102")
+    sending = asyncio.Event()
+    release = asyncio.Event()
+    sent: list[int] = []
+
+    async def control_device(_sku: str, _device: str, capability: dict, *_args: Any, **_kwargs: Any) -> dict:
+        sent.append(capability["value"]["modeValue"])
+        sending.set()
+        if len(sent) == 1:
+            await release.wait()
+        return capability
+
+    with patch("util.govee_api.GoveeAPI.control_device", AsyncMock(side_effect=control_device)):
+        coordinator.commands.async_set_fan_speed(3)
+        async with asyncio.timeout(5):
+            await sending.wait()
+        coordinator.commands.async_set_fan_speed(6)
+        # The send outlasts the debounce cooldown of the second change
+        await asyncio.sleep(0.05)
+        release.set()
+        async with asyncio.timeout(5):
+            while coordinator.commands.pending or len(sent) < 2:  # noqa: ASYNC110
+                await asyncio.sleep(0.01)
+
+    assert sent == [3, 6]
+    assert not coordinator.commands.pending
+    assert coordinator.device.fan_speed == 6
+
+
+async def test_turn_on_survives_state_read_within_work_mode_command(add_device: AddDevice) -> None:
+    """A state read the work mode command makes before the power change lands does not turn the fan off again."""
+    coordinator = await add_device("H7102")
+    power_off = {"type": "devices.capabilities.on_off", "instance": "powerSwitch", "state": {"value": 0}}
+
+    async def control_device(_sku: str, _device: str, capability: dict, *_args: Any, **_kwargs: Any) -> dict:
+        return capability
+
+    with (
+        patch("util.govee_api.GoveeAPI.get_device_state", AsyncMock(return_value={"capabilities": [power_off]})),
+        patch("util.govee_api.GoveeAPI.control_device", AsyncMock(side_effect=control_device)),
+    ):
+        await coordinator.commands.async_turn_on(work_mode="Normal")
+
+    assert coordinator.device.power_switch
+    assert coordinator.device.work_mode == "Normal"
+
+
+async def test_turn_off_drops_queued_changes(add_device: AddDevice) -> None:
+    """A speed change still waiting for the debounce is not sent after the fan was turned off."""
+    with patch("custom_components.govee.commands.COMMAND_DEBOUNCE", 0.01):
+        coordinator = await add_device("H7102")
+    sent: list[str] = []
+
+    async def control_device(_sku: str, _device: str, capability: dict, *_args: Any, **_kwargs: Any) -> dict:
+        sent.append(capability["instance"])
+        return capability
+
+    with patch("util.govee_api.GoveeAPI.control_device", AsyncMock(side_effect=control_device)):
+        coordinator.commands.async_set_fan_speed(3)
+        await coordinator.commands.async_turn_off()
+        # Longer than the debounce cooldown the speed change waited for
+        await asyncio.sleep(0.05)
+
+    assert sent == ["powerSwitch"]
+    assert not coordinator.commands.pending
+    assert not coordinator.device.power_switch
+
+
+async def test_rapid_changes_are_merged_into_one_command_per_capability(add_device: AddDevice) -> None:
+    """Changes made within the debounce window are sent once each, with the latest value, in the order last made."""
+    with patch("custom_components.govee.commands.COMMAND_DEBOUNCE", 0.01):
+        coordinator = await add_device("H7102")
+    sent: list[tuple[str, Any]] = []
+
+    async def control_device(_sku: str, _device: str, capability: dict, *_args: Any, **_kwargs: Any) -> dict:
+        sent.append((capability["instance"], capability["value"]))
+        return capability
+
+    with patch("util.govee_api.GoveeAPI.control_device", AsyncMock(side_effect=control_device)):
+        coordinator.commands.async_set_fan_speed(1)
+        coordinator.commands.async_set_fan_speed(2)
+        coordinator.commands.async_set_oscillation(oscillation=True)
+        coordinator.commands.async_set_fan_speed(3)
+        assert coordinator.device.fan_speed == 3
+        async with asyncio.timeout(5):
+            while coordinator.commands.pending or len(sent) < 2:  # noqa: ASYNC110
+                await asyncio.sleep(0.01)
+
+    assert [instance for instance, _value in sent] == ["oscillationToggle", "workMode"]
+    assert sent[1][1]["modeValue"] == 3
@@ -0,0 +1,47 @@
+"""Tests of the options flow."""
+
+from __future__ import annotations
+
+from dataclasses import replace
+from typing import TYPE_CHECKING
+from unittest.mock import patch
+
+from homeassistant.const import CONF_API_KEY, CONF_DEVICE_ID, CONF_DEVICES, CONF_NAME
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.govee.const import CONF_LAN, CONF_PUSH, DOMAIN, ENTRY_VERSION
+from custom_components.govee.registry import SKUS
+
+from .conftest import API_KEY, DEVICE_ID
+
+if TYPE_CHECKING:
+    from homeassistant.core import HomeAssistant
+
+
+async def _async_options(hass: HomeAssistant, entry: MockConfigEntry) -> set[str]:
+    """
+    Open the options flow of an entry.
+
+    :param hass: Home Assistant instance
+    :param entry: Config entry
+    :return: Options shown by the form
+    """
+    result = await hass.config_entries.options.async_init(entry.entry_id)
+    return {str(key) for key in result["data_schema"].schema}
+
+
+async def test_lan_option_needs_a_lan_device(hass: HomeAssistant, enable_custom_integrations: None) -> None:
+    """The LAN option is only shown to accounts with a device that answers the LAN API."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={CONF_API_KEY: API_KEY, CONF_DEVICES: [{CONF_DEVICE_ID: DEVICE_ID, CONF_NAME: "h7102"}]},
+        version=ENTRY_VERSION,
+    )
+    entry.add_to_hass(hass)
+
+    options = await _async_options(hass, entry)
+    assert CONF_PUSH in options
+    assert CONF_LAN not in options
+
+    with patch.dict(SKUS, {"H7102": replace(SKUS["H7102"], lan=True)}):
+        assert CONF_LAN in await _async_options(hass, entry)
@@ -0,0 +1,229 @@
+"""Tests of the setup and migration of Govee config entries."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.const import CONF_API_KEY, CONF_DEVICE_ID, CONF_DEVICES, CONF_NAME
+from homeassistant.core import DOMAIN as HOMEASSISTANT_DOMAIN
+from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.update_coordinator import UpdateFailed
+from homeassistant.setup import async_setup_component
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.govee.api import account_id
+from custom_components.govee.const import DATA_ACCOUNTS, DOMAIN, ENTRY_VERSION, STORAGE_VERSION, RequestPriority
+from custom_components.govee.registry import get_sku
+from custom_components.govee.snapshot import device_snapshot
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+    from devices.fan.h7102 import H7102
+    from homeassistant.core import HomeAssistant
+
+    from custom_components.govee.coordinator import GoveeAccount
+
+API_KEY = "test-api-key"
+ONLINE = "AA:BB:CC:DD:EE:FF:00:11"
+REMOVED = "AA:BB:CC:DD:EE:FF:00:22"
+
+
+@pytest.fixture(autouse=True)
+def cloud(enable_custom_integrations: None) -> Iterator[None]:
+    """
+    Stand in for the Govee cloud, which no longer knows the removed device.
+
+    :param enable_custom_integrations: Lets Home Assistant load the integration
+    :return: None
+    """
+
+    async def async_fetch(_account: GoveeAccount, device: H7102, _priority: RequestPriority) -> bool:
+        if device.device_id == REMOVED:
+            msg = f"Error fetching state of {device.device_id}: 400, message='Bad Request'"
+            raise UpdateFailed(msg)
+        device.online = True
+        return True
+
+    with (
+        patch("custom_components.govee.coordinator.GoveeAccount.async_fetch", async_fetch),
+        patch("custom_components.govee.api.GoveeClient.async_prewarm", AsyncMock()),
+    ):
+        yield
+
+
+async def test_failed_first_fetch_only_affects_its_device(hass: HomeAssistant) -> None:
+    """A device the cloud cannot fetch is unavailable while the rest of the account is set up."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={
+            CONF_API_KEY: API_KEY,
+            CONF_DEVICES: [{CONF_DEVICE_ID: ONLINE, CONF_NAME: "H7102"}, {CONF_DEVICE_ID: REMOVED, CONF_NAME: "H7102"}],
+        },
+        unique_id=account_id(API_KEY),
+        version=ENTRY_VERSION,
+    )
+    entry.add_to_hass(hass)
+
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    assert entry.state is ConfigEntryState.LOADED
+    coordinators = hass.data[DOMAIN][entry.entry_id]
+    assert coordinators[ONLINE].last_update_success
+    assert not coordinators[REMOVED].last_update_success
+    assert hass.states.get("fan.smart_tower_fan").state == "on"
+    assert hass.states.get("fan.smart_tower_fan_2").state == "unavailable"
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+
+
+async def test_migrated_device_entry_is_folded_into_account_entry(hass: HomeAssistant) -> None:
+    """A per-device entry of an API key with an account entry hands its device over and is removed."""
+    owner = MockConfigEntry(
+        domain=DOMAIN,
+        data={CONF_API_KEY: API_KEY, CONF_DEVICES: [{CONF_DEVICE_ID: ONLINE, CONF_NAME: "H7102"}]},
+        unique_id=account_id(API_KEY),
+        version=ENTRY_VERSION,
+    )
+    owner.add_to_hass(hass)
+    legacy = MockConfigEntry(
+        domain=DOMAIN,
+        data={CONF_API_KEY: API_KEY, CONF_DEVICE_ID: REMOVED, CONF_NAME: "H7102"},
+        unique_id=REMOVED,
+        version=1,
+    )
+    legacy.add_to_hass(hass)
+
+    assert await async_setup_component(hass, DOMAIN, {})
+    await hass.async_block_till_done()
+
+    assert hass.config_entries.async_get_entry(legacy.entry_id) is None
+    assert owner.state is ConfigEntryState.LOADED
+    assert owner.data[CONF_DEVICES] == [
+        {CONF_DEVICE_ID: ONLINE, CONF_NAME: "H7102"},
+        {CONF_DEVICE_ID: REMOVED, CONF_NAME: "H7102"},
+    ]
+    assert set(hass.data[DOMAIN][owner.entry_id]) == {ONLINE, REMOVED}
+
+    assert await hass.config_entries.async_unload(owner.entry_id)
+
+
+async def test_setup_retried_when_no_new_device_could_be_fetched(hass: HomeAssistant) -> None:
+    """Home Assistant retries the setup while none of the devices without a snapshot could be fetched."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={CONF_API_KEY: API_KEY, CONF_DEVICES: [{CONF_DEVICE_ID: REMOVED, CONF_NAME: "H7102"}]},
+        unique_id=account_id(API_KEY),
+        version=ENTRY_VERSION,
+    )
+    entry.add_to_hass(hass)
+
+    assert not await hass.config_entries.async_setup(entry.entry_id)
+
+    assert entry.state is ConfigEntryState.SETUP_RETRY
+    assert DATA_ACCOUNTS not in hass.data[DOMAIN] or not hass.data[DOMAIN][DATA_ACCOUNTS]
+
+
+async def test_entry_without_devices_is_not_set_up(hass: HomeAssistant) -> None:
+    """An entry emptied by the migration neither opens an account nor adds entities."""
+    entry = MockConfigEntry(domain=DOMAIN, data={CONF_API_KEY: API_KEY, CONF_DEVICES: []}, version=ENTRY_VERSION)
+    entry.add_to_hass(hass)
+
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    assert DOMAIN not in hass.data
+    assert hass.states.async_all() == []
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+
+
+async def test_device_identifiers_are_moved_to_integration_domain(hass: HomeAssistant) -> None:
+    """Devices registered under the homeassistant domain keep their entities under the integration's domain."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={CONF_API_KEY: API_KEY, CONF_DEVICES: [{CONF_DEVICE_ID: ONLINE, CONF_NAME: "H7102"}]},
+        unique_id=account_id(API_KEY),
+        version=ENTRY_VERSION,
+    )
+    entry.add_to_hass(hass)
+    device_registry = dr.async_get(hass)
+    legacy = device_registry.async_get_or_create(
+        config_entry_id=entry.entry_id, identifiers={(HOMEASSISTANT_DOMAIN, ONLINE)}
+    )
+
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    assert device_registry.async_get_device(identifiers={(HOMEASSISTANT_DOMAIN, ONLINE)}) is None
+    device = device_registry.async_get_device(identifiers={(DOMAIN, ONLINE)})
+    assert device is not None
+    assert device.id == legacy.id
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+
+
+async def test_device_with_snapshot_starts_from_it(hass: HomeAssistant, hass_storage: dict[str, Any]) -> None:
+    """A device restored from its last known state is set up and shown even while its fetch fails."""
+    device = await get_sku("h7102").async_create_device(hass, REMOVED)
+    device.online = True
+    device.power_switch = True
+    hass_storage[f"{DOMAIN}.snapshots.{account_id(API_KEY)}"] = {
+        "version": STORAGE_VERSION,
+        "minor_version": 1,
+        "key": f"{DOMAIN}.snapshots.{account_id(API_KEY)}",
+        "data": {REMOVED: device_snapshot(device)},
+    }
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={CONF_API_KEY: API_KEY, CONF_DEVICES: [{CONF_DEVICE_ID: REMOVED, CONF_NAME: "H7102"}]},
+        unique_id=account_id(API_KEY),
+        version=ENTRY_VERSION,
+    )
+    entry.add_to_hass(hass)
+
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    assert entry.state is ConfigEntryState.LOADED
+    assert hass.states.get("fan.smart_tower_fan").state == "on"
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+
+
+async def test_legacy_entries_of_an_api_key_become_one_account_entry(hass: HomeAssistant) -> None:
+    """Without an account entry, the first per-device entry becomes it and the next one hands its device over."""
+    first = MockConfigEntry(
+        domain=DOMAIN,
+        data={CONF_API_KEY: API_KEY, CONF_DEVICE_ID: ONLINE, CONF_NAME: "H7102"},
+        unique_id=ONLINE,
+        version=1,
+    )
+    first.add_to_hass(hass)
+    second = MockConfigEntry(
+        domain=DOMAIN,
+        data={CONF_API_KEY: API_KEY, CONF_DEVICE_ID: REMOVED, CONF_NAME: "H7102"},
+        unique_id=REMOVED,
+        version=1,
+    )
+    second.add_to_hass(hass)
+    entity = er.async_get(hass).async_get_or_create("fan", DOMAIN, f"{REMOVED}_fan", config_entry=second)
+
+    assert await async_setup_component(hass, DOMAIN, {})
+    await hass.async_block_till_done()
+
+    assert hass.config_entries.async_entries(DOMAIN) == [first]
+    assert first.version == ENTRY_VERSION
+    assert first.unique_id == account_id(API_KEY)
+    assert first.data[CONF_DEVICES] == [
+        {CONF_DEVICE_ID: ONLINE, CONF_NAME: "H7102"},
+        {CONF_DEVICE_ID: REMOVED, CONF_NAME: "H7102"},
+    ]
+    assert er.async_get(hass).async_get(entity.entity_id).config_entry_id == first.entry_id
+
+    assert await hass.config_entries.async_unload(first.entry_id)
@@ -0,0 +1,106 @@
+"""Tests of the local LAN transport."""
+
+from __future__ import annotations
+
+import asyncio
+from typing import TYPE_CHECKING
+
+import pytest
+
+from custom_components.govee.lan import GoveeLan, lan_command, lan_state
+
+from .local_lan import LanDeviceStandIn
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterator
+
+    from homeassistant.core import HomeAssistant
+
+    from custom_components.govee.coordinator import GoveeAccount
+
+    from .conftest import AddDevice
+
+DEVICE_ID = "AA:BB:CC:DD:EE:FF:00:11"
+
+
+@pytest.fixture
+async def lan_device(socket_enabled: None) -> AsyncIterator[LanDeviceStandIn]:
+    """
+    Serve a device stand-in on a free loopback port.
+
+    :param socket_enabled: Lets the test open loopback sockets
+    :return: The running device
+    """
+    device = LanDeviceStandIn(DEVICE_ID, {"onOff": 0, "brightness": 40})
+    await device.async_start()
+    yield device
+    device.stop()
+
+
+@pytest.fixture
+async def lan(hass: HomeAssistant, lan_device: LanDeviceStandIn) -> AsyncIterator[GoveeLan]:
+    """
+    Start the LAN transport against the device stand-in and wait for the device to answer the scan.
+
+    :param hass: Home Assistant instance
+    :param lan_device: The device stand-in
+    :return: The running transport
+    """
+    lan = GoveeLan(hass, scan_address=("127.0.0.1", lan_device.port), listen_port=0)
+    discovered = asyncio.Event()
+    datagram_received = lan.datagram_received
+
+    def _datagram_received(data: bytes, addr: tuple[str, int]) -> None:
+        datagram_received(data, addr)
+        if DEVICE_ID in lan.devices:
+            discovered.set()
+
+    lan.datagram_received = _datagram_received
+    await lan.async_start()
+    async with asyncio.timeout(5):
+        await discovered.wait()
+    yield lan
+    lan.async_stop()
+
+
+async def test_scan_discovers_device(lan: GoveeLan, lan_device: LanDeviceStandIn) -> None:
+    """A device answering the scan is remembered by its IP address."""
+    assert lan.devices == {DEVICE_ID: "127.0.0.1"}
+    assert lan_device.received[0] == {"cmd": "scan", "data": {"account_topic": "reserve"}}
+
+
+async def test_status_is_translated_to_cloud_state(lan: GoveeLan) -> None:
+    """A status reply reads like the cloud's state payload."""
+    state = lan_state(await lan.async_status(DEVICE_ID))
+
+    assert {capability["instance"]: capability["state"]["value"] for capability in state["capabilities"]} == {
+        "online": True,
+        "powerSwitch": 0,
+        "brightness": 40,
+    }
+
+
+async def test_control_reads_back_status(lan: GoveeLan, lan_device: LanDeviceStandIn) -> None:
+    """A command is confirmed by reading the status of the device back."""
+    command = lan_command({"type": "devices.capabilities.on_off", "instance": "powerSwitch", "value": 1})
+    await lan.async_control(DEVICE_ID, command)
+
+    assert lan_device.status["onOff"] == 1
+    assert [message["cmd"] for message in lan_device.received[1:]] == ["turn", "devStatus"]
+
+
+async def test_silent_device_times_out(lan: GoveeLan, lan_device: LanDeviceStandIn) -> None:
+    """A device that stops answering raises so the cloud can be used instead."""
+    lan_device.silent = True
+
+    with pytest.raises(TimeoutError):
+        await lan.async_status(DEVICE_ID)
+
+
+async def test_lan_not_started_without_lan_capable_sku(account: GoveeAccount, add_device: AddDevice) -> None:
+    """No socket is opened for an account whose devices do not speak the LAN API."""
+    await add_device("H7102")
+
+    await account.async_enable_lan()
+
+    assert account.api.lan is None
@@ -0,0 +1,57 @@
+"""Tests of the connection and event loop metrics."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from unittest.mock import patch
+
+import aiohttp
+from aiohttp import web
+
+from custom_components.govee.metrics import CONNECT, GoveeMetrics, LoopLagProbe
+
+
+async def _async_handle(_request: web.Request) -> web.Response:
+    """
+    Answer every request with an empty body.
+
+    :return: The response
+    """
+    return web.json_response({})
+
+
+async def test_connection_phases_are_timed(socket_enabled: None) -> None:
+    """The first request opens a connection and is timed doing so, the next one reuses it."""
+    app = web.Application()
+    app.router.add_get("/", _async_handle)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    metrics = GoveeMetrics()
+
+    async with aiohttp.ClientSession(trace_configs=[metrics.trace_config()]) as session:
+        for _ in range(2):
+            async with session.get(f"http://127.0.0.1:{runner.addresses[0][1]}/") as response:
+                await response.read()
+    await runner.cleanup()
+
+    assert metrics.phases[CONNECT].count == 1
+    assert metrics.reused_connections == 1
+    assert metrics.as_dict()["connections"]["reused"] == 1
+
+
+async def test_loop_lag_is_measured() -> None:
+    """A callback that blocks the event loop shows up as lag of the next probe."""
+    metrics = GoveeMetrics()
+    with patch("custom_components.govee.metrics.LOOP_PROBE_INTERVAL", 0.01):
+        probe = LoopLagProbe(asyncio.get_running_loop(), metrics)
+        probe.async_start()
+        # Block the loop past the time the probe is due
+        time.sleep(0.05)  # noqa: ASYNC251
+        await asyncio.sleep(0.02)
+        probe.async_stop()
+
+    assert metrics.loop_lag_max >= 0.03
+    assert metrics.as_dict()["loop_lag"]["max"] == metrics.loop_lag_max
@@ -0,0 +1,119 @@
+"""Tests of the push updates from the Govee MQTT feed."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+from typing import TYPE_CHECKING
+
+from devices.thermometer.h5179 import H5179
+
+from custom_components.govee.const import PUSH_SCAN_INTERVAL, SCAN_INTERVAL
+from custom_components.govee.push import GoveePushClient, apply_capabilities
+
+if TYPE_CHECKING:
+    from homeassistant.core import HomeAssistant
+
+    from custom_components.govee.coordinator import GoveeAccount
+
+    from .conftest import AddDevice
+    from .local_mqtt import LocalMqttBroker
+
+API_KEY = "test-api-key"
+
+EVENT = {
+    "sku": "H5179",
+    "device": "AA:BB:CC:DD:EE:FF:00:11",
+    "capabilities": [
+        {"type": "devices.capabilities.property", "instance": "sensorTemperature", "state": [{"value": 70.5}]},
+    ],
+}
+
+
+async def test_events_from_local_broker(hass: HomeAssistant, mqtt_broker: LocalMqttBroker) -> None:
+    """Events published on the account's topic reach the event loop."""
+    events: list[dict] = []
+    received = asyncio.Event()
+
+    def on_event(event: dict) -> None:
+        events.append(event)
+        received.set()
+
+    push = GoveePushClient(hass, API_KEY, on_event, broker=("127.0.0.1", mqtt_broker.port))
+    await push.async_start()
+    try:
+        async with asyncio.timeout(10):
+            await mqtt_broker.subscribed.wait()
+        assert mqtt_broker.credentials == [(API_KEY, API_KEY)]
+        assert mqtt_broker.topics == [f"GA/{API_KEY}"]
+
+        mqtt_broker.publish(f"GA/{API_KEY}", json.dumps(EVENT).encode())
+        async with asyncio.timeout(10):
+            await received.wait()
+        assert events == [EVENT]
+        assert push.connected
+    finally:
+        await push.async_stop()
+    assert not push.connected
+
+
+async def test_malformed_event_is_ignored(hass: HomeAssistant, mqtt_broker: LocalMqttBroker) -> None:
+    """A payload that is not JSON is dropped without reaching the event handler."""
+    events: list[dict] = []
+    received = asyncio.Event()
+
+    def on_event(event: dict) -> None:
+        events.append(event)
+        received.set()
+
+    push = GoveePushClient(hass, API_KEY, on_event, broker=("127.0.0.1", mqtt_broker.port))
+    await push.async_start()
+    try:
+        async with asyncio.timeout(10):
+            await mqtt_broker.subscribed.wait()
+        mqtt_broker.publish(f"GA/{API_KEY}", b"not json")
+        mqtt_broker.publish(f"GA/{API_KEY}", json.dumps(EVENT).encode())
+        async with asyncio.timeout(10):
+            await received.wait()
+        assert events == [EVENT]
+    finally:
+        await push.async_stop()
+
+
+def test_apply_capabilities_reports_delivered_values() -> None:
+    """Every value an event carries is reported, whether it changed or not, unknown capabilities are skipped."""
+    device = H5179("AA:BB:CC:DD:EE:FF:00:11")
+    device.temperature = 70.5
+
+    applied = apply_capabilities(
+        device,
+        [
+            *EVENT["capabilities"],
+            {"type": "devices.capabilities.property", "instance": "sensorHumidity", "state": {"value": 41}},
+            {"type": "devices.capabilities.property", "instance": "unknown", "state": {"value": 1}},
+        ],
+    )
+
+    assert applied == {"temperature", "humidity"}
+    assert device.temperature == 70.5
+    assert device.humidity == 41.0
+
+
+async def test_push_floor_only_once_every_watched_value_arrived(account: GoveeAccount, add_device: AddDevice) -> None:
+    """Polling only drops to the push floor once the feed delivered every value the entities are built from."""
+    coordinator = await add_device("H5179", EVENT["device"])
+    account.push = GoveePushClient(account.hass, account.api_key, account._async_handle_event)
+    account.push.connected = True
+    coordinator.watched.update({"temperature", "humidity"})
+    assert coordinator.poll_interval == SCAN_INTERVAL
+
+    account._async_handle_event(EVENT)
+    assert coordinator.pushed == {"temperature"}
+    assert coordinator.poll_interval == SCAN_INTERVAL
+
+    humidity = {"type": "devices.capabilities.property", "instance": "sensorHumidity", "state": {"value": 41}}
+    account._async_handle_event({**EVENT, "capabilities": [humidity]})
+    assert coordinator.poll_interval == PUSH_SCAN_INTERVAL
+
+    account.push.connected = False
+    assert coordinator.poll_interval == SCAN_INTERVAL
@@ -0,0 +1,69 @@
+"""Tests of the pacing of cloud requests by the daily quota."""
+
+from __future__ import annotations
+
+import asyncio
+from datetime import UTC, datetime
+from typing import TYPE_CHECKING
+from unittest.mock import AsyncMock, PropertyMock, patch
+
+from custom_components.govee.const import QUOTA_BURST, QUOTA_LOW_FRACTION, RequestPriority
+from custom_components.govee.quota import GoveeQuota
+
+if TYPE_CHECKING:
+    from freezegun.api import FrozenDateTimeFactory
+    from homeassistant.core import HomeAssistant
+
+    from custom_components.govee.coordinator import GoveeAccount
+
+    from .conftest import AddDevice
+
+ONLINE = {"type": "devices.capabilities.online", "instance": "online", "state": {"value": True}}
+
+
+async def test_first_fetch_is_not_paced(account: GoveeAccount, add_device: AddDevice) -> None:
+    """Every device of a cold start is fetched at once, however many more than the burst there are."""
+    coordinators = [await add_device("H7102", f"AA:BB:CC:DD:EE:FF:00:{index:02}") for index in range(3 * QUOTA_BURST)]
+    assert {coordinator.poll_priority for coordinator in coordinators} == {RequestPriority.SETUP}
+
+    with patch("util.govee_api.GoveeAPI.get_device_state", AsyncMock(return_value={"capabilities": [ONLINE]})):
+        await asyncio.gather(*(coordinator.async_refresh() for coordinator in coordinators))
+
+    assert all(coordinator.device.online for coordinator in coordinators)
+    assert account.quota.used == 3 * QUOTA_BURST
+    assert all(coordinator.poll_priority is not RequestPriority.SETUP for coordinator in coordinators)
+
+
+async def test_exhaustion_forecast_moves_by_the_minute(hass: HomeAssistant, freezer: FrozenDateTimeFactory) -> None:
+    """The forecast does not follow the clock between polls, only changes of the request rate move it."""
+    freezer.move_to("2026-10-17 12:00:10+00:00")
+    quota = GoveeQuota(hass, "test")
+
+    with patch.object(GoveeQuota, "rate", PropertyMock(return_value=quota.remaining / 600)):
+        forecast = quota.exhausted_at
+        freezer.tick(5)
+        assert quota.exhausted_at == forecast == datetime(2026, 10, 17, 12, 10, tzinfo=UTC)
+
+    quota.used = quota.daily_limit
+    exhausted = quota.exhausted_at
+    freezer.tick(120)
+    assert quota.exhausted_at == exhausted == datetime(2026, 10, 17, 12, 0, tzinfo=UTC)
+
+
+async def test_polls_beyond_the_burst_are_deferred(hass: HomeAssistant) -> None:
+    """The bucket lets a burst of polls through and defers the next, while commands and setup fetches still go."""
+    quota = GoveeQuota(hass, "test")
+
+    assert all(quota.async_acquire(RequestPriority.POLL) for _ in range(QUOTA_BURST))
+    assert not quota.async_acquire(RequestPriority.POLL)
+    assert quota.async_acquire(RequestPriority.COMMAND)
+    assert quota.async_acquire(RequestPriority.SETUP)
+
+
+async def test_background_polls_are_shed_first(hass: HomeAssistant) -> None:
+    """Once the quota runs low, background polls are refused while regular polls still take tokens."""
+    quota = GoveeQuota(hass, "test")
+    quota.used = int(quota.daily_limit * (1 - QUOTA_LOW_FRACTION)) + 1
+
+    assert not quota.async_acquire(RequestPriority.BACKGROUND)
+    assert quota.async_acquire(RequestPriority.POLL)
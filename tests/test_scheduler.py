@@ -0,0 +1,90 @@
+"""Tests of the prioritized request scheduling."""
+
+from __future__ import annotations
+
+import asyncio
+
+from custom_components.govee.const import RequestPriority
+from custom_components.govee.scheduler import GoveeRequestScheduler
+
+
+async def _async_start(scheduler: GoveeRequestScheduler, priority: RequestPriority, started: list[str]) -> None:
+    """
+    Wait for a slot and note the request as started.
+
+    :param scheduler: Scheduler to wait on
+    :param priority: Priority of the request
+    :param started: Names of the started requests
+    :return: None
+    """
+    await scheduler.async_acquire(priority)
+    started.append(priority.name)
+
+
+async def test_waiters_start_by_priority_then_arrival() -> None:
+    """Once the slot frees up, a command goes first and polls follow in the order they were queued."""
+    scheduler = GoveeRequestScheduler(limit=1)
+    await scheduler.async_acquire(RequestPriority.POLL)
+    started: list[str] = []
+    tasks = [
+        asyncio.create_task(_async_start(scheduler, priority, started))
+        for priority in (
+            RequestPriority.BACKGROUND,
+            RequestPriority.POLL,
+            RequestPriority.COMMAND,
+            RequestPriority.SETUP,
+        )
+    ]
+    await asyncio.sleep(0)
+    assert scheduler.waiting == 4
+
+    # Each finished request hands its slot to the next one
+    holder = RequestPriority.POLL
+    for _ in tasks:
+        scheduler.async_release(holder)
+        await asyncio.sleep(0)
+        holder = RequestPriority[started[-1]]
+
+    assert started == ["COMMAND", "SETUP", "POLL", "BACKGROUND"]
+    await asyncio.gather(*tasks)
+
+
+async def test_polls_held_back_while_command_in_flight() -> None:
+    """A poll waits for the command in flight even though there are free slots, a second command does not."""
+    scheduler = GoveeRequestScheduler(limit=5)
+    await scheduler.async_acquire(RequestPriority.COMMAND)
+    started: list[str] = []
+    poll = asyncio.create_task(_async_start(scheduler, RequestPriority.POLL, started))
+    await asyncio.sleep(0)
+    await scheduler.async_acquire(RequestPriority.COMMAND)
+
+    assert started == []
+    assert scheduler.active == 2
+
+    scheduler.async_release(RequestPriority.COMMAND)
+    await asyncio.sleep(0)
+    assert started == []
+
+    scheduler.async_release(RequestPriority.COMMAND)
+    await poll
+    assert started == ["POLL"]
+    assert scheduler.commands == 0
+
+
+async def test_cancelled_waiter_does_not_hold_the_queue() -> None:
+    """A request cancelled while waiting gives up its place, and the one behind it gets the slot."""
+    scheduler = GoveeRequestScheduler(limit=1)
+    await scheduler.async_acquire(RequestPriority.POLL)
+    started: list[str] = []
+    cancelled = asyncio.create_task(_async_start(scheduler, RequestPriority.COMMAND, started))
+    poll = asyncio.create_task(_async_start(scheduler, RequestPriority.POLL, started))
+    await asyncio.sleep(0)
+
+    cancelled.cancel()
+    await asyncio.sleep(0)
+    scheduler.async_release(RequestPriority.POLL)
+    await poll
+
+    assert started == ["POLL"]
+    assert scheduler.active == 1
+    assert scheduler.commands == 0
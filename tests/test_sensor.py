@@ -0,0 +1,57 @@
+"""Tests of the Govee sensors."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import pytest
+
+from custom_components.govee.const import CONF_HEARTBEAT, CONF_TEMPERATURE_DEADBAND
+from custom_components.govee.sensor import GoveeTemperatureSensor
+
+if TYPE_CHECKING:
+    from homeassistant.core import HomeAssistant
+    from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+    from .conftest import AddDevice
+
+
+@pytest.fixture
+async def temperature(
+    hass: HomeAssistant, config_entry: MockConfigEntry, add_device: AddDevice
+) -> GoveeTemperatureSensor:
+    """
+    Create the temperature sensor of a thermometer with a deadband of one degree and a heartbeat of 30 minutes.
+
+    :param hass: Home Assistant instance
+    :param config_entry: Entry of the account
+    :param add_device: Adds a device to the account
+    :return: The sensor, publishing 70 degrees
+    """
+    hass.config_entries.async_update_entry(config_entry, options={CONF_TEMPERATURE_DEADBAND: 1, CONF_HEARTBEAT: 30})
+    coordinator = await add_device("H5179")
+    coordinator.device.temperature = 70.0
+    return GoveeTemperatureSensor(coordinator)
+
+
+def test_change_within_deadband_is_held_back(temperature: GoveeTemperatureSensor) -> None:
+    """Only readings further from the published one than the deadband are published."""
+    temperature._device.temperature = 70.5
+    assert not temperature._async_device_changed()
+
+    temperature._device.temperature = 71.5
+    assert temperature._async_device_changed()
+
+
+def test_missing_reading_is_published(temperature: GoveeTemperatureSensor) -> None:
+    """A reading the device no longer reports is published instead of being compared."""
+    temperature._device.temperature = None
+    assert temperature._async_device_changed()
+
+
+def test_heartbeat_republishes_unchanged_reading(temperature: GoveeTemperatureSensor) -> None:
+    """A reading equal to the published one is published again once the heartbeat is due."""
+    assert not temperature._async_device_changed()
+
+    temperature._published_at -= 30 * 60
+    assert temperature._async_device_changed()
@@ -0,0 +1,49 @@
+"""Tests of the last known device state kept across restarts."""
+
+from __future__ import annotations
+
+from datetime import timedelta
+from typing import TYPE_CHECKING
+
+from homeassistant.util import dt as dt_util
+
+from custom_components.govee.registry import get_sku
+from custom_components.govee.snapshot import GoveeSnapshots
+
+from .conftest import DEVICE_ID
+
+if TYPE_CHECKING:
+    from homeassistant.core import HomeAssistant
+
+
+async def test_snapshot_is_restored_after_restart(hass: HomeAssistant) -> None:
+    """The values of a device and when each was confirmed come back from storage onto a new device instance."""
+    description = get_sku("h7102")
+    device = await description.async_create_device(hass, DEVICE_ID)
+    device.online = True
+    device.power_switch = True
+    device.fan_speed = 5
+    confirmed = dt_util.utcnow().replace(microsecond=0) - timedelta(minutes=3)
+    snapshots = GoveeSnapshots(hass, "test")
+    snapshots.async_update(device, {"fan_speed": confirmed})
+    await snapshots.async_save()
+
+    restarted = GoveeSnapshots(hass, "test")
+    await restarted.async_load()
+    restored = await description.async_create_device(hass, DEVICE_ID)
+    updated_at = restarted.async_restore(restored)
+
+    assert updated_at is not None
+    assert (restored.online, restored.power_switch, restored.fan_speed) == (True, True, 5)
+    assert updated_at["fan_speed"] == confirmed
+    # Values stored without their age are taken as just confirmed
+    assert updated_at["power_switch"] > confirmed
+
+
+async def test_snapshot_of_another_sku_is_not_restored(hass: HomeAssistant) -> None:
+    """A device ID that now belongs to a device of another SKU starts without a last known state."""
+    device = await get_sku("h7102").async_create_device(hass, DEVICE_ID)
+    snapshots = GoveeSnapshots(hass, "test")
+    snapshots.async_update(device, {})
+
+    assert snapshots.async_restore(await get_sku("h7126").async_create_device(hass, DEVICE_ID)) is None